@@ -0,0 +1,496 @@
+"""  A local stand-in for a ``snowflake.connector`` connection, backed by DuckDB.
+
+It understands the statements the datasets send (queries, DDL, temporary
+stages with ``PUT`` / ``COPY INTO`` / ``GET``, ``execute_async``), stages
+are local directories, and it simulates the
+network with a fixed latency per round trip and a transfer bandwidth, so load
+and save throughput can be measured without a Snowflake account.
+"""
+
+import glob
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+__all__ = ["FakeSnowflakeConnection", "FakeSession", "fake_write_pandas"]
+
+
+def _describe(field: pa.Field) -> tuple:
+    """A ``cursor.description`` entry with the Snowflake type code, precision
+    and scale of an Arrow column."""
+    if pa.types.is_decimal(field.type):
+        return (field.name, 0, None, None, field.type.precision, field.type.scale, True)
+    if pa.types.is_integer(field.type):
+        return (field.name, 0, None, None, 38, 0, True)
+    if pa.types.is_floating(field.type):
+        return (field.name, 1, None, None, None, None, True)
+    if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+        return (field.name, 2, None, 16777216, None, None, True)
+    if pa.types.is_boolean(field.type):
+        return (field.name, 13, None, None, None, None, True)
+    return (field.name, None, None, None, None, None, True)
+
+
+class _FakeResultBatch:
+
+    """A result batch, downloaded at the connection bandwidth by ``to_arrow``
+    without using the connection otherwise, like the connector's."""
+
+    def __init__(self, connection: "FakeSnowflakeConnection", batch: pa.RecordBatch) -> None:
+        self._connection = connection
+        self._batch = batch
+        self.rowcount = batch.num_rows
+
+    def to_arrow(self) -> pa.Table:
+        self._connection.transfer(self._batch.nbytes)
+        return pa.Table.from_batches([self._batch])
+
+
+class FakeSnowflakeCursor:
+
+    """DBAPI style cursor over a DuckDB cursor, with the Arrow fetch methods
+    of the Snowflake connector."""
+
+    arraysize = 10000
+
+    def __init__(self, connection: "FakeSnowflakeConnection") -> None:
+        self._connection = connection
+        self._cursor = connection.db.cursor()
+        self._table: Optional[pa.Table] = None
+        self._rows: Optional[List[tuple]] = None
+        self._position = 0
+        self.description: Optional[List[tuple]] = None
+        self.sfqid: Optional[str] = None
+        self.rowcount = -1
+
+    def _run(self, sql: str, params: Optional[Sequence[Any]] = None) -> None:
+        self.sfqid = uuid.uuid4().hex
+        self._rows = None
+        self._position = 0
+
+        result = self._connection.translate(self._cursor, sql, params)
+        if result is None:
+            if isinstance(params, dict):
+                # pyformat named binds become DuckDB named parameters
+                sql = re.sub(r"%\((\w+)\)s", r"$\1", sql)
+            elif params:
+                # pyformat and numeric (:1) binds become DuckDB positional ones
+                sql = re.sub(r"(?<![:\w]):(\d+)\b", r"$\1", sql.replace("%s", "?"))
+                params = list(params)
+            self._cursor.execute(self._connection.to_duckdb(sql), params or None)
+            result = self._cursor.fetch_arrow_table() if self._cursor.description else None
+
+        self._table = result
+        self.description = [_describe(field) for field in result.schema] if result is not None else None
+        self.rowcount = result.num_rows if result is not None else -1
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None, num_statements: int = 1, **kwargs: Any) -> "FakeSnowflakeCursor":
+        statements = [part for part in sql.split(";") if part.strip()] if num_statements != 1 else [sql]
+        for statement in statements:
+            self._connection.round_trip()
+            self._run(statement, params)
+        return self
+
+    def execute_async(self, sql: str, params: Optional[Sequence[Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        self.sfqid = uuid.uuid4().hex
+        self._connection.submit(self.sfqid, sql, params)
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid: str) -> None:
+        sql, params, ready_at = self._connection.collect(sfqid)
+        time.sleep(max(0.0, ready_at - time.monotonic()))
+        self._run(sql, params)
+        self.sfqid = sfqid
+
+    def _transfer(self, table: pa.Table) -> pa.Table:
+        self._connection.transfer(table.nbytes)
+        return table
+
+    def fetch_arrow_all(self) -> Optional[pa.Table]:
+        if self._table is None or self._table.num_rows == 0:
+            return None
+        return self._transfer(self._table)
+
+    def get_result_batches(self) -> Optional[List["_FakeResultBatch"]]:
+        if self._table is None:
+            return None
+        return [
+            _FakeResultBatch(self._connection, batch)
+            for batch in self._table.to_batches(max_chunksize=self._connection.batch_rows)
+        ]
+
+    def fetch_arrow_batches(self) -> Iterator[pa.Table]:
+        if self._table is None:
+            return
+        for batch in self._table.to_batches(max_chunksize=self._connection.batch_rows):
+            yield self._transfer(pa.Table.from_batches([batch]))
+
+    def _all_rows(self) -> List[tuple]:
+        if self._rows is None:
+            table = self._transfer(self._table) if self._table is not None else None
+            self._rows = [] if table is None else list(zip(*(column.to_pylist() for column in table.columns)))
+        return self._rows
+
+    def fetchone(self) -> Optional[tuple]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        rows = self._all_rows()[self._position:self._position + (size or self.arraysize)]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> List[tuple]:
+        rows = self._all_rows()[self._position:]
+        self._position += len(rows)
+        return rows
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class FakeSnowflakeConnection:
+
+    """Connection stand-in with ``latency`` seconds per round trip and
+    ``bandwidth`` bytes per second for results and uploads. Every connection
+    opened with the same ``path`` sees the same DuckDB database."""
+
+    _databases: Dict[str, Any] = {}
+    # named stages and submitted queries outlive connections, like the database
+    _named_stages: Dict[str, Dict[str, str]] = {}
+    _submitted: Dict[str, Dict[str, tuple]] = {}
+    _databases_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        latency: float = 0.05,
+        bandwidth: float = 50e6,
+        batch_rows: int = 100000,
+        **connection_kwargs: Any,
+    ) -> None:
+        with self._databases_lock:
+            if path not in self._databases:
+                self._databases[path] = duckdb.connect(path)
+            self.db = self._databases[path]
+            self._shared_stages = self._named_stages.setdefault(path, {})
+            # results of async queries can be collected from any connection
+            self._async = self._submitted.setdefault(path, {})
+
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.batch_rows = batch_rows
+        self._closed = False
+        self._stages: Dict[str, str] = {}
+
+    def round_trip(self) -> None:
+        time.sleep(self.latency)
+
+    def transfer(self, nbytes: int, streams: int = 1) -> None:
+        if self.bandwidth:
+            time.sleep(nbytes / self.bandwidth / streams)
+
+    def _stage_path(self, location: str) -> str:
+        """Maps ``stage/path/`` to a directory, stages not created by a
+        ``CREATE TEMPORARY STAGE`` are named stages shared by every
+        connection to the database and created on first use."""
+        stage, _, path = location.partition("/")
+        if stage in self._stages:
+            return os.path.join(self._stages[stage], path)
+        with self._databases_lock:
+            if stage not in self._shared_stages:
+                self._shared_stages[stage] = tempfile.mkdtemp(prefix="fake_stage_")
+        return os.path.join(self._shared_stages[stage], path)
+
+    def _unload(self, cursor: Any, location: str, sql: str, params: Optional[Sequence[Any]], max_file_size: int) -> pa.Table:
+        if params:
+            sql = re.sub(r"(?<![:\w]):(\d+)\b", r"$\1", sql.replace("%s", "?"))
+        cursor.execute(self.strip_database(sql), list(params) if params else None)
+        table = cursor.fetch_arrow_table()
+
+        directory = self._stage_path(location)
+        os.makedirs(directory, exist_ok=True)
+        rows_per_file = max(1, int(table.num_rows * max_file_size / max(table.nbytes, 1)))
+        files = 0
+        for start in range(0, table.num_rows, rows_per_file):
+            pq.write_table(
+                table.slice(start, rows_per_file),
+                os.path.join(directory, f"data_0_0_{files}.snappy.parquet"),
+                compression="snappy",
+            )
+            files += 1
+        return pa.table({"rows_unloaded": [table.num_rows], "input_bytes": [table.nbytes], "output_bytes": [0]})
+
+    def submit(self, sfqid: str, sql: str, params: Optional[Sequence[Any]]) -> None:
+        self.round_trip()
+        # the query "runs" in the warehouse for one more round trip
+        self._async[sfqid] = (sql, params, time.monotonic() + self.latency)
+
+    def collect(self, sfqid: str) -> tuple:
+        self.round_trip()
+        return self._async.pop(sfqid)
+
+    @staticmethod
+    def strip_database(sql: str) -> str:
+        """DuckDB has one database, drop the database part of three part names."""
+        return re.sub(r'"[^"]+"\s*\.\s*("[^"]+"\s*\.\s*"[^"]+")', r"\1", sql)
+
+    def to_duckdb(self, sql: str) -> str:
+        """Rewrites the plain sql DuckDB parses differently."""
+        sql = self.strip_database(sql)
+        if re.search(r"INFORMATION_SCHEMA\.TABLES", sql, re.I):
+            # one database, and DuckDB calls the table comment TABLE_COMMENT
+            sql = re.sub(r'(?:"[^"]+"\s*\.\s*)?INFORMATION_SCHEMA\.TABLES', "information_schema.tables", sql, flags=re.I)
+            sql = re.sub(r"\bCOMMENT\b", 'table_comment AS "COMMENT"', sql, count=1, flags=re.I)
+        if sql.strip().upper().startswith("MERGE"):
+            # DuckDB doesn't take qualified columns on the left of UPDATE SET
+            sql = re.sub(
+                r"(UPDATE\s+SET\s+)(.*?)(\s+WHEN\s|$)",
+                lambda match: match.group(1) + re.sub(r"\btarget\.", "", match.group(2)) + match.group(3),
+                sql,
+                flags=re.I | re.S,
+            )
+        return sql
+
+    def translate(self, cursor: Any, sql: str, params: Optional[Sequence[Any]] = None) -> Optional[pa.Table]:
+        """Handles the Snowflake only statements, returns None for plain sql."""
+        statement = sql.strip()
+        upper = statement.upper()
+
+        match = re.match(r"COPY\s+INTO\s+@(\S+)\s+FROM\s+\((.*)\)\s+FILE_FORMAT", statement, re.I | re.S)
+        if match:
+            size = re.search(r"MAX_FILE_SIZE\s*=\s*(\d+)", statement, re.I)
+            return self._unload(cursor, match.group(1), match.group(2), params, int(size.group(1)) if size else 16000000)
+
+        match = re.match(r"GET\s+@(\S+)\s+'file://(.+?)'", statement, re.I | re.S)
+        if match:
+            source = self._stage_path(match.group(1))
+            parallel = re.search(r"PARALLEL\s*=\s*(\d+)", statement, re.I)
+            files = sorted(glob.glob(os.path.join(source, "*")))
+            self.transfer(sum(os.path.getsize(path) for path in files), min(int(parallel.group(1)) if parallel else 10, max(len(files), 1)))
+            for path in files:
+                shutil.copy(path, match.group(2))
+            return pa.table({"file": [os.path.basename(path) for path in files], "status": ["DOWNLOADED"] * len(files)})
+
+        match = re.match(r"REMOVE\s+@(\S+)", statement, re.I | re.S)
+        if match:
+            shutil.rmtree(self._stage_path(match.group(1)), ignore_errors=True)
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"EXPLAIN\s+USING\s+JSON\s+(.*)$", statement, re.I | re.S)
+        if match:
+            # Snowflake estimates the bytes it scans, count them as 8 per value
+            result = cursor.execute(f"SELECT * FROM ({self.to_duckdb(match.group(1))}) LIMIT 0")
+            columns = len(result.description)
+            rows = cursor.execute(f"SELECT COUNT(*) FROM ({self.to_duckdb(match.group(1))})").fetchone()[0]
+            plan = {"GlobalStats": {"partitionsTotal": 1, "partitionsAssigned": 1, "bytesAssigned": rows * columns * 8}}
+            return pa.table({"content": [json.dumps(plan)]})
+
+        if re.match(r"SELECT\s+ROW_COUNT\s*,\s*BYTES\s+FROM\s+\S*INFORMATION_SCHEMA\.TABLES", statement, re.I):
+            schema, table = params
+            columns = cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = ? AND table_name = ?", [schema, table]
+            ).fetchone()[0]
+            if not columns:
+                return pa.table({"ROW_COUNT": pa.array([], pa.int64()), "BYTES": pa.array([], pa.int64())})
+            rows = cursor.execute(f'SELECT COUNT(*) FROM "{schema}"."{table}"').fetchone()[0]
+            return pa.table({"ROW_COUNT": [rows], "BYTES": [rows * columns * 8]})
+
+        if upper.startswith("CREATE DATABASE") or upper.startswith("USE ") or upper.startswith("CREATE STAGE IF NOT EXISTS"):
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"CREATE\s+SCHEMA\s+IF\s+NOT\s+EXISTS\s+(.+)$", statement, re.I | re.S)
+        if match:
+            schema = match.group(1).strip().split(".")[-1]
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"CREATE\s+TEMPORARY\s+TABLE\s+(\S+)\s+LIKE\s+(\S+)$", statement, re.I | re.S)
+        if match:
+            source = self.strip_database(match.group(2))
+            cursor.execute(f"CREATE TABLE {self.strip_database(match.group(1))} AS SELECT * FROM {source} LIMIT 0")
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"CREATE\s+TEMPORARY\s+STAGE\s+(.+)$", statement, re.I | re.S)
+        if match:
+            self._stages[match.group(1).strip()] = tempfile.mkdtemp(prefix="fake_stage_")
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"ALTER\s+TABLE\s+(\S+)\s+SWAP\s+WITH\s+(\S+)$", statement, re.I | re.S)
+        if match:
+            first, second = (self.strip_database(name) for name in match.groups())
+            temporary = f'"swap_{uuid.uuid4().hex}"'
+            cursor.execute(f"ALTER TABLE {first} RENAME TO {temporary}")
+            cursor.execute(f"ALTER TABLE {second} RENAME TO {first.split('.')[-1]}")
+            cursor.execute(f"ALTER TABLE {first.rsplit('.', 1)[0]}.{temporary} RENAME TO {second.split('.')[-1]}")
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"DROP\s+STAGE\s+IF\s+EXISTS\s+(.+)$", statement, re.I | re.S)
+        if match:
+            shutil.rmtree(self._stages.pop(match.group(1).strip(), ""), ignore_errors=True)
+            return pa.table({"status": ["ok"]})
+
+        match = re.match(r"PUT\s+'file://(.+?)'\s+@(\S+)", statement, re.I | re.S)
+        if match:
+            stage_dir = self._stage_path(match.group(2))
+            os.makedirs(stage_dir, exist_ok=True)
+            files = sorted(glob.glob(match.group(1)))
+            for path in files:
+                self.transfer(os.path.getsize(path))
+                shutil.copy(path, stage_dir)
+            return pa.table({"source": [os.path.basename(path) for path in files], "status": ["UPLOADED"] * len(files)})
+
+        match = re.match(r"COPY\s+INTO\s+(.+?)\s+FROM\s+@(\S+)", statement, re.I | re.S)
+        if match:
+            table = self.strip_database(match.group(1))
+            stage_dir = self._stage_path(match.group(2))
+            files = sorted(path for path in glob.glob(os.path.join(stage_dir, "*")) if os.path.isfile(path))
+            names = re.search(r"FILES\s*=\s*\((.*?)\)", statement, re.I | re.S)
+            if names:
+                wanted = set(re.findall(r"'([^']*)'", names.group(1)))
+                files = [path for path in files if os.path.basename(path) in wanted]
+            purge = re.search(r"PURGE\s*=\s*TRUE", statement, re.I)
+            results = []
+            for path in files:
+                rows = cursor.execute(f"SELECT COUNT(*) FROM read_parquet('{path}')").fetchone()[0]
+                cursor.execute(f"INSERT INTO {table} BY NAME SELECT * FROM read_parquet('{path}')")
+                results.append((os.path.basename(path), "LOADED", rows, rows))
+                if purge:
+                    os.remove(path)
+            return pa.table(
+                {
+                    "file": [result[0] for result in results],
+                    "status": [result[1] for result in results],
+                    "rows_parsed": [result[2] for result in results],
+                    "rows_loaded": [result[3] for result in results],
+                }
+            )
+
+        return None
+
+    def cursor(self) -> FakeSnowflakeCursor:
+        return FakeSnowflakeCursor(self)
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+
+class FakeSnowparkFrame:
+
+    """The part of a snowpark ``DataFrame`` the benchmarks and tests use."""
+
+    def __init__(self, session: "FakeSession", sql: str) -> None:
+        self.session = session
+        self._sql = sql
+
+    @property
+    def write(self) -> "FakeSnowparkFrame":
+        return self
+
+    def to_pandas(self) -> pd.DataFrame:
+        table = self.session.execute(self._sql).fetch_arrow_all()
+        return table.to_pandas() if table is not None else pd.DataFrame()
+
+    def collect(self) -> List[tuple]:
+        return self.session.execute(self._sql).fetchall()
+
+    def cache_result(self) -> "FakeSnowparkFrame":
+        self.session.cached += 1
+        name = f"SNOWPARK_TEMP_TABLE_{self.session.cached}"
+        self.session.execute(f'CREATE OR REPLACE TABLE "{name}" AS {self._sql}')
+        return FakeSnowparkFrame(self.session, f'SELECT * FROM "{name}"')
+
+    def save_as_table(self, table_name: List[str], mode: str = "errorifexists", **kwargs: Any) -> None:
+        target = ".".join(f'"{part}"' for part in table_name)
+        if mode == "append":
+            self.session.execute(f"INSERT INTO {target} {self._sql}")
+        else:
+            self.session.execute(f"CREATE OR REPLACE TABLE {target} AS {self._sql}")
+
+
+class FakeSession:
+
+    """Stand-in for ``snowflake.snowpark.Session``, ``login_round_trips``
+    round trips are spent creating it, as the login and warehouse resume do.
+    ``history`` holds every statement it ran with the query tag it ran under."""
+
+    login_round_trips = 3
+    connection_kwargs: Dict[str, Any] = {}
+
+    class builder:  # pylint: disable=invalid-name
+        @staticmethod
+        def configs(options: Dict[str, Any]) -> Any:
+            return FakeSession.builder
+
+        @staticmethod
+        def create() -> "FakeSession":
+            return FakeSession()
+
+    def __init__(self) -> None:
+        self._connection = FakeSnowflakeConnection(**self.connection_kwargs)
+        for _ in range(self.login_round_trips):
+            self._connection.round_trip()
+        self.query_tag: Optional[str] = None
+        self.history: List[tuple] = []
+        self.cached = 0
+
+    def execute(self, sql: str) -> "FakeSnowflakeCursor":
+        self.history.append((sql, self.query_tag))
+        return self._connection.cursor().execute(sql)
+
+    def sql(self, query: str) -> FakeSnowparkFrame:
+        return FakeSnowparkFrame(self, query)
+
+    def table(self, name: Union[str, List[str]]) -> FakeSnowparkFrame:
+        if not isinstance(name, str):
+            name = ".".join(f'"{part}"' for part in name)
+        return FakeSnowparkFrame(self, f"SELECT * FROM {name}")
+
+
+def fake_write_pandas(
+    conn: FakeSnowflakeConnection,
+    df: pd.DataFrame,
+    table_name: str,
+    database: Optional[str] = None,
+    schema: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    **kwargs: Any,
+) -> tuple:
+    """Stand-in for ``snowflake.connector.pandas_tools.write_pandas``: the
+    frame is serialized to Parquet, "uploaded" at the connection bandwidth
+    and inserted, with the same return value."""
+    chunk_size = chunk_size or max(len(df), 1)
+    target = f'"{schema}"."{table_name}"' if schema else f'"{table_name}"'
+    cursor = conn.db.cursor()
+    chunks = 0
+    with tempfile.TemporaryDirectory(prefix="fake_write_pandas_") as directory:
+        for start in range(0, max(len(df), 1), chunk_size):
+            path = os.path.join(directory, f"chunk_{chunks}.parquet")
+            df.iloc[start:start + chunk_size].to_parquet(path, index=False, compression=kwargs.get("compression", "snappy"))
+            conn.round_trip()
+            conn.transfer(os.path.getsize(path))
+            cursor.execute(f"INSERT INTO {target} BY NAME SELECT * FROM read_parquet('{path}')")
+            chunks += 1
+    conn.round_trip()
+    return True, chunks, len(df), []
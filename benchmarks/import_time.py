@@ -0,0 +1,112 @@
+"""  Measures how long importing the dataset modules and building a catalog
+with Snowflake entries takes, each in a fresh interpreter.
+
+Nothing here connects to Snowflake: building the catalog must not open a
+connection, and the heavy modules should only be imported on first load.
+
+    python benchmarks/import_time.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "pyarrow", "fsspec", "snowflake.connector", "snowflake.snowpark")
+CREDENTIALS = {"user": "benchmark", "account": "local", "password": ""}
+
+CATALOG = {
+    "snowflake_table": {
+        "type": "datasets.snowflake.SnowflakeTableDataSet",
+        "table_name": "T",
+        "schema": "S",
+        "database": "D",
+        "credentials": CREDENTIALS,
+    },
+    "snowflake_query": {
+        "type": "datasets.snowflake.SnowflakeQueryDataSet",
+        "sql": "SELECT 1",
+        "credentials": CREDENTIALS,
+    },
+    "snowpark_session": {
+        "type": "datasets.snowpark.SnowparkSessionDataSet",
+        "credentials": CREDENTIALS,
+    },
+    "snowpark_table": {
+        "type": "datasets.snowpark.SnowparkTableDataSet",
+        "table_name": "T",
+        "schema": "S",
+        "database": "D",
+        "credentials": CREDENTIALS,
+    },
+}
+
+SCENARIOS = {
+    "import datasets.snowflake": "import datasets.snowflake",
+    "import datasets.snowpark": "import datasets.snowpark",
+    "import datasets.dummies": "import datasets.dummies",
+    "build catalog": (
+        "from kedro.io import DataCatalog\n"
+        f"DataCatalog.from_config({CATALOG!r})"
+    ),
+}
+
+# runs the statement, then reports its time and which heavy modules really ran
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+seconds = time.perf_counter() - start
+loaded = [
+    name for name in {heavy!r}
+    if name in sys.modules and "lazy" not in type(sys.modules[name]).__name__.lower()
+]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def _probe(statement: str) -> Dict[str, object]:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> List[Dict[str, object]]:
+    results = []
+    for name, statement in SCENARIOS.items():
+        probes = [_probe(statement) for _ in range(repeat)]
+        results.append(
+            {
+                "scenario": name,
+                "median_seconds": statistics.median(probe["seconds"] for probe in probes),
+                "heavy_modules_loaded": ", ".join(probes[-1]["loaded"]) or "-",
+            }
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    width = max(len(result["scenario"]) for result in results)
+    print(f"{'scenario':<{width}}  median_seconds  heavy_modules_loaded")
+    for result in results:
+        print(f"{result['scenario']:<{width}}  {result['median_seconds']:>14.3f}  {result['heavy_modules_loaded']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""  Offline load and save benchmarks for the Snowflake datasets.
+
+The datasets run against ``FakeSnowflakeConnection``, a DuckDB database with a
+simulated round trip latency and bandwidth, over a grid of row counts, column
+counts and dtypes. Results are printed as a table and can be written to JSON
+and compared against a previous run to catch regressions:
+
+    python benchmarks/run_benchmarks.py --rows 10000 100000 --output new.json
+    python benchmarks/run_benchmarks.py --compare old.json --tolerance 0.2
+"""
+
+import argparse
+import collections.abc
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_snowflake import FakeSession, FakeSnowflakeConnection, FakeSnowparkFrame, fake_write_pandas  # noqa: E402
+from datasets import snowflake as snowflake_datasets  # noqa: E402
+from datasets import snowpark as snowpark_datasets  # noqa: E402
+from datasets.connection_pool import ConnectionPool  # noqa: E402
+from datasets.snowflake import (  # noqa: E402
+    SnowflakeParameterizedQueryDataSet,
+    SnowflakeQueryDataSet,
+    SnowflakeTableDataSet,
+)
+
+
+DTYPES = ("int", "float", "string", "mixed")
+CREDENTIALS = {"user": "benchmark", "account": "local", "password": "", "paramstyle": "pyformat"}
+
+# name -> (dataset, load_args or save_args)
+LOAD_SCENARIOS = {
+    "query_read_sql": ("query", {}),
+    "query_arrow": ("query", {"use_arrow": True}),
+    "query_chunked": ("query", {"use_arrow": True, "chunked": True}),
+    "query_parameterized": ("parameterized", {"use_arrow": True, "concat": True}),
+    "table_arrow": ("table", {"use_arrow": True}),
+    "table_compact": ("table", {"use_arrow": True, "compact_dtypes": True}),
+    "table_partitioned": ("table", {"use_arrow": True, "partition_by": {"column": "C0", "method": "hash"}}),
+    "table_unload": ("table", {"strategy": "unload", "unload": {"max_file_size": 4000000}}),
+    "table_arrow_output": ("table", {"output_type": "arrow"}),
+    "table_auto": ("table", {"strategy": "auto"}),
+    "snowpark_session": ("session", {}),
+}
+SAVE_SCENARIOS = {
+    "write_pandas": {},
+    "write_pandas_chunked": {"chunk_size": 25000},
+    "staged_parquet": {"serialize_processes": 2, "chunk_size": 25000},
+    "arrow_input": {"chunk_size": 25000},
+    "streamed_chunks": {"max_in_flight": 2},
+}
+STREAM_CHUNK_ROWS = 25000
+
+
+def make_frame(rows: int, columns: int, dtype: str, seed: int = 0) -> pd.DataFrame:
+    """Builds a deterministic frame of ``rows`` x ``columns`` of ``dtype``."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"value_{i}" for i in range(1000)], dtype=object)
+
+    def column(position: int) -> np.ndarray:
+        kind = dtype if dtype != "mixed" else ("int", "float", "string")[position % 3]
+        if kind == "int":
+            return rng.integers(0, 1_000_000, rows)
+        if kind == "float":
+            return rng.random(rows)
+        return words[rng.integers(0, len(words), rows)]
+
+    return pd.DataFrame({f"C{position}": column(position) for position in range(columns)})
+
+
+def measure(function: Callable[[], Any]) -> Dict[str, Any]:
+    """Runs ``function`` and returns its wall time and the peak of Python and
+    Arrow allocations in MB."""
+    gc.collect()
+    arrow_pool = pa.default_memory_pool()
+    arrow_start = arrow_pool.bytes_allocated()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_peak = max(arrow_pool.max_memory() - arrow_start, 0)
+    return {"result": result, "seconds": seconds, "peak_mb": (python_peak + arrow_peak) / 1e6}
+
+
+class Harness:
+
+    """Points the dataset classes at a fresh pool of fake connections and
+    seeds the benchmark tables."""
+
+    def __init__(self, path: str, latency: float, bandwidth: float) -> None:
+        self.database = "BENCH"
+        self.schema = "PUBLIC"
+        self.connection_kwargs = {"path": path, "latency": latency, "bandwidth": bandwidth}
+        self.pool = ConnectionPool(lambda **_: FakeSnowflakeConnection(**self.connection_kwargs))
+        self._patches = [
+            mock.patch.object(SnowflakeQueryDataSet, "pool", self.pool),
+            mock.patch.object(SnowflakeTableDataSet, "pool", self.pool),
+            mock.patch.object(SnowflakeParameterizedQueryDataSet, "pool", self.pool),
+            mock.patch.object(snowflake_datasets, "write_pandas", fake_write_pandas),
+            mock.patch.object(snowpark_datasets.sp, "Session", FakeSession),
+            mock.patch.object(snowpark_datasets.sp, "DataFrame", FakeSnowparkFrame),
+            mock.patch.object(FakeSession, "connection_kwargs", self.connection_kwargs),
+        ]
+
+    def __enter__(self) -> "Harness":
+        for patch in self._patches:
+            patch.start()
+        FakeSnowflakeConnection(**self.connection_kwargs).db.execute(f'CREATE SCHEMA IF NOT EXISTS "{self.schema}"')
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for patch in reversed(self._patches):
+            patch.stop()
+        self.pool.close_all()
+        SnowflakeTableDataSet.verified_objects.clear()
+        snowpark_datasets.SnowparkSessionDataSet.sessions.clear()
+
+    def seed(self, table: str, df: pd.DataFrame) -> None:
+        db = FakeSnowflakeConnection(**self.connection_kwargs).db.cursor()
+        db.register("seed_frame", df)
+        db.execute(f'CREATE OR REPLACE TABLE "{self.schema}"."{table}" AS SELECT * FROM seed_frame')
+        db.unregister("seed_frame")
+
+    def table_dataset(self, table: str, load_args: Optional[Dict[str, Any]] = None, save_args: Optional[Dict[str, Any]] = None) -> SnowflakeTableDataSet:
+        return SnowflakeTableDataSet(
+            table_name=table,
+            schema=self.schema,
+            database=self.database,
+            credentials=CREDENTIALS,
+            load_args=load_args,
+            save_args=save_args,
+        )
+
+    def query_dataset(self, table: str, load_args: Dict[str, Any]) -> SnowflakeQueryDataSet:
+        return SnowflakeQueryDataSet(
+            sql=f'SELECT * FROM "{self.database}"."{self.schema}"."{table}"',
+            credentials=CREDENTIALS,
+            load_args=load_args,
+        )
+
+    def parameterized_dataset(self, table: str, load_args: Dict[str, Any], partitions: int = 8) -> SnowflakeParameterizedQueryDataSet:
+        """Splits the table on the first column into ``partitions`` parameter sets."""
+        return SnowflakeParameterizedQueryDataSet(
+            sql=f'SELECT * FROM "{self.database}"."{self.schema}"."{table}" WHERE MOD(HASH("C0"), {partitions}) = %(partition)s',
+            parameters=[{"partition": partition} for partition in range(partitions)],
+            credentials=CREDENTIALS,
+            load_args=load_args,
+        )
+
+    def session_query(self, table: str) -> Callable[[], int]:
+        """Loads the session, logging in on every run, and pulls the table."""
+        dataset = snowpark_datasets.SnowparkSessionDataSet(credentials=CREDENTIALS)
+
+        def _run() -> int:
+            snowpark_datasets.SnowparkSessionDataSet.sessions.clear()
+            return len(dataset.load().sql(f'SELECT * FROM "{self.schema}"."{table}"').to_pandas())
+
+        return _run
+
+
+def _load(dataset: Any) -> int:
+    data = dataset.load()
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    if isinstance(data, pa.Table):
+        return data.num_rows
+    if not isinstance(data, collections.abc.Iterator):
+        return len(data)  # a polars frame counts its rows, iterating it yields columns
+    return sum(_rows(chunk) for chunk in data)
+
+
+def _rows(chunk: Any) -> int:
+    return chunk.num_rows if isinstance(chunk, pa.Table) else len(chunk)
+
+
+def save_input(name: str, df: pd.DataFrame) -> Callable[[], Any]:
+    """Returns a function building what the save scenario ``name`` saves."""
+    if name == "arrow_input":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        return lambda: table
+    if name == "streamed_chunks":
+        return lambda: (df.iloc[start:start + STREAM_CHUNK_ROWS].copy() for start in range(0, len(df), STREAM_CHUNK_ROWS))
+    return df.copy
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    with Harness(":memory:", args.latency, args.bandwidth) as harness:
+        for rows, columns, dtype in itertools.product(args.rows, args.columns, args.dtypes):
+            df = make_frame(rows, columns, dtype)
+            frame_mb = df.memory_usage(deep=True).sum() / 1e6
+            table = f"BENCH_{rows}_{columns}_{dtype}".upper()
+            harness.seed(table, df)
+
+            scenarios = []
+            for name, (kind, load_args) in LOAD_SCENARIOS.items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                if kind == "session":
+                    scenarios.append(("load", name, harness.session_query(table)))
+                    continue
+                build = {
+                    "query": harness.query_dataset,
+                    "parameterized": harness.parameterized_dataset,
+                    "table": harness.table_dataset,
+                }[kind]
+                dataset = build(table, load_args=load_args)
+                scenarios.append(("load", name, lambda dataset=dataset: _load(dataset)))
+
+            for name, save_args in SAVE_SCENARIOS.items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                dataset = harness.table_dataset(f"{table}_SAVE", save_args=save_args)
+                data = save_input(name, df)
+                scenarios.append(("save", name, lambda dataset=dataset, data=data: dataset.save(data()) or len(df)))
+
+            for operation, name, function in scenarios:
+                timings = [measure(function) for _ in range(args.repeat)]
+                best = min(timings, key=lambda timing: timing["seconds"])
+                if best["result"] != rows:
+                    raise AssertionError(f"{name} handled {best['result']} rows, expected {rows}")
+                results.append(
+                    {
+                        "operation": operation,
+                        "scenario": name,
+                        "rows": rows,
+                        "columns": columns,
+                        "dtype": dtype,
+                        "seconds": best["seconds"],
+                        "rows_per_second": best["result"] / best["seconds"],
+                        "mb_per_second": frame_mb / best["seconds"],
+                        "peak_mb": max(timing["peak_mb"] for timing in timings),
+                    }
+                )
+    return results
+
+
+def _key(result: Dict[str, Any]) -> tuple:
+    return (result["operation"], result["scenario"], result["rows"], result["columns"], result["dtype"])
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Returns a line per scenario that got slower or used more memory than
+    ``baseline`` by more than ``tolerance``, as a fraction."""
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if old[metric] and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{' '.join(str(part) for part in _key(result))}: "
+                    f"{metric} {old[metric]:.3f} -> {result[metric]:.3f}"
+                )
+    return regressions
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    frame = pd.DataFrame(results)
+    if frame.empty:
+        return "no scenarios ran"
+    frame = frame.round({"seconds": 3, "rows_per_second": 0, "mb_per_second": 2, "peak_mb": 1})
+    return frame.to_string(index=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--columns", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--dtypes", nargs="+", choices=DTYPES, default=list(DTYPES))
+    parser.add_argument("--scenarios", nargs="+", choices=list(LOAD_SCENARIOS) + list(SAVE_SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per round trip")
+    parser.add_argument("--bandwidth", type=float, default=50e6, help="bytes per second, 0 for unlimited")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the fastest is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"latency": args.latency, "bandwidth": args.bandwidth, "results": results}, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""  Resumable uploads for large saves.
+
+The data is split into numbered chunks named after their content and
+uploaded to a permanent stage, and a local JSON manifest records every chunk
+that made it. When a save fails partway, the next attempt finds the chunks
+that are already staged in the manifest and only uploads the missing ones.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import instrumentation
+from .fingerprint import frame_fingerprint
+from .lazy import lazy_import
+from .staging import _file_url, _write_parquet_chunk
+
+
+__all__ = ["UploadCheckpoint", "with_backoff", "upload_chunks"]
+
+pd = lazy_import("pandas")
+connector = lazy_import("snowflake.connector")
+
+logger = logging.getLogger(__name__)
+
+
+def _retryable_errors() -> Tuple[type, ...]:
+    # network blips and suspended warehouses, not bad sql or permissions
+    return (connector.errors.OperationalError, connector.errors.InterfaceError)
+
+
+def with_backoff(
+    function: Callable[[], Any],
+    retries: int = 5,
+    backoff: float = 1.0,
+    max_backoff: float = 60.0,
+    description: str = "Upload",
+) -> Any:
+    """Calls ``function``, retrying it up to ``retries`` times on connection
+    errors and waiting ``backoff`` seconds, doubled after every attempt up to
+    ``max_backoff``, before each retry."""
+    for attempt in range(retries + 1):
+        try:
+            return function()
+        except _retryable_errors() as e:
+            if attempt == retries:
+                raise
+            delay = min(backoff * 2 ** attempt, max_backoff)
+            logger.warning("%s failed (%s), retry %d of %d in %.1fs", description, e, attempt + 1, retries, delay)
+            time.sleep(delay)
+    return None
+
+
+class UploadCheckpoint:
+
+    """``UploadCheckpoint`` is the local manifest of the chunks a save of
+    ``target`` has uploaded to ``location`` so far. It is kept in
+    ``directory`` as one JSON file per target and rewritten atomically after
+    every chunk, a manifest for another stage is started over.
+    """
+
+    def __init__(self, directory: str, target: str, stage: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]+", "_", target) + ".json")
+        self.target = target
+        self._lock = threading.Lock()
+
+        manifest: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+
+        if manifest.get("target") == target and manifest.get("location", "").startswith(f"@{stage}/"):
+            self.location = manifest["location"]
+            self.chunks: Dict[str, Dict[str, int]] = manifest["chunks"]
+        else:
+            self.location = f"@{stage}/kedro_checkpoint_{uuid.uuid4().hex}/"
+            self.chunks = {}
+
+    def add(self, name: str, rows: int, nbytes: int) -> None:
+        """Records an uploaded chunk and writes the manifest."""
+        with self._lock:
+            self.chunks[name] = {"rows": rows, "bytes": nbytes}
+            temporary = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, "w", encoding="utf-8") as manifest_file:
+                json.dump({"target": self.target, "location": self.location, "chunks": self.chunks}, manifest_file)
+            os.replace(temporary, self.path)
+
+    def remove(self) -> None:
+        """Deletes the manifest once the save has completed."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _upload_chunk(
+    conn: Any,
+    path: str,
+    name: str,
+    rows: int,
+    checkpoint: UploadCheckpoint,
+    op: Any,
+    retry_args: Dict[str, Any],
+) -> None:
+    """Uploads one chunk from a worker thread and records it in the manifest."""
+
+    def _put() -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"PUT '{_file_url(path)}' {checkpoint.location} AUTO_COMPRESS=FALSE SOURCE_COMPRESSION=NONE OVERWRITE=TRUE"
+            )
+        finally:
+            cursor.close()
+
+    with instrumentation.attach(op), instrumentation.phase("upload"):
+        with_backoff(_put, description=f"Uploading {name}", **retry_args)
+    checkpoint.add(name, rows, os.path.getsize(path))
+    os.remove(path)
+
+
+def upload_chunks(
+    conn: Any,
+    chunks: Iterable[Any],
+    checkpoint: UploadCheckpoint,
+    directory: str,
+    compression: str = "snappy",
+    max_in_flight: int = 2,
+    retry_args: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], int, int, int]:
+    """Names every pandas or Arrow chunk of ``chunks`` after its position and
+    content fingerprint and uploads the ones missing from ``checkpoint``,
+    at most ``max_in_flight`` at a time. Returns the names of all the chunks
+    in order, their rows, their staged bytes and how many were already
+    staged by an earlier attempt."""
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    op = instrumentation.current()
+    retry_args = retry_args or {}
+    max_in_flight = max(int(max_in_flight), 1)
+
+    names: List[str] = []
+    rows = 0
+    resumed = 0
+    uploads: deque = deque()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            with instrumentation.phase("fingerprint"):
+                name = f"chunk_{len(names):06d}_{frame_fingerprint(chunk)[:20]}.parquet"
+            names.append(name)
+            rows += len(chunk)
+            if name in checkpoint.chunks:
+                resumed += 1
+                continue
+
+            path = os.path.join(directory, name)
+            with instrumentation.phase("serialize"):
+                if isinstance(chunk, pd.DataFrame):
+                    _write_parquet_chunk(chunk, path, compression)
+                else:
+                    pq.write_table(chunk, path, compression=compression)
+
+            while len(uploads) >= max_in_flight:
+                uploads.popleft().result()
+            uploads.append(executor.submit(_upload_chunk, conn, path, name, len(chunk), checkpoint, op, retry_args))
+
+        while uploads:
+            uploads.popleft().result()
+
+    staged_bytes = sum(checkpoint.chunks[name]["bytes"] for name in names)
+    return names, rows, staged_bytes, resumed
@@ -0,0 +1,209 @@
+"""  Thread-safe pool of Snowflake connections keyed by connection arguments."""
+
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from kedro.io.core import DataSetError
+
+
+__all__ = ["ConnectionPool"]
+
+
+class ConnectionPool:
+
+    """``ConnectionPool`` hands out connections per thread. Connections are
+    grouped by a hash of their connection arguments so datasets configured
+    with a different role, warehouse or user never share a connection.
+
+    Each group holds at most ``max_size`` connections, idle connections are
+    closed after ``idle_timeout`` seconds and connections that have been idle
+    for longer than ``health_check_interval`` seconds are checked with a
+    ``SELECT 1`` before being handed out again. A checkout waits at most
+    ``checkout_timeout`` seconds for a connection to be released, an
+    ``overflow`` checkout opens a connection past ``max_size`` instead.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[..., Any],
+        max_size: int = 4,
+        idle_timeout: Optional[float] = 600,
+        health_check_interval: Optional[float] = 60,
+        checkout_timeout: Optional[float] = 300,
+    ) -> None:
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._condition = threading.Condition()
+        # key -> [(connection, time it was returned)]
+        self._idle: Dict[str, List[Tuple[Any, float]]] = {}
+        # key -> number of open connections, idle or checked out
+        self._open: Dict[str, int] = {}
+
+    def configure(self, **pool_args: Any) -> None:
+        """Updates ``max_size``, ``idle_timeout``, ``health_check_interval`` or
+        ``checkout_timeout``."""
+        with self._condition:
+            for name, value in pool_args.items():
+                if name not in ("max_size", "idle_timeout", "health_check_interval", "checkout_timeout"):
+                    raise DataSetError(f"Unknown connection pool argument '{name}'.")
+                setattr(self, name, value)
+            self._condition.notify_all()
+
+    @staticmethod
+    def make_key(connection_kwargs: Dict[str, Any]) -> str:
+        """Hashes the connection arguments, so secrets are never used as keys."""
+        raw_key = json.dumps(connection_kwargs, sort_keys=True, default=str)
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    @staticmethod
+    def _is_healthy(connection: Any, run_query: bool) -> bool:
+        if connection.is_closed():
+            return False
+        if not run_query:
+            return True
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return True
+
+    def _evict_idle(self, now: float) -> List[Any]:
+        """Drops connections idle for longer than ``idle_timeout``, must be
+        called while holding the lock. Returns the connections to close."""
+        if self.idle_timeout is None:
+            return []
+
+        expired = []
+        for key, idle in self._idle.items():
+            keep = []
+            for connection, returned_at in idle:
+                if now - returned_at > self.idle_timeout:
+                    expired.append(connection)
+                    self._open[key] -= 1
+                else:
+                    keep.append((connection, returned_at))
+            self._idle[key] = keep
+        return expired
+
+    def checkout(
+        self, connection_kwargs: Dict[str, Any], timeout: Optional[float] = None, overflow: bool = False
+    ) -> Any:
+        """Returns a connection for the calling thread, opening a new one if
+        none is idle. Blocks while ``max_size`` connections are checked out,
+        for at most ``timeout`` seconds (``checkout_timeout`` by default).
+
+        ``overflow`` opens a connection past ``max_size`` instead of waiting,
+        for loads that keep theirs until a consumer has read them. Releasing
+        a connection while the group is over ``max_size`` closes it."""
+        key = self.make_key(connection_kwargs)
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                now = time.time()
+                expired = self._evict_idle(now)
+                if expired:
+                    self._condition.notify_all()
+
+                candidate = None
+                while True:
+                    idle = self._idle.setdefault(key, [])
+                    if idle:
+                        candidate = idle.pop()
+                        break
+                    if overflow or self._open.get(key, 0) < self.max_size:
+                        self._open[key] = self._open.get(key, 0) + 1
+                        break
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise DataSetError(
+                            f"Timed out waiting for a Snowflake connection, all "
+                            f"{self.max_size} connections are checked out."
+                        )
+                    self._condition.wait(remaining)
+
+            for connection in expired:
+                self._close(connection)
+
+            if candidate is None:
+                try:
+                    return self._connect(**connection_kwargs)
+                except Exception:
+                    self._discard(key)
+                    raise
+
+            connection, returned_at = candidate
+            run_query = (
+                self.health_check_interval is not None
+                and time.time() - returned_at > self.health_check_interval
+            )
+            if self._is_healthy(connection, run_query):
+                return connection
+
+            # unhealthy connections are dropped and the next one is tried
+            self._close(connection)
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        with self._condition:
+            self._open[key] -= 1
+            self._condition.notify()
+
+    def release(self, connection_kwargs: Dict[str, Any], connection: Any, discard: bool = False) -> None:
+        """Returns a checked out connection to the pool, or closes it when
+        ``discard`` is set, it has been closed in the meantime or the group
+        holds more than ``max_size`` connections after overflow checkouts."""
+        key = self.make_key(connection_kwargs)
+
+        with self._condition:
+            if not (discard or connection.is_closed() or self._open.get(key, 0) > self.max_size):
+                self._idle.setdefault(key, []).append((connection, time.time()))
+                self._condition.notify()
+                return
+
+        self._close(connection)
+        self._discard(key)
+
+    @contextmanager
+    def connection(self, connection_kwargs: Dict[str, Any]) -> Iterator[Any]:
+        """Checks out a connection for the duration of the ``with`` block."""
+        connection = self.checkout(connection_kwargs)
+        try:
+            yield connection
+        finally:
+            self.release(connection_kwargs, connection)
+
+    def close_all(self) -> None:
+        """Closes every idle connection. Checked out connections go back to
+        the pool as usual when they are released."""
+        with self._condition:
+            idle = [connection for entries in self._idle.values() for connection, _ in entries]
+            for key, entries in self._idle.items():
+                self._open[key] -= len(entries)
+            self._idle = {}
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._close(connection)
@@ -0,0 +1,163 @@
+"""  Shrinks the memory footprint of dataframes loaded from Snowflake."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from kedro.io.core import DataSetError
+
+from .lazy import lazy_import
+
+
+__all__ = ["compact_dtypes", "column_types"]
+
+pd = lazy_import("pandas")
+
+DTYPE_BACKENDS = ("numpy_nullable", "pyarrow")
+
+# type codes of ``cursor.description``, see snowflake.connector.constants
+FIXED_TYPE_CODE = 0
+TEXT_TYPE_CODE = 2
+# float64 holds every decimal of up to 15 significant digits exactly
+FLOAT64_DIGITS = 15
+# the frame attribute readers keep the column types of the result in
+COLUMN_TYPES_ATTR = "snowflake_column_types"
+
+ColumnType = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def column_types(description: Sequence[Any]) -> Dict[str, ColumnType]:
+    """Maps the column names of a ``cursor.description`` to their type code,
+    precision and scale."""
+    return {column[0]: (column[1], column[4], column[5]) for column in description}
+
+
+def _column_bytes(column: pd.Series) -> int:
+    return int(column.memory_usage(index=False, deep=True))
+
+
+def _decimal_precision(values: pd.Series) -> Tuple[int, int]:
+    """Measures the precision and scale of Decimal values, for frames
+    without result metadata."""
+    scale = max(max(-value.as_tuple().exponent, 0) for value in values)
+    integer_digits = max(len(value.as_tuple().digits) + value.as_tuple().exponent for value in values)
+    return min(max(integer_digits, 1) + scale, 38), scale
+
+
+def _compact_decimals(
+    column: pd.Series,
+    precision: int,
+    scale: int,
+    downcast_floats: bool,
+    dtype_backend: Optional[str],
+    lossy_decimals: bool,
+) -> pd.Series:
+    if precision <= FLOAT64_DIGITS or lossy_decimals:
+        return pd.to_numeric(column.astype("float64"), downcast="float" if downcast_floats else None)
+    if dtype_backend == "pyarrow":
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        return column.astype(pd.ArrowDtype(pa.decimal128(precision, scale)))
+    return column
+
+
+def _compact_column(
+    column: pd.Series,
+    column_type: Optional[ColumnType],
+    category_threshold: Optional[float],
+    downcast_floats: bool,
+    dtype_backend: Optional[str],
+    lossy_decimals: bool,
+) -> pd.Series:
+    type_code, precision, scale = column_type or (None, None, None)
+    non_null = column.dropna()
+
+    if column.dtype == object and len(non_null):
+        kind = pd.api.types.infer_dtype(non_null, skipna=True)
+
+        # NUMBER columns with a scale come back as Decimal objects
+        if kind == "decimal" and type_code in (None, FIXED_TYPE_CODE):
+            if precision is None or scale is None:
+                precision, scale = _decimal_precision(non_null)
+            return _compact_decimals(column, precision, scale, downcast_floats, dtype_backend, lossy_decimals)
+
+        if (
+            category_threshold is not None
+            and kind == "string"
+            and type_code in (None, TEXT_TYPE_CODE)
+            and non_null.nunique() <= category_threshold * len(column)
+        ):
+            return column.astype("category")
+        return column
+
+    if pd.api.types.is_bool_dtype(column.dtype):
+        return column
+
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return pd.to_numeric(column, downcast="integer")
+
+    if pd.api.types.is_float_dtype(column.dtype) and downcast_floats:
+        return pd.to_numeric(column, downcast="float")
+
+    return column
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    category_threshold: Optional[float] = 0.5,
+    downcast_floats: bool = False,
+    dtype_backend: Optional[str] = None,
+    lossy_decimals: bool = False,
+    types: Optional[Dict[str, ColumnType]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Downcasts the dtypes the result metadata produced to the narrowest
+    integer (and optionally float) types, turns string columns with at most
+    ``category_threshold`` unique values per row into ``category`` and can
+    switch to pandas nullable or Arrow backed dtypes, which also turns
+    NUMBER columns that came back as floats because of nulls into integers.
+
+    ``types`` are the ``column_types`` of the result, by default the ones
+    the reader kept in ``df.attrs``. NUMBER columns with a scale become
+    float64 when their precision fits it exactly, wider ones stay Decimal
+    objects (``decimal128`` with the pyarrow backend) unless
+    ``lossy_decimals`` is set. Without metadata the precision is measured
+    from the values.
+
+    Returns the compacted dataframe and a per column report of the memory
+    used before and after.
+    """
+    if dtype_backend is not None and dtype_backend not in DTYPE_BACKENDS:
+        raise DataSetError(f"'dtype_backend' must be one of {DTYPE_BACKENDS}.")
+
+    before = {name: (str(df[name].dtype), _column_bytes(df[name])) for name in df.columns}
+    if types is None:
+        types = df.attrs.get(COLUMN_TYPES_ATTR, {})
+
+    compacted = pd.DataFrame(
+        {
+            name: _compact_column(
+                df[name], types.get(name), category_threshold, downcast_floats, dtype_backend, lossy_decimals
+            )
+            for name in df.columns
+        },
+        index=df.index,
+    )
+    if dtype_backend is not None:
+        compacted = compacted.convert_dtypes(dtype_backend=dtype_backend)
+
+    report = pd.DataFrame(
+        [
+            {
+                "column": name,
+                "before_dtype": before[name][0],
+                "after_dtype": str(compacted[name].dtype),
+                "before_bytes": before[name][1],
+                "after_bytes": _column_bytes(compacted[name]),
+            }
+            for name in df.columns
+        ],
+        columns=["column", "before_dtype", "after_dtype", "before_bytes", "after_bytes"],
+    )
+    report["saved_bytes"] = report["before_bytes"] - report["after_bytes"]
+
+    return compacted, report
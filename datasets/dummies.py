@@ -14,18 +14,14 @@
 
 """  Starting from - ``SQLDataSet`` to load and save data to a SQL backend."""
 
+from __future__ import annotations
+
 import copy
 import re
 from pathlib import PurePosixPath
 from typing import Any, Dict, NoReturn, Optional
 import re
 
-import fsspec
-import pandas as pd
-
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
-
 
 # from sqlalchemy import create_engine
 # from sqlalchemy.exc import NoSuchModuleError
@@ -37,11 +33,60 @@ from kedro.io.core import (
     get_protocol_and_path,
 )
 
+from .lazy import lazy_import
+from .snowflake import SnowflakeQueryDataSet
 
+fsspec = lazy_import("fsspec")
+pd = lazy_import("pandas")
 
-class TableNameDataSet(AbstractDataSet[None, pd.DataFrame]):
 
-    """`TableNameDataSet``use table name as a dummy"""
+REPLICA_FORMATS = {".parquet": "parquet", ".duckdb": "duckdb", ".db": "duckdb"}
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sample_sql(full_table_name: str, rows: Optional[int] = None, fraction: Optional[float] = None, stratify_by: Optional[str] = None) -> str:
+    """Builds a deterministic sample query. Rows are ranked by a hash of their
+    content instead of ``SAMPLE``, so the same table always gives the same sample."""
+    if (rows is None) == (fraction is None):
+        raise DataSetError("'local_replica' needs exactly one of 'rows' or 'fraction'.")
+    if fraction is not None and not 0 < fraction <= 1:
+        raise DataSetError("'fraction' must be between 0 and 1.")
+
+    sql = f"SELECT * FROM {full_table_name}"
+
+    if stratify_by is None:
+        if rows is not None:
+            return f"{sql} ORDER BY HASH(*) LIMIT {int(rows)}"
+        return f"{sql} WHERE ABS(MOD(HASH(*), 1000000)) < {int(fraction * 1000000)}"
+
+    # with a stratification key ``rows`` is per stratum, ``fraction`` keeps
+    # the same share of every stratum
+    partition = f"PARTITION BY {_quote_identifier(stratify_by)}"
+    if rows is not None:
+        return f"{sql} QUALIFY ROW_NUMBER() OVER ({partition} ORDER BY HASH(*)) <= {int(rows)}"
+    return (
+        f"{sql} QUALIFY ROW_NUMBER() OVER ({partition} ORDER BY HASH(*)) "
+        f"<= CEIL(COUNT(*) OVER ({partition}) * {float(fraction)})"
+    )
+
+
+class TableNameDataSet(AbstractDataSet[None, "pd.DataFrame"]):
+
+    """`TableNameDataSet``use table name as a dummy
+
+    With ``load_args.local_replica`` the load returns a ``(table_name, data)``
+    pair instead, where ``data`` is a deterministic sample of the table that
+    is pulled once and kept in a local Parquet or DuckDB file, e.g.
+    ``{"path": "data/01_raw/orders.parquet", "rows": 10000, "stratify_by": "REGION"}``
+    or ``{"path": "data/01_raw/orders.duckdb", "fraction": 0.01}``.
+
+    Saving a ``SqlQuery`` from a SQL node runs ``CREATE OR REPLACE TABLE ... AS``
+    the query with ``credentials``. ``save_args.persist`` marks the table as
+    one that ``datasets.fusion`` always materializes.
+    """
     DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
     DEFAULT_SAVE_ARGS: Dict[str, Any] = {}
 
@@ -52,8 +97,10 @@ class TableNameDataSet(AbstractDataSet[None, pd.DataFrame]):
         database:str,
         load_args: Dict[str, Any] = None,
         save_args: Dict[str, Any] = None,
+        credentials: Dict[str, Any] = None,
     ) -> None:
-        """Creates a new ``SnowflakeQueryDataSet``.
+        """Creates a new ``TableNameDataSet``. ``credentials`` are only needed
+        to pull the local replica the first time and to save SQL queries.
         """
         if not table_name:
             raise DataSetError("'table_name' argument cannot be empty.")
@@ -77,24 +124,112 @@ class TableNameDataSet(AbstractDataSet[None, pd.DataFrame]):
         self._load_args["database"] = database
         self._save_args["database"] = database
 
+        self.persist = bool(self._save_args.pop("persist", False))
+
+        self._replica = self._load_args.pop("local_replica", None)
+        if self._replica is not None:
+            if not self._replica.get("path"):
+                raise DataSetError("'path' must be passed for the 'local_replica'.")
+            if PurePosixPath(self._replica["path"]).suffix not in REPLICA_FORMATS:
+                raise DataSetError(f"'local_replica' path must end with one of {list(REPLICA_FORMATS)}.")
+
+            # validate the sample settings up front
+            _sample_sql(self._full_table_name(), self._replica.get("rows"), self._replica.get("fraction"), self._replica.get("stratify_by"))
+
+        self._credentials = credentials
+
+
+    def _full_table_name(self) -> str:
+        return ".".join(_quote_identifier(self._load_args[part]) for part in ("database", "schema", "table_name"))
+
 
     def _load(self) -> pd.DataFrame:
+        table_name = f"""{self._load_args["database"]}.{self._load_args["schema"]}.{self._load_args["table_name"]}"""
+
+        if self._replica is None:
+            return table_name
+
+        return table_name, self._load_replica()
+
+
+    def _load_replica(self) -> pd.DataFrame:
+        """Reads the local replica, pulling the sample from Snowflake first
+        if it has not been materialized yet."""
+        path = self._replica["path"]
+        replica_format = REPLICA_FORMATS[PurePosixPath(path).suffix]
+        fs = fsspec.filesystem("file")
+
+        if not fs.exists(path):
+            self._materialize_replica(path, replica_format)
+
+        if replica_format == "parquet":
+            return pd.read_parquet(path)
+
+        import duckdb  # pylint: disable=import-outside-toplevel
 
-        return f"""{self._load_args["database"]}.{self._load_args["schema"]}.{self._load_args["table_name"]}"""
+        with duckdb.connect(path, read_only=True) as connection:
+            return connection.execute(f"SELECT * FROM {_quote_identifier(self._load_args['table_name'])}").df()
+
+
+    def _materialize_replica(self, path: str, replica_format: str) -> None:
+        if not self._credentials:
+            raise DataSetError(
+                f"The local replica '{path}' does not exist yet, pass 'credentials' to pull it from Snowflake."
+            )
+        if replica_format == "duckdb":
+            try:
+                import duckdb  # pylint: disable=import-outside-toplevel
+            except ImportError as e:
+                raise DataSetError("duckdb is required for '.duckdb' replicas, ``pip install duckdb``.") from e
+
+        sql = _sample_sql(self._full_table_name(), self._replica.get("rows"), self._replica.get("fraction"), self._replica.get("stratify_by"))
+        with SnowflakeQueryDataSet.pool.connection(self._credentials) as connection:
+            df = SnowflakeQueryDataSet.read_pandas_from_snowflake(connection, sql=sql)
+        if df is None:
+            raise DataSetError(f"Pulling the local replica failed for {sql}")
+
+        fsspec.filesystem("file").makedirs(str(PurePosixPath(path).parent), exist_ok=True)
+
+        # write next to the target first so an interrupted pull is never read back
+        tmp_path = f"{path}.tmp"
+        if replica_format == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            with duckdb.connect(tmp_path) as connection:
+                connection.register("replica", df)
+                connection.execute(f"CREATE TABLE {_quote_identifier(self._load_args['table_name'])} AS SELECT * FROM replica")
+        fsspec.filesystem("file").mv(tmp_path, path)
 
 
     def _save(self, data: pd.DataFrame) -> None:
+        # kedro.runner is slow to import, only the fusion module needs it
+        from .fusion import SqlQuery  # pylint: disable=import-outside-toplevel
+
+        if isinstance(data, SqlQuery):
+            self._create_table(data.sql)
 
         return f"""{self._save_args["database"]}.{self._save_args["schema"]}.{self._save_args["table_name"]}"""
 
 
+    def _create_table(self, sql: str) -> None:
+        if not self._credentials:
+            raise DataSetError(f"Pass 'credentials' to create {self._full_table_name()} from a SQL node.")
+
+        with SnowflakeQueryDataSet.pool.connection(self._credentials) as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"CREATE OR REPLACE TABLE {self._full_table_name()} AS {sql}")
+            finally:
+                cursor.close()
+
+
     def _describe(self) -> Dict[str, Any]:
         """Returns a dict that describes the attributes of the dataset"""
 
         return 
 
 
-class SprocNameDataSet(AbstractDataSet[None, pd.DataFrame]):
+class SprocNameDataSet(AbstractDataSet[None, "pd.DataFrame"]):
 
     """`TableNameDataSet``use table name as a dummy"""
     DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
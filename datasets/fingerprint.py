@@ -0,0 +1,70 @@
+"""  Content fingerprints of dataframes and Arrow tables, so saves of data
+that hasn't changed since the last run can be skipped."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from kedro.io.core import DataSetError
+
+from .lazy import lazy_import
+
+
+__all__ = ["frame_fingerprint"]
+
+pd = lazy_import("pandas")
+
+# bumped whenever the hashing changes, so old fingerprints never match
+FINGERPRINT_VERSION = "1"
+
+
+class _HashSink:
+
+    """File-like object that feeds everything written to it into a hash."""
+
+    def __init__(self, hasher: Any) -> None:
+        self._hasher = hasher
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._hasher.update(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def frame_fingerprint(data: Any) -> str:
+    """Returns a hex sha256 of the column names, types and values of a pandas
+    dataframe or an Arrow table. The index of a dataframe is ignored.
+
+    Dataframes are hashed row-wise with ``pd.util.hash_pandas_object``, Arrow
+    tables by streaming their IPC serialization into the hash, so neither is
+    copied. Arrow tables with the same values but a different chunk layout
+    can get different fingerprints.
+    """
+    hasher = hashlib.sha256(FINGERPRINT_VERSION.encode())
+
+    if isinstance(data, pd.DataFrame):
+        schema = [[str(column), dtype.name] for column, dtype in data.dtypes.items()]
+        hasher.update(json.dumps(schema).encode())
+        try:
+            hashes = pd.util.hash_pandas_object(data, index=False)
+        except TypeError as e:
+            raise DataSetError(
+                f"Cannot fingerprint the dataframe, its values must be hashable: {e}"
+            ) from e
+        hasher.update(hashes.to_numpy().tobytes())
+        return hasher.hexdigest()
+
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    hasher.update(data.schema.to_string(show_schema_metadata=False).encode())
+    with pa.ipc.new_stream(pa.PythonFile(_HashSink(hasher), mode="w"), data.schema) as writer:
+        writer.write_table(data)
+    return hasher.hexdigest()
@@ -0,0 +1,271 @@
+"""  Fuses chains of SQL nodes into one query per materialized table.
+
+A SQL node returns a ``SELECT`` over the tables of its inputs instead of
+data, e.g.
+
+    sql_node(
+        'SELECT "REGION", SUM("AMOUNT") AS "AMOUNT" FROM {orders} GROUP BY 1',
+        inputs={"orders": "clean_orders"},
+        outputs="revenue_by_region",
+    )
+
+and a ``TableNameDataSet`` output runs it as ``CREATE OR REPLACE TABLE ... AS``.
+Run as is, every step is written to a table and scanned again by the next
+one. ``fuse_sql_nodes`` (or ``SqlFusionRunner``) rewrites the pipeline so
+each output that has to exist as a table is built by a single statement that
+inlines its upstream SQL nodes as CTEs. An output of a SQL node is
+materialized when its catalog entry has ``save_args.persist: true``, when it
+is a free output of the pipeline or when a node other than a SQL node reads
+it, every other one only lives inside the fused queries.
+
+Stored procedure calls have side effects and cannot be inlined into a query,
+so nodes reading or writing a ``SprocNameDataSet`` are never fused.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from kedro.io import DataCatalog
+from kedro.io.core import DataSetError
+from kedro.pipeline import Pipeline, node
+from kedro.pipeline.node import Node
+from kedro.runner import SequentialRunner
+
+
+__all__ = ["SqlQuery", "sql_node", "fuse_sql_nodes", "compile_sql", "SqlFusionRunner"]
+
+
+class SqlQuery:
+
+    """``SqlQuery`` is the ``SELECT`` a SQL node returns, a ``TableNameDataSet``
+    saves it by creating its table from the query."""
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+
+    def __repr__(self) -> str:
+        return f"SqlQuery({self.sql!r})"
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _table_reference(value: Any) -> str:
+    """The sql a SQL node puts in place of one of its inputs."""
+    if isinstance(value, SqlQuery):
+        # an upstream SQL node that wasn't materialized
+        return f"({value.sql})"
+    if isinstance(value, tuple):
+        # a ``TableNameDataSet`` with a local replica loads (table_name, data)
+        value = value[0]
+    if not isinstance(value, str):
+        raise DataSetError(
+            f"SQL node inputs must be table names or SQL queries, got '{type(value).__name__}'."
+        )
+    return value
+
+
+class _SqlTemplate:
+
+    """The function of a SQL node: ``sql`` with a ``{placeholder}`` per input
+    that is filled with the input's table name when the node runs."""
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self.__name__ = "sql"
+
+    def placeholders(self) -> Set[str]:
+        return {field for _, field, _, _ in string.Formatter().parse(self.sql) if field is not None}
+
+    def render(self, references: Dict[str, str]) -> str:
+        """Replaces the placeholders with ``references``, which are kept as
+        sql, literal braces stay escaped so the result is a template again."""
+        parts = []
+        for literal, field, _, _ in string.Formatter().parse(self.sql):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is not None:
+                parts.append(references[field])
+        return "".join(parts)
+
+    def __call__(self, **tables: Any) -> SqlQuery:
+        return SqlQuery(self.sql.format(**{name: _table_reference(value) for name, value in tables.items()}))
+
+
+def sql_node(
+    sql: str,
+    inputs: Union[str, List[str], Dict[str, str]],
+    outputs: str,
+    name: Optional[str] = None,
+    tags: Optional[Union[str, List[str]]] = None,
+    namespace: Optional[str] = None,
+) -> Node:
+    """Creates a node that returns ``sql`` as a ``SqlQuery`` with its
+    ``{placeholders}`` replaced by the table names of ``inputs``. ``inputs``
+    maps placeholders to dataset names, a list or a single name uses the
+    dataset names themselves as placeholders. Literal braces are written
+    ``{{`` and ``}}``.
+    """
+    if not isinstance(outputs, str):
+        raise DataSetError("A SQL node returns one query, 'outputs' must be a single dataset name.")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    if not isinstance(inputs, dict):
+        inputs = {dataset: dataset for dataset in inputs}
+
+    template = _SqlTemplate(sql)
+    missing = template.placeholders() ^ set(inputs)
+    if missing:
+        raise DataSetError(
+            f"The placeholders of the SQL node must match its inputs, mismatched {sorted(missing)}."
+        )
+    return node(template, inputs=inputs, outputs=outputs, name=name, tags=tags, namespace=namespace)
+
+
+def _sql_template(node_: Node) -> Optional[_SqlTemplate]:
+    return node_.func if isinstance(node_.func, _SqlTemplate) else None
+
+
+def _input_mapping(node_: Node) -> Dict[str, str]:
+    """Placeholder to dataset name of a SQL node, also after the node was
+    namespaced by a modular pipeline."""
+    return dict(node_._inputs)  # pylint: disable=protected-access
+
+
+def _cte_name(dataset: str) -> str:
+    return re.sub(r"\W+", "_", dataset)
+
+
+class _Fuser:
+
+    """Works out which SQL node outputs are materialized and builds the fused
+    template of each one."""
+
+    def __init__(self, pipeline: Pipeline, catalog: DataCatalog) -> None:
+        self.producers: Dict[str, Node] = {}
+        sproc_datasets = self._sproc_datasets(pipeline, catalog)
+        for node_ in pipeline.nodes:
+            if _sql_template(node_) is not None and not sproc_datasets & set(node_.inputs + node_.outputs):
+                self.producers[node_.outputs[0]] = node_
+
+        consumed_elsewhere = {
+            dataset
+            for node_ in pipeline.nodes
+            if node_ not in self.producers.values()
+            for dataset in node_.inputs
+        }
+        self.materialized = {
+            dataset
+            for dataset in self.producers
+            if dataset in pipeline.outputs()
+            or dataset in consumed_elsewhere
+            or self._persist(catalog, dataset)
+        }
+
+    @staticmethod
+    def _sproc_datasets(pipeline: Pipeline, catalog: DataCatalog) -> Set[str]:
+        from .dummies import SprocNameDataSet  # pylint: disable=import-outside-toplevel
+
+        return {
+            dataset
+            for dataset in pipeline.data_sets()
+            if dataset in catalog.list()
+            and isinstance(catalog._get_dataset(dataset), SprocNameDataSet)  # pylint: disable=protected-access
+        }
+
+    @staticmethod
+    def _persist(catalog: DataCatalog, dataset: str) -> bool:
+        if dataset not in catalog.list():
+            return False
+        return bool(getattr(catalog._get_dataset(dataset), "persist", False))  # pylint: disable=protected-access
+
+    def fuse(self, dataset: str) -> Tuple[str, Dict[str, str]]:
+        """Returns the fused template that builds ``dataset`` and its inputs,
+        as placeholders to the materialized or external datasets they read."""
+        inputs: Dict[str, str] = {}
+        ctes: List[Tuple[str, str]] = []
+        inlined: Set[str] = set()
+
+        def _reference(source: str) -> str:
+            if source in self.producers and source not in self.materialized:
+                _inline(source)
+                return _quote_identifier(_cte_name(source))
+            placeholder = inputs.setdefault(source, f"input_{len(inputs)}")
+            return "{" + placeholder + "}"
+
+        def _inline(source: str) -> None:
+            if source in inlined:
+                return
+            inlined.add(source)
+            producer = self.producers[source]
+            references = {
+                placeholder: _reference(upstream) for placeholder, upstream in _input_mapping(producer).items()
+            }
+            # appended after its own upstream CTEs, so every CTE is defined before use
+            ctes.append((source, _sql_template(producer).render(references)))
+
+        _inline(dataset)
+        if len(ctes) == 1:
+            sql = ctes[0][1]
+        else:
+            sql = (
+                "WITH "
+                + ",\n".join(f"{_quote_identifier(_cte_name(name))} AS (\n{body}\n)" for name, body in ctes)
+                + f"\nSELECT * FROM {_quote_identifier(_cte_name(dataset))}"
+            )
+        return sql, {placeholder: source for source, placeholder in inputs.items()}
+
+
+def fuse_sql_nodes(pipeline: Pipeline, catalog: DataCatalog) -> Pipeline:
+    """Returns ``pipeline`` with its SQL nodes replaced by one node per
+    materialized output, which runs the output's upstream SQL nodes as CTEs
+    of a single query. Other nodes are kept as they are."""
+    fuser = _Fuser(pipeline, catalog)
+    nodes = [node_ for node_ in pipeline.nodes if node_ not in fuser.producers.values()]
+    for dataset in sorted(fuser.materialized):
+        producer = fuser.producers[dataset]
+        sql, inputs = fuser.fuse(dataset)
+        nodes.append(
+            node(_SqlTemplate(sql), inputs=inputs, outputs=dataset, name=f"fused_{_cte_name(dataset)}", tags=producer.tags)
+        )
+    return Pipeline(nodes)
+
+
+def compile_sql(
+    pipeline: Pipeline, catalog: DataCatalog, table_names: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """Returns the fused ``SELECT`` of every materialized output of
+    ``pipeline``, with the table names the inputs load from ``catalog``
+    filled in. ``table_names`` overrides them, e.g. to point the queries at
+    local DuckDB tables and check them offline:
+
+        for output, sql in compile_sql(pipeline, catalog, {"orders": "orders"}).items():
+            duckdb.sql(sql).show()
+    """
+    table_names = table_names or {}
+    queries = {}
+    for fused in fuse_sql_nodes(pipeline, catalog).nodes:
+        template = _sql_template(fused)
+        if template is None:
+            continue
+        tables = {
+            placeholder: table_names[dataset] if dataset in table_names else catalog.load(dataset)
+            for placeholder, dataset in _input_mapping(fused).items()
+        }
+        queries[fused.outputs[0]] = template(**tables).sql
+    return queries
+
+
+class SqlFusionRunner(SequentialRunner):
+
+    """``SqlFusionRunner`` runs pipelines sequentially after fusing their
+    SQL nodes with ``fuse_sql_nodes``:
+
+        kedro run --runner=datasets.fusion.SqlFusionRunner
+    """
+
+    def run(self, pipeline: Pipeline, catalog: DataCatalog, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return super().run(fuse_sql_nodes(pipeline, catalog), catalog, *args, **kwargs)
@@ -0,0 +1,131 @@
+"""  Kedro hooks for the Snowflake datasets.
+
+Register them in ``settings.py``:
+
+    HOOKS = (SnowflakePrefetchHook(), SnowflakeInstrumentationHook(), SnowflakeStreamedSaveHook())
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from kedro.framework.hooks import hook_impl
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline
+from kedro.pipeline.node import Node
+
+from . import instrumentation
+
+
+__all__ = ["SnowflakePrefetchHook", "SnowflakeInstrumentationHook", "SnowflakeStreamedSaveHook"]
+
+
+class SnowflakePrefetchHook:
+
+    """``SnowflakePrefetchHook`` submits the queries of every pipeline input
+    that supports ``prefetch()`` when the pipeline starts, so independent
+    catalog loads run concurrently in the warehouse instead of one after
+    another as nodes reach them.
+    """
+
+    def __init__(self, datasets: Optional[Iterable[str]] = None) -> None:
+        """``datasets`` limits prefetching to the given catalog entries,
+        by default every free input of the pipeline is prefetched."""
+        self._datasets = set(datasets) if datasets is not None else None
+
+    @hook_impl
+    def before_pipeline_run(
+        self, run_params: Dict[str, Any], pipeline: Pipeline, catalog: DataCatalog
+    ) -> None:
+        for name in sorted(pipeline.inputs()):
+            if self._datasets is not None and name not in self._datasets:
+                continue
+            # inputs without a catalog entry are fed in at run time
+            if name not in catalog.list():
+                continue
+
+            dataset = catalog._get_dataset(name)  # pylint: disable=protected-access
+            if hasattr(dataset, "prefetch"):
+                dataset.prefetch()
+
+
+class SnowflakeInstrumentationHook:
+
+    """``SnowflakeInstrumentationHook`` names the measurements the datasets
+    record after their catalog entry and sends them to ``sinks``, by default
+    a ``LoggingSink``. Pass e.g. ``JsonLinesSink("data/09_tracking/snowflake.jsonl")``
+    or ``PrometheusTextSink(...)`` to keep them.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None) -> None:
+        self._sinks = sinks if sinks is not None else [instrumentation.LoggingSink()]
+
+    @hook_impl
+    def before_pipeline_run(
+        self, run_params: Dict[str, Any], pipeline: Pipeline, catalog: DataCatalog
+    ) -> None:
+        for sink in self._sinks:
+            instrumentation.add_sink(sink)
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str, node: Node) -> None:
+        instrumentation.set_dataset_name(dataset_name)
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, data: Any, node: Node) -> None:
+        instrumentation.set_dataset_name(None)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        instrumentation.set_dataset_name(dataset_name)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        instrumentation.set_dataset_name(None)
+
+    def _remove_sinks(self) -> None:
+        for sink in self._sinks:
+            instrumentation.remove_sink(sink)
+
+    @hook_impl
+    def after_pipeline_run(
+        self, run_params: Dict[str, Any], run_result: Dict[str, Any], pipeline: Pipeline, catalog: DataCatalog
+    ) -> None:
+        self._remove_sinks()
+
+    @hook_impl
+    def on_pipeline_error(
+        self, error: Exception, run_params: Dict[str, Any], pipeline: Pipeline, catalog: DataCatalog
+    ) -> None:
+        self._remove_sinks()
+
+
+class SnowflakeStreamedSaveHook:
+
+    """``SnowflakeStreamedSaveHook`` makes the chunks of a generator node add
+    up in its ``SnowflakeTableDataSet`` outputs. Kedro runners save every
+    chunk a node yields separately, so without the hook each chunk replaces
+    the one before. With it the first chunk of a node run is saved with the
+    configured ``if_exists`` and the rest are appended.
+    """
+
+    def __init__(self) -> None:
+        # saves so far in the current run of the node writing each dataset
+        self._saves: Dict[str, int] = {}
+        self._datasets: Dict[str, Any] = {}
+
+    @hook_impl
+    def before_node_run(self, node: Node, catalog: DataCatalog) -> None:
+        for name in node.outputs:
+            if name not in catalog.list():
+                continue
+            dataset = catalog._get_dataset(name)  # pylint: disable=protected-access
+            if hasattr(dataset, "continue_node_output"):
+                self._datasets[name] = dataset
+                self._saves[name] = 0
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        if dataset_name not in self._saves:
+            return
+        if self._saves[dataset_name]:
+            self._datasets[dataset_name].continue_node_output()
+        self._saves[dataset_name] += 1
@@ -0,0 +1,271 @@
+"""  Per dataset performance instrumentation for the Snowflake datasets.
+
+Every load and save is recorded as an ``Operation`` holding the time spent in
+each phase (connect, execute, fetch, build, ddl, upload, copy, merge), the
+rows and bytes moved and the Snowflake query ids. Finished operations are
+passed to the registered sinks.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+__all__ = [
+    "Operation",
+    "LoggingSink",
+    "JsonLinesSink",
+    "PrometheusTextSink",
+    "add_sink",
+    "remove_sink",
+    "set_dataset_name",
+    "current",
+    "operation",
+    "defer",
+    "finish",
+    "attach",
+    "phase",
+    "record",
+]
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_sinks: List[Any] = []
+_sinks_lock = threading.Lock()
+
+
+class Operation:
+
+    """``Operation`` holds the measurements of one dataset load or save."""
+
+    def __init__(self, dataset: str, kind: str) -> None:
+        self.dataset = dataset
+        self.kind = kind
+        self.started_at = time.time()
+        self.perf_start = time.perf_counter()
+        self.seconds = 0.0
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self.sfqids: List[str] = []
+        self.error: Optional[str] = None
+        self.extra: Dict[str, Any] = {}
+        # phases and records can come from worker threads, see ``attach``
+        self.lock = threading.Lock()
+        # set by ``defer``, the operation is emitted by ``finish`` instead
+        self.deferred = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dataset": self.dataset,
+            "operation": self.kind,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "phases": dict(self.phases),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "sfqids": self.sfqids,
+            "error": self.error,
+            **self.extra,
+        }
+
+
+class LoggingSink:
+
+    """``LoggingSink`` logs every operation."""
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        self._level = level
+
+    def emit(self, op: Operation) -> None:
+        logger.log(self._level, "%s %s: %s", op.kind, op.dataset, op.to_dict())
+
+
+class JsonLinesSink:
+
+    """``JsonLinesSink`` appends every operation as a line of JSON to ``path``."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+
+    def emit(self, op: Operation) -> None:
+        line = json.dumps(op.to_dict(), default=str)
+        with self._lock, open(self._path, "a", encoding="utf-8") as sink_file:
+            sink_file.write(line + "\n")
+
+
+class PrometheusTextSink:
+
+    """``PrometheusTextSink`` keeps running totals per dataset and rewrites
+    ``path`` in the Prometheus text format, for the node exporter's textfile
+    collector."""
+
+    def __init__(self, path: str, prefix: str = "kedro_snowflake") -> None:
+        self._path = path
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+
+    @staticmethod
+    def _labels(**labels: str) -> str:
+        rendered = []
+        for name, value in labels.items():
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            rendered.append(f'{name}="{value}"')
+        return "{" + ",".join(rendered) + "}"
+
+    def emit(self, op: Operation) -> None:
+        with self._lock:
+            base = (("dataset", op.dataset), ("operation", op.kind))
+            self._totals["operations_total"][base] += 1
+            self._totals["seconds_total"][base] += op.seconds
+            if op.error:
+                self._totals["errors_total"][base] += 1
+            if op.rows is not None:
+                self._totals["rows_total"][base] += op.rows
+            if op.bytes is not None:
+                self._totals["bytes_total"][base] += op.bytes
+            for phase_name, seconds in op.phases.items():
+                self._totals["phase_seconds_total"][base + (("phase", phase_name),)] += seconds
+
+            lines = []
+            for metric, series in sorted(self._totals.items()):
+                name = f"{self._prefix}_{metric}"
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{self._labels(**dict(labels))} {value}")
+
+            # write then rename so the collector never reads a partial file
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as sink_file:
+                sink_file.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, self._path)
+
+
+def add_sink(sink: Any) -> None:
+    """Registers a sink, any object with an ``emit(operation)`` method."""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink: Any) -> None:
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def _stack() -> List[Operation]:
+    if not hasattr(_local, "operations"):
+        _local.operations = []
+    return _local.operations
+
+
+def set_dataset_name(name: Optional[str]) -> None:
+    """Names the operations of the current thread, set by the Kedro hook to
+    the catalog entry being loaded or saved."""
+    _local.dataset_name = name
+
+
+def current() -> Optional[Operation]:
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def operation(kind: str, dataset: Any) -> Iterator[Operation]:
+    """Records a load or save of ``dataset``, named after the catalog entry
+    when the hook is registered and after the dataset class otherwise."""
+    name = getattr(_local, "dataset_name", None) or type(dataset).__name__
+    op = Operation(name, kind)
+    stack = _stack()
+    stack.append(op)
+    try:
+        yield op
+    except Exception as e:
+        op.error = op.error or repr(e)
+        op.deferred = False
+        raise
+    finally:
+        stack.pop()
+        if not op.deferred:
+            finish(op)
+
+
+def defer(op: Operation) -> None:
+    """Keeps ``op`` open after its ``operation`` block, for loads that return
+    a lazy iterator and only fetch as it is consumed. ``finish`` emits it."""
+    op.deferred = True
+
+
+def finish(op: Operation) -> None:
+    """Sets the wall time of ``op`` and passes it to the sinks."""
+    op.seconds = time.perf_counter() - op.perf_start
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.emit(op)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("Instrumentation sink %s failed: %s", type(sink).__name__, e)
+
+
+@contextmanager
+def attach(op: Optional[Operation]) -> Iterator[None]:
+    """Records the phases of a worker thread into ``op``, the operation of
+    the thread that started the work. Phase times of concurrent workers add
+    up, so they can exceed the operation's wall time."""
+    if op is None:
+        yield
+        return
+
+    stack = _stack()
+    stack.append(op)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Adds the time spent in the ``with`` block to the current operation."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        op = current()
+        if op is not None:
+            with op.lock:
+                op.phases[name] += time.perf_counter() - start
+
+
+def record(
+    rows: Optional[int] = None,
+    nbytes: Optional[int] = None,
+    sfqid: Optional[str] = None,
+    error: Optional[str] = None,
+    **extra: Any,
+) -> None:
+    """Adds rows, bytes, a query id, an error or extra fields to the current
+    operation, a no-op outside of one."""
+    op = current()
+    if op is None:
+        return
+
+    with op.lock:
+        if rows is not None:
+            op.rows = (op.rows or 0) + rows
+        if nbytes is not None:
+            op.bytes = (op.bytes or 0) + nbytes
+        if sfqid and sfqid not in op.sfqids:
+            op.sfqids.append(sfqid)
+        if error is not None:
+            op.error = error
+        op.extra.update(extra)
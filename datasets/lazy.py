@@ -0,0 +1,38 @@
+"""  Deferred imports of the heavy dependencies.
+
+``lazy_import("pandas")`` returns the module straight away but only runs its
+code when one of its attributes is first used, so building a catalog with
+Snowflake entries that are never loaded doesn't pay for importing pandas, the
+connector or snowpark.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+__all__ = ["lazy_import"]
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Returns ``name`` from ``sys.modules`` or a module that imports itself
+    on first attribute access. A missing module still raises
+    ``ModuleNotFoundError`` here, only running it is deferred."""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # bind it on its parent package the way the import statement does
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -0,0 +1,169 @@
+"""  Local on-disk cache of query results, stored as Parquet files."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from kedro.io.core import DataSetError
+
+from .lazy import lazy_import
+
+
+__all__ = ["QueryResultCache"]
+
+pd = lazy_import("pandas")
+
+# connection settings that change what an identical sql string returns
+KEY_CONNECTION_FIELDS = ("account", "role", "warehouse", "database", "schema")
+# load arguments that change the dataframe built from the same result
+KEY_LOAD_ARGS = ("compact_dtypes", "use_arrow", "strategy", "output_type")
+
+# string literals, quoted identifiers and $$ strings, whose whitespace matters
+QUOTED_SQL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"]|\"\")*\"|\$\$.*?\$\$", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapses whitespace outside of string literals and quoted
+    identifiers and drops a trailing semicolon, so formatting changes in the
+    catalog don't produce a different cache key."""
+    parts = []
+    position = 0
+    for match in QUOTED_SQL.finditer(sql):
+        parts.append(re.sub(r"\s+", " ", sql[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(re.sub(r"\s+", " ", sql[position:]))
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+class QueryResultCache:
+
+    """``QueryResultCache`` stores query results as Parquet files in a local
+    directory. Entries expire after ``ttl`` seconds and the least recently
+    used entries are evicted once the directory grows past ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        if not path:
+            raise DataSetError("'path' argument cannot be empty for the query cache.")
+
+        self._path = Path(path)
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        sql: str,
+        connection_kwargs: Dict[str, Any],
+        freshness: Optional[str] = None,
+        load_args: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Hashes the normalized sql, the connection context, the load
+        arguments that shape the dataframe and the optional freshness token
+        into a cache key."""
+        load_args = load_args or {}
+        key_parts = {
+            "sql": normalize_sql(sql),
+            "connection": {
+                field: str(connection_kwargs.get(field, "")).upper()
+                for field in KEY_CONNECTION_FIELDS
+            },
+            "load_args": {field: load_args.get(field) for field in KEY_LOAD_ARGS},
+            "freshness": freshness,
+        }
+        raw_key = json.dumps(key_parts, sort_keys=True)
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def _data_path(self, key: str) -> Path:
+        return self._path / f"{key}.parquet"
+
+    def _meta_path(self, key: str) -> Path:
+        return self._path / f"{key}.json"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Returns the cached dataframe for ``key`` or None on a miss."""
+        data_path = self._data_path(key)
+        meta_path = self._meta_path(key)
+
+        if not (data_path.exists() and meta_path.exists()):
+            self.misses += 1
+            return None
+
+        with open(meta_path, encoding="utf-8") as meta_file:
+            created_at = json.load(meta_file)["created_at"]
+
+        if self._ttl is not None and time.time() - created_at > self._ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        # the modified time of the data file tracks recency for eviction
+        os.utime(data_path)
+        self.hits += 1
+        return pd.read_parquet(data_path)
+
+    def put(self, key: str, data: pd.DataFrame, sql: str = "") -> None:
+        """Writes ``data`` to the cache and evicts entries over the size limit."""
+        self._path.mkdir(parents=True, exist_ok=True)
+
+        # write to temporary files first so readers never see partial entries
+        data_path = self._data_path(key)
+        tmp_data_path = data_path.with_suffix(".parquet.tmp")
+        data.to_parquet(tmp_data_path, index=False)
+        os.replace(tmp_data_path, data_path)
+
+        meta_path = self._meta_path(key)
+        tmp_meta_path = meta_path.with_suffix(".json.tmp")
+        with open(tmp_meta_path, "w", encoding="utf-8") as meta_file:
+            json.dump({"created_at": time.time(), "sql": normalize_sql(sql)}, meta_file)
+        os.replace(tmp_meta_path, meta_path)
+
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        for entry_path in (self._data_path(key), self._meta_path(key)):
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        if self._max_bytes is None:
+            return
+
+        entries = []
+        for data_path in self._path.glob("*.parquet"):
+            try:
+                stat = data_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, data_path.stem))
+
+        total_bytes = sum(size for _, size, _ in entries)
+
+        # least recently used first
+        for _, size, key in sorted(entries):
+            if total_bytes <= self._max_bytes:
+                break
+            self._remove(key)
+            total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit, miss and eviction counters."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -1,17 +1,43 @@
 """  Starting from - ``SQLDataSet`` to load and save data to a SQL backend."""
 
+from __future__ import annotations
+
+import collections.abc
 import copy
+import importlib.util
+import itertools
+import json
+import logging
+import os
 import re
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import PurePosixPath
-from typing import Any, Dict, NoReturn, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NoReturn, Optional, Sequence, Set, Tuple
 import re
 
-import fsspec
-import pandas as pd
-
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
-
+from . import instrumentation
+from .checkpoint import UploadCheckpoint, upload_chunks
+from .connection_pool import ConnectionPool
+from .dtypes import COLUMN_TYPES_ATTR, column_types, compact_dtypes
+from .fingerprint import frame_fingerprint
+from .lazy import lazy_import
+from .query_cache import QueryResultCache
+from .staging import (
+    copy_staged_files,
+    stage_and_copy,
+    stream_and_copy,
+    unload_query,
+    write_arrow_chunks,
+    write_parquet_chunks,
+)
 
 
 # from sqlalchemy import create_engine
@@ -26,7 +52,18 @@ from kedro.io.core import (
 
 
 
-__all__ = ["SQLTableDataSet", "SQLQueryDataSet"]
+__all__ = ["SQLTableDataSet", "SQLQueryDataSet", "SnowflakeParameterizedQueryDataSet", "StreamedChunks"]
+
+# imported on first use, so catalogs with unused entries build quickly
+pd = lazy_import("pandas")
+connector = lazy_import("snowflake.connector")
+
+logger = logging.getLogger(__name__)
+
+SAVE_MODES = ("replace", "append", "upsert")
+
+# save_args handed through to write_pandas when they are set
+WRITE_PANDAS_ARGS = ("chunk_size", "parallel", "compression", "use_logical_type")
 
 KNOWN_PIP_INSTALL = {
     "snowflake-connector-python": "snowflake-connector-python",
@@ -95,20 +132,1126 @@ def _get_snowflake_sql_missing_error() -> DataSetError:
     )
 
 
+def _connect(**connection_kwargs: Any) -> connector.SnowflakeConnection:
+    try:
+        with instrumentation.phase("connect"):
+            return connector.connect(**connection_kwargs)
+
+    except connector.errors.DatabaseError as e:
+        print(e)
+        print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
+        raise _get_missing_module_error(e) from e
+
+
+    except connector.errors.ProgrammingError as e:
+        print(e)
+        print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
+        raise _get_missing_module_error(e) from e
+
+
+_connection_pool = ConnectionPool(_connect)
+
+
+def write_pandas(*args: Any, **kwargs: Any) -> Tuple[bool, int, int, Any]:
+    """``snowflake.connector.pandas_tools.write_pandas``, imported on the first
+    save because ``pandas_tools`` pulls in pyarrow."""
+    from snowflake.connector.pandas_tools import write_pandas as _write_pandas  # pylint: disable=import-outside-toplevel
+
+    return _write_pandas(*args, **kwargs)
+
+
+def _chunk_bytes(chunk: Any) -> int:
+    if isinstance(chunk, pd.DataFrame):
+        return int(chunk.memory_usage(index=False).sum())
+    if hasattr(chunk, "estimated_size"):
+        # polars
+        return int(chunk.estimated_size())
+    return int(chunk.nbytes)
+
+
+def _finish_chunked_load(
+    batches: Iterator[Any], op: Optional[instrumentation.Operation], release: Optional[Callable[[], None]]
+) -> None:
+    try:
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+    finally:
+        try:
+            if release is not None:
+                release()
+        finally:
+            if op is not None:
+                instrumentation.finish(op)
+
+
+class _ChunkedLoad:
+
+    """Iterator over the chunks of a chunked load. The chunks are fetched as
+    they are consumed, so they are recorded into the load's operation ``op``,
+    which is only emitted once the chunks are consumed, ``close()`` is called
+    or the iterator is garbage collected. That is also when ``release``
+    returns the connection the chunks are read from to the pool, so an
+    abandoned load doesn't hold on to it.
+
+    ``count`` records the rows and bytes of every chunk, and ``phase`` the
+    time spent waiting for it. Partitioned loads turn both off, their
+    workers record their own.
+    """
+
+    def __init__(
+        self,
+        batches: Iterator[Any],
+        op: Optional[instrumentation.Operation],
+        release: Optional[Callable[[], None]] = None,
+        count: bool = True,
+        phase: Optional[str] = "fetch",
+    ) -> None:
+        self._batches = batches
+        self._op = op
+        # unloads already recorded the bytes they downloaded
+        self._count_bytes = count and op is not None and op.bytes is None
+        self._count = count
+        self._phase = phase
+        if op is not None:
+            instrumentation.defer(op)
+        # the finalizer must not reference the iterator, or it is never collected
+        self._finalizer = weakref.finalize(self, _finish_chunked_load, batches, op, release)
+
+    def __iter__(self) -> "_ChunkedLoad":
+        return self
+
+    def __next__(self) -> Any:
+        with instrumentation.attach(self._op):
+            try:
+                if self._phase is None:
+                    chunk = next(self._batches)
+                else:
+                    with instrumentation.phase(self._phase):
+                        chunk = next(self._batches)
+            except StopIteration:
+                self.close()
+                raise
+            except BaseException as e:
+                instrumentation.record(error=repr(e))
+                self.close()
+                raise
+
+            if self._count:
+                instrumentation.record(rows=len(chunk), nbytes=_chunk_bytes(chunk) if self._count_bytes else None)
+        return chunk
+
+    def close(self) -> None:
+        """Stops the load, returns its connection to the pool and emits its
+        operation."""
+        self._finalizer()
+
+
+FILTER_OPERATORS = ("=", "!=", "<>", "<", "<=", ">", ">=", "in", "not in", "like", "is null", "is not null")
+
+SAMPLE_METHODS = ("bernoulli", "row", "system", "block")
+
+PARTITION_METHODS = ("range", "hash")
+
+PARTITION_ARGS = ("column", "method", "partitions", "ranges", "max_workers")
+
+STRATEGIES = ("fetch", "unload", "auto")
+
+AUTO_ARGS = ("partition_min_bytes", "unload_min_bytes", "memory_fraction", "expansion")
+
+# estimated bytes are compressed storage, ``expansion`` scales them to memory
+AUTO_DEFAULTS = {
+    "partition_min_bytes": 64e6,
+    "unload_min_bytes": 2e9,
+    "memory_fraction": 0.5,
+    "expansion": 4.0,
+}
+
+UNLOAD_ARGS = ("stage", "directory", "parallel", "max_file_size", "lazy", "memory_map")
+
+OUTPUT_TYPES = ("pandas", "arrow", "polars")
+
+# table comments written by ``skip_unchanged`` saves start with this
+FINGERPRINT_PREFIX = "kedro_fingerprint:"
+
+CHECKPOINT_ARGS = ("path", "stage", "retries", "backoff", "max_backoff")
+
+# rows per chunk of a checkpointed save without ``chunk_size``
+CHECKPOINT_CHUNK_ROWS = 1000000
+
+PLACEHOLDERS = {"pyformat": "%s", "format": "%s", "qmark": "?"}
+
+
+def _quote_identifier(name: str) -> str:
+    """Quotes a column name so it is used as is, escaping embedded quotes."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _placeholder(paramstyle: str, position: int) -> str:
+    if paramstyle == "numeric":
+        return f":{position}"
+    if paramstyle not in PLACEHOLDERS:
+        raise DataSetError(f"Unsupported paramstyle '{paramstyle}' for 'filters'.")
+    return PLACEHOLDERS[paramstyle]
+
+
+def _render_filters(
+    filters: List[Sequence[Any]], paramstyle: str = "pyformat"
+) -> Tuple[str, List[Any]]:
+    """Renders ``[column, operator, value]`` filters as a ``WHERE`` clause.
+    Values are always passed as bind parameters, never formatted into the sql."""
+    conditions = []
+    params: List[Any] = []
+
+    for condition in filters:
+        column, operator, *value = condition
+        operator = str(operator).lower().strip()
+        if operator not in FILTER_OPERATORS:
+            raise DataSetError(
+                f"Unsupported filter operator '{operator}', use one of {FILTER_OPERATORS}."
+            )
+
+        column = _quote_identifier(column)
+        if operator in ("is null", "is not null"):
+            conditions.append(f"{column} {operator.upper()}")
+            continue
+
+        if len(value) != 1:
+            raise DataSetError(f"Filter on {column} needs exactly one value.")
+        value = value[0]
+
+        if operator in ("in", "not in"):
+            if not value:
+                raise DataSetError(f"Filter on {column} needs a non-empty list of values.")
+            placeholders = []
+            for item in value:
+                params.append(item)
+                placeholders.append(_placeholder(paramstyle, len(params)))
+            conditions.append(f"{column} {operator.upper()} ({', '.join(placeholders)})")
+        else:
+            params.append(value)
+            conditions.append(f"{column} {operator.upper()} {_placeholder(paramstyle, len(params))}")
+
+    return " AND ".join(conditions), params
+
+
+def _render_sample(sample: Any) -> str:
+    """Renders a ``SAMPLE`` clause from a percentage or a dict with either
+    ``percent`` (plus optional ``method`` and ``seed``) or ``rows``."""
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        sample = {"percent": sample}
+    if not isinstance(sample, dict):
+        raise DataSetError("'sample' must be a percentage or a dict.")
+
+    if "rows" in sample:
+        return f"SAMPLE ({int(sample['rows'])} ROWS)"
+
+    percent = float(sample.get("percent", -1))
+    if not 0 <= percent <= 100:
+        raise DataSetError("'sample' needs 'rows' or a 'percent' between 0 and 100.")
+
+    method = str(sample.get("method", "bernoulli")).lower()
+    if method not in SAMPLE_METHODS:
+        raise DataSetError(f"Unsupported sample method '{method}', use one of {SAMPLE_METHODS}.")
+
+    clause = f"SAMPLE {method.upper()} ({percent:g})"
+    if sample.get("seed") is not None:
+        clause += f" SEED ({int(sample['seed'])})"
+    return clause
+
+
+def _render_order_by(order_by: Any) -> str:
+    """Renders ``ORDER BY`` from column names or ``[column, "asc"|"desc"]`` pairs."""
+    if isinstance(order_by, str):
+        order_by = [order_by]
+
+    terms = []
+    for term in order_by:
+        if isinstance(term, str):
+            column, direction = term, "asc"
+        else:
+            column, direction = term
+        direction = str(direction).lower()
+        if direction not in ("asc", "desc"):
+            raise DataSetError(f"Unsupported sort direction '{direction}' in 'order_by'.")
+        terms.append(f"{_quote_identifier(column)} {direction.upper()}")
+    return ", ".join(terms)
+
+
+def _parse_partition_by(partition_by: Any) -> Optional[Dict[str, Any]]:
+    """Normalizes ``load_args.partition_by``, a column name or a dict with
+    ``column``, ``method`` (``range`` or ``hash``), ``partitions``, explicit
+    ``ranges`` and ``max_workers``."""
+    if partition_by is None:
+        return None
+    if isinstance(partition_by, str):
+        partition_by = {"column": partition_by}
+    if not isinstance(partition_by, dict) or not partition_by.get("column"):
+        raise DataSetError("'partition_by' must be a column name or a dict with a 'column'.")
+
+    unknown = set(partition_by) - set(PARTITION_ARGS)
+    if unknown:
+        raise DataSetError(f"Unknown 'partition_by' arguments {sorted(unknown)}, use {PARTITION_ARGS}.")
+
+    spec = {"method": "range", "partitions": 4, "ranges": None, "max_workers": None, **partition_by}
+    spec["method"] = str(spec["method"]).lower()
+    if spec["method"] not in PARTITION_METHODS:
+        raise DataSetError(f"Unsupported partition method '{spec['method']}', use one of {PARTITION_METHODS}.")
+
+    if spec["ranges"] is not None:
+        if spec["method"] != "range":
+            raise DataSetError("'ranges' can only be used with the 'range' partition method.")
+        if not spec["ranges"] or any(len(bounds) != 2 for bounds in spec["ranges"]):
+            raise DataSetError("'ranges' must be a non-empty list of [lower, upper] pairs.")
+        spec["ranges"] = [tuple(bounds) for bounds in spec["ranges"]]
+
+    for name in ("partitions", "max_workers"):
+        value = spec[name]
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            raise DataSetError(f"'partition_by.{name}' must be a positive integer.")
+    return spec
+
+
+def _render_partition(partition: Tuple, paramstyle: str, position: int) -> Tuple[str, List[Any]]:
+    """Renders the condition selecting one partition, either
+    ``("hash", column, partitions, index)`` or
+    ``("range", column, lower, upper, include_nulls)`` where ``lower`` is
+    inclusive, ``upper`` exclusive and ``None`` unbounded. ``position`` is
+    the number of bind parameters that come before the condition."""
+    kind, column = partition[0], _quote_identifier(partition[1])
+    if kind == "hash":
+        _, _, partitions, index = partition
+        return f"MOD(ABS(HASH({column})), {int(partitions)}) = {int(index)}", []
+
+    _, _, lower, upper, include_nulls = partition
+    conditions = []
+    params: List[Any] = []
+    for operator, bound in ((">=", lower), ("<", upper)):
+        if bound is not None:
+            params.append(bound)
+            conditions.append(f"{column} {operator} {_placeholder(paramstyle, position + len(params))}")
+
+    condition = " AND ".join(conditions) or "TRUE"
+    if include_nulls:
+        condition = f"({condition} OR {column} IS NULL)"
+    return condition, params
+
+
+def _split_range(lower: Any, upper: Any, partitions: int) -> List[Any]:
+    """Returns the boundaries splitting ``[lower, upper]`` into at most
+    ``partitions`` ranges of equal width, for numbers, dates and timestamps."""
+    try:
+        if isinstance(lower, int) and isinstance(upper, int):
+            width = upper - lower + 1
+            bounds = [lower + width * k // partitions for k in range(1, partitions)]
+        else:
+            bounds = [lower + (upper - lower) * k / partitions for k in range(1, partitions)]
+    except TypeError as e:
+        raise DataSetError(
+            "Automatic 'partition_by' ranges need a numeric, date or timestamp "
+            "column, pass 'ranges' or use the 'hash' method."
+        ) from e
+
+    return sorted(set(bound for bound in bounds if lower < bound <= upper))
+
+
+def _iter_partitions(
+    read: Callable[[Tuple], pd.DataFrame], partitions: List[Tuple], max_workers: int
+) -> Iterator[pd.DataFrame]:
+    """Reads the partitions on a thread pool and yields them in order, with
+    at most ``max_workers`` partitions in flight or waiting to be consumed."""
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kedro_snowflake") as executor:
+        pending: deque = deque()
+        for partition in partitions:
+            pending.append(executor.submit(read, partition))
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _compact(df: pd.DataFrame, load_args: Dict[str, Any]) -> pd.DataFrame:
+    """Applies ``load_args.compact_dtypes``, either ``True`` or a dict of
+    options for ``compact_dtypes``, and logs the memory saved per column."""
+    options = load_args.get("compact_dtypes")
+    if not options or df is None:
+        return df
+
+    df, report = compact_dtypes(df, **(options if isinstance(options, dict) else {}))
+    logger.info(
+        "Compacted dtypes, saved %d bytes:\n%s",
+        report["saved_bytes"].sum(),
+        report.to_string(index=False),
+    )
+    return df
+
+
+def _compact_batches(batches: Iterator[pd.DataFrame], load_args: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    for batch in batches:
+        yield _compact(batch, load_args)
+
 
+def _pyarrow_installed() -> bool:
+    """Checks whether ``pyarrow`` can be imported, so the Arrow result
+    batches from the connector can be used to build dataframes."""
+    try:
+        import pyarrow  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
 
 
+def _get_pyarrow_missing_error() -> DataSetError:
+    return DataSetError(
+        "'use_arrow' was set but pyarrow is not installed. Install it with "
+        '``pip install "snowflake-connector-python[pandas]"`` or set '
+        "'use_arrow' to False in 'load_args'."
+    )
+
+
+def _check_output_type(load_args: Dict[str, Any]) -> None:
+    """Validates ``load_args.output_type``, anything but pandas is built
+    straight from the Arrow results."""
+    output_type = load_args.get("output_type", "pandas")
+    if output_type not in OUTPUT_TYPES:
+        raise DataSetError(f"'output_type' must be one of {OUTPUT_TYPES}.")
+    if output_type == "pandas":
+        return
+
+    if load_args.get("use_arrow") is False:
+        raise DataSetError(f"'output_type: {output_type}' needs 'use_arrow'.")
+    if load_args.get("compact_dtypes"):
+        raise DataSetError("'compact_dtypes' only applies to the 'pandas' output type.")
+    if not _pyarrow_installed():
+        raise _get_pyarrow_missing_error()
+    # find_spec doesn't import it, polars is only loaded with the first result
+    if output_type == "polars" and importlib.util.find_spec("polars") is None:
+        raise DataSetError("'output_type: polars' needs polars, install it with ``pip install polars``.")
+
+
+def _from_arrow(table: Any, output_type: str = "pandas") -> Any:
+    """Returns an Arrow table as ``output_type``, Arrow as is and polars
+    wrapping the Arrow buffers, which avoids a copy for most column types."""
+    if output_type == "arrow":
+        return table
+    if output_type == "polars":
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        return pl.from_arrow(table)
+    return table.to_pandas()
+
+
+def _from_pandas(df: pd.DataFrame, output_type: str = "pandas") -> Any:
+    """Converts the empty results and row based reads to ``output_type``."""
+    if output_type == "pandas":
+        return df
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    return _from_arrow(pa.Table.from_pandas(df, preserve_index=False), output_type)
+
+
+def _is_arrow_table(data: Any) -> bool:
+    # an Arrow table can only exist once pyarrow has been imported
+    return "pyarrow" in sys.modules and isinstance(data, sys.modules["pyarrow"].Table)
+
+
+def _as_saveable(data: Any) -> Any:
+    """Accepts pandas dataframes, Arrow tables and record batches and polars
+    frames for saving, polars is handed over as the Arrow table backing it."""
+    if "pyarrow" in sys.modules and isinstance(data, sys.modules["pyarrow"].RecordBatch):
+        return sys.modules["pyarrow"].Table.from_batches([data])
+    if "polars" in sys.modules:
+        polars = sys.modules["polars"]
+        if isinstance(data, polars.LazyFrame):
+            data = data.collect()
+        if isinstance(data, polars.DataFrame):
+            return data.to_arrow()
+    if _is_arrow_table(data) or isinstance(data, pd.DataFrame):
+        return data
+    raise DataSetError(
+        f"Expected a pandas or polars DataFrame or an Arrow table, got '{type(data).__name__}'."
+    )
 
-class SnowflakeQueryDataSet(AbstractDataSet[None, pd.DataFrame]):
+
+def _checkpoint_options(checkpoint: Any) -> Dict[str, Any]:
+    """Validates ``save_args.checkpoint``, ``true`` keeps the manifests in
+    the temporary directory."""
+    options = {"path": os.path.join(tempfile.gettempdir(), "kedro_snowflake_checkpoints")}
+    if isinstance(checkpoint, dict):
+        unknown = set(checkpoint) - set(CHECKPOINT_ARGS)
+        if unknown:
+            raise DataSetError(f"Unknown 'checkpoint' arguments {sorted(unknown)}, use {CHECKPOINT_ARGS}.")
+        options.update(checkpoint)
+    elif checkpoint is not True:
+        raise DataSetError("'checkpoint' must be true or a dict of options.")
+    return options
+
+
+def _newer_rows(df: Any, column: str, latest: Any) -> Any:
+    """Keeps the rows of a dataframe or Arrow table past ``latest``."""
+    if _is_arrow_table(df):
+        import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+        return df.filter(pc.greater(df[column], latest))
+    return df[df[column] > latest]
+
+
+class StreamedChunks:
+
+    """``StreamedChunks`` wraps the chunks a node returns so they reach
+    ``SnowflakeTableDataSet`` as one streamed save. Kedro runners save every
+    item of an iterator a node returns separately, a ``StreamedChunks`` isn't
+    an iterator, so it is saved once, with a single ``COPY INTO`` and, with
+    ``save_args.checkpoint``, resumable as a whole:
+
+        def export_orders(orders):
+            return StreamedChunks(transform(chunk) for chunk in orders)
+    """
+
+    def __init__(self, chunks: Iterable[Any]) -> None:
+        self.chunks = chunks
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.chunks)
+
+
+class _ChunkStream:
+
+    """Chunks of a streamed save. The first chunk is taken up front so the
+    table can be created from it, the rest are only produced while the
+    stream is consumed, which can happen once."""
+
+    def __init__(self, chunks: Iterator[Any]) -> None:
+        first = next(chunks, None)
+        if first is None:
+            raise DataSetError("Cannot save an empty iterator of chunks, the table is created from the first one.")
+        self.first = _as_saveable(first)
+        self.arrow = _is_arrow_table(self.first)
+        self.columns = list(self.first.column_names if self.arrow else self.first.columns)
+        self.frame_bytes = 0
+        self._rest = chunks
+        self._functions: List[Callable[[Any], Any]] = []
+
+    def map(self, function: Callable[[Any], Any]) -> "_ChunkStream":
+        """Applies ``function`` to every chunk as it is produced."""
+        self._functions.append(function)
+        return self
+
+    def __iter__(self) -> Iterator[Any]:
+        first, self.first = self.first, None
+        chunks = self._rest if first is None else itertools.chain([first], self._rest)
+        for chunk in chunks:
+            chunk = _as_saveable(chunk)
+            for function in self._functions:
+                chunk = function(chunk)
+            self.frame_bytes += _frame_bytes(chunk)
+            yield chunk
+
+
+class _StagedChunks:
+
+    """Chunks a checkpointed save has uploaded, loaded by name from
+    ``location`` instead of being staged again."""
+
+    def __init__(self, location: str, files: List[str], rows: int, staged_bytes: int, columns: List[str], arrow: bool) -> None:
+        self.location = location
+        self.files = files
+        self.rows = rows
+        self.staged_bytes = staged_bytes
+        self.columns = columns
+        self.arrow = arrow
+
+    def __len__(self) -> int:
+        return self.rows
+
+
+def _frame_bytes(data: Any) -> int:
+    return int(data.nbytes if _is_arrow_table(data) else data.memory_usage(deep=True).sum())
+
+
+def _arrow_to_sf_type(data_type: Any) -> str:
+    """Maps an Arrow type to the Snowflake column type it is created with."""
+    import pyarrow.types as pa_types  # pylint: disable=import-outside-toplevel
+
+    if pa_types.is_dictionary(data_type):
+        return _arrow_to_sf_type(data_type.value_type)
+    if pa_types.is_boolean(data_type):
+        return "boolean"
+    if pa_types.is_integer(data_type):
+        return "int"
+    if pa_types.is_floating(data_type):
+        return "float8"
+    if pa_types.is_decimal(data_type):
+        return f"number({data_type.precision}, {data_type.scale})"
+    if pa_types.is_timestamp(data_type):
+        return "timestamp_tz" if data_type.tz else "datetime"
+    if pa_types.is_date(data_type):
+        return "date"
+    return "varchar(16777216)"
+
+
+def _pandas_to_sf_type(dtype: Any, type_map: Dict[str, str]) -> str:
+    """Maps a pandas dtype to the Snowflake column type it is created with,
+    by name through ``type_map`` first and otherwise by kind, so the
+    narrowed, nullable and pyarrow backed dtypes of ``compact_dtypes`` work."""
+    if isinstance(dtype, pd.ArrowDtype):
+        return _arrow_to_sf_type(dtype.pyarrow_dtype)
+    if dtype.name in type_map:
+        return type_map[dtype.name]
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _pandas_to_sf_type(dtype.categories.dtype, type_map)
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float8"
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return "timestamp_tz"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return type_map.get("other", "varchar(16777216)")
+
+
+def _concat(frames: List[Any], output_type: str = "pandas") -> Any:
+    if output_type == "arrow":
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        return pa.concat_tables(frames)
+    if output_type == "polars":
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        return pl.concat(frames)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _execute(
+    cursor: Any,
+    sql: str,
+    sfqid: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None,
+) -> None:
+    """Runs ``sql`` on ``cursor``, or when the query was already submitted
+    with ``execute_async`` waits for it and attaches its results by id."""
+    with instrumentation.phase("execute"):
+        if sfqid is None:
+            cursor.execute(sql, params or None)
+        else:
+            cursor.get_results_from_sfqid(sfqid)
+    instrumentation.record(sfqid=getattr(cursor, "sfqid", None))
+
+
+def _submit_async(
+    connection: connector, sql: str, params: Optional[Sequence[Any]] = None
+) -> str:
+    """Submits ``sql`` without waiting for it and returns the query id."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute_async(sql, params or None)
+        return cursor.sfqid
+    finally:
+        cursor.close()
+
+
+def _read_arrow_pandas(
+    connection: connector,
+    sql: str,
+    sfqid: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None,
+    output_type: str = "pandas",
+) -> Any:
+    """Executes ``sql`` and builds the dataframe from the connector's Arrow
+    result batches instead of going row by row through ``pd.read_sql``, or
+    returns them as an Arrow table or polars frame."""
+    cursor = connection.cursor()
+    try:
+        _execute(cursor, sql, sfqid, params)
+        with instrumentation.phase("fetch"):
+            table = cursor.fetch_arrow_all()
+
+        # the connector returns None instead of an empty table
+        if table is None:
+            instrumentation.record(rows=0, nbytes=0)
+            return _from_pandas(pd.DataFrame(columns=[column[0] for column in cursor.description]), output_type)
+
+        instrumentation.record(rows=table.num_rows, nbytes=table.nbytes)
+        with instrumentation.phase("build"):
+            return _with_column_types(_from_arrow(table, output_type), cursor)
+    finally:
+        cursor.close()
+
+
+def _with_column_types(df: Any, cursor: Any) -> Any:
+    """Keeps the column types of the result on a pandas frame, so
+    ``compact_dtypes`` uses the precision and scale Snowflake reported."""
+    if isinstance(df, pd.DataFrame) and cursor.description:
+        df.attrs[COLUMN_TYPES_ATTR] = column_types(cursor.description)
+    return df
+
+
+def _read_records_pandas(
+    connection: connector,
+    sql: str,
+    sfqid: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None,
+) -> pd.DataFrame:
+    """Builds the dataframe from plain result rows, used for prefetched
+    queries when pyarrow is not available since ``pd.read_sql`` can only run
+    new queries."""
+    cursor = connection.cursor()
+    try:
+        _execute(cursor, sql, sfqid, params)
+        columns = [column[0] for column in cursor.description]
+        with instrumentation.phase("fetch"):
+            rows = cursor.fetchall()
+        instrumentation.record(rows=len(rows))
+        with instrumentation.phase("build"):
+            return _with_column_types(pd.DataFrame.from_records(rows, columns=columns), cursor)
+    finally:
+        cursor.close()
+
+
+def _read_pandas_batches(
+    connection: connector,
+    sql: str,
+    batch_rows: Optional[int] = None,
+    use_arrow: bool = True,
+    sfqid: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None,
+    output_type: str = "pandas",
+) -> Iterator[pd.DataFrame]:
+    """Executes ``sql`` and returns a lazy iterator of dataframes holding at
+    most ``batch_rows`` rows each, so memory is bounded by the batch size
+    rather than by the size of the result. Without ``batch_rows`` the
+    batches are the ones the connector hands back.
+
+    Arrow batches are read from the query's result batches, which are
+    downloaded without the connection, so it is free again once this
+    returns. Row batches are fetched through the cursor, which needs it."""
+    if batch_rows is not None and batch_rows < 1:
+        raise DataSetError("'batch_rows' must be a positive integer.")
+
+    cursor = connection.cursor()
+    try:
+        _execute(cursor, sql, sfqid, params)
+    except Exception:
+        cursor.close()
+        raise
+
+    if use_arrow:
+        try:
+            result_batches = cursor.get_result_batches() or []
+        finally:
+            cursor.close()
+        return _iter_arrow_batches(result_batches, batch_rows, output_type)
+    return _iter_row_batches(cursor, batch_rows)
+
+
+def _iter_arrow_batches(
+    result_batches: List[Any], batch_rows: Optional[int], output_type: str = "pandas"
+) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    tables = (table for table in (batch.to_arrow() for batch in result_batches) if table.num_rows)
+    if batch_rows is None:
+        for table in tables:
+            yield _from_arrow(table, output_type)
+        return
+
+    # re-slice the connector batches into fixed size ones, slices are zero-copy
+    pending = None
+    for table in tables:
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= batch_rows:
+            yield _from_arrow(pending.slice(0, batch_rows), output_type)
+            pending = pending.slice(batch_rows)
+
+    if pending is not None and pending.num_rows:
+        yield _from_arrow(pending, output_type)
+
+
+def _iter_row_batches(cursor: Any, batch_rows: Optional[int]) -> Iterator[pd.DataFrame]:
+    columns = [column[0] for column in cursor.description]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows or cursor.arraysize)
+            if not rows:
+                return
+            yield _with_column_types(pd.DataFrame.from_records(rows, columns=columns), cursor)
+    finally:
+        cursor.close()
+
+
+
+
+
+
+def _parameter_partitions(parameters: Any) -> Dict[str, Any]:
+    """Names the parameter sets of a parameterized query. ``parameters`` is a
+    dict of named sets or a list of sets named after their values, a set is a
+    dict of named binds, a list of positional binds or a single value."""
+    if isinstance(parameters, dict):
+        named = [(str(key), value) for key, value in parameters.items()]
+    elif isinstance(parameters, (list, tuple)):
+        named = []
+        for value in parameters:
+            if isinstance(value, dict):
+                key = "/".join(f"{name}={item}" for name, item in value.items())
+            elif isinstance(value, (list, tuple)):
+                key = "/".join(str(item) for item in value)
+            else:
+                key = str(value)
+            named.append((key, value))
+    else:
+        raise DataSetError("'parameters' must be a list of parameter sets or a dict of named sets.")
+
+    if not named:
+        raise DataSetError("'parameters' cannot be empty.")
+    partitions = {key: value if isinstance(value, (dict, list, tuple)) else [value] for key, value in named}
+    if len(partitions) != len(named):
+        raise DataSetError("'parameters' contains the same parameter set more than once.")
+    return partitions
+
+
+PYFORMAT_BINDS = re.compile(r"%%|%\((\w+)\)s|%s")
+
+
+def _to_numeric_binds(sql: str, partitions: Dict[str, Any]) -> Tuple[str, Dict[str, List[Any]]]:
+    """Rewrites the pyformat binds of ``sql`` (``%(name)s`` or ``%s``) to
+    numeric ones (``:1``), which Snowflake binds on the server, and every
+    parameter set to the matching list of values."""
+    names: List[str] = []
+    positional = 0
+
+    def _replace(match: Any) -> str:
+        nonlocal positional
+        if match.group(0) == "%%":
+            return "%"
+        if match.group(1) is not None:
+            if match.group(1) not in names:
+                names.append(match.group(1))
+            # a name used twice binds the same value
+            return f":{names.index(match.group(1)) + 1}"
+        positional += 1
+        return f":{positional}"
+
+    numeric_sql = PYFORMAT_BINDS.sub(_replace, sql)
+    if names and positional:
+        raise DataSetError("'sql' cannot mix named and positional binds.")
+
+    converted = {}
+    for key, params in partitions.items():
+        if names:
+            if not isinstance(params, dict):
+                raise DataSetError(f"Parameter set '{key}' must be a dict of the named binds {names}.")
+            missing = set(names) - set(params)
+            if missing:
+                raise DataSetError(f"Parameter set '{key}' is missing the binds {sorted(missing)}.")
+            converted[key] = [params[name] for name in names]
+        else:
+            if isinstance(params, dict):
+                raise DataSetError(f"Parameter set '{key}' is a dict, but 'sql' has positional binds.")
+            if len(params) != positional:
+                raise DataSetError(f"Parameter set '{key}' has {len(params)} values for {positional} binds.")
+            converted[key] = list(params)
+    return numeric_sql, converted
+
+
+def _server_binds(sql: str, params: List[Any], paramstyle: str) -> Tuple[str, List[Any]]:
+    """Rewrites the pyformat binds of a table load's sql with
+    ``_to_numeric_binds``, so the filter and partition values are bound by
+    Snowflake on the server instead of formatted in by the connector."""
+    if paramstyle not in ("pyformat", "format"):
+        return sql, params
+    sql, binds = _to_numeric_binds(sql, {"load": list(params)})
+    return sql, binds["load"]
+
+
+def _check_strategy(load_args: Dict[str, Any]) -> None:
+    """Validates ``load_args.strategy`` and the ``load_args.unload`` options."""
+    strategy = load_args.get("strategy", "fetch")
+    if strategy not in STRATEGIES:
+        raise DataSetError(f"'strategy' must be one of {STRATEGIES}.")
+
+    unload = load_args.get("unload") or {}
+    unknown = set(unload) - set(UNLOAD_ARGS)
+    if unknown:
+        raise DataSetError(f"Unknown 'unload' arguments {sorted(unknown)}, use {UNLOAD_ARGS}.")
+
+    unknown = set(load_args.get("auto") or {}) - set(AUTO_ARGS)
+    if unknown:
+        raise DataSetError(f"Unknown 'auto' arguments {sorted(unknown)}, use {AUTO_ARGS}.")
+
+    if strategy == "auto" and unload.get("lazy"):
+        # a lazy unload returns a dataset, auto can't pick between return types
+        raise DataSetError("'unload.lazy' cannot be combined with the 'auto' strategy.")
+
+    if strategy in ("unload", "auto"):
+        if not _pyarrow_installed():
+            raise _get_pyarrow_missing_error()
+        if unload.get("lazy") and load_args.get("chunked"):
+            raise DataSetError("'unload.lazy' cannot be combined with 'chunked' loads.")
+
+
+def _available_memory() -> Optional[int]:
+    """Bytes of memory available to the process, None when unknown."""
+    if importlib.util.find_spec("psutil") is not None:
+        import psutil  # pylint: disable=import-outside-toplevel
+
+        return int(psutil.virtual_memory().available)
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _estimate_table(connection: connector, load_args: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Estimates the rows and bytes a table load reads from the table's
+    ``INFORMATION_SCHEMA`` counts, scaled down by ``sample`` and ``limit``.
+    Filters and projections are not accounted for."""
+    paramstyle = load_args.get("paramstyle", "pyformat")
+    sql = (
+        f"SELECT ROW_COUNT, BYTES FROM {_quote_identifier(load_args['database'])}.INFORMATION_SCHEMA.TABLES "
+        f"WHERE TABLE_SCHEMA = {_placeholder(paramstyle, 1)} AND TABLE_NAME = {_placeholder(paramstyle, 2)}"
+    )
+    sql, params = _server_binds(sql, [load_args["schema"], load_args["table_name"]], paramstyle)
+    cursor = connection.cursor()
+    try:
+        _execute(cursor, sql, params=params)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row or row[0] is None:
+        return {"rows": None, "bytes": None}
+
+    rows, nbytes = int(row[0]), int(row[1] or 0)
+    estimate = rows
+    sample = load_args.get("sample")
+    if isinstance(sample, (int, float)):
+        estimate = rows * sample / 100
+    elif isinstance(sample, dict):
+        estimate = min(sample["rows"], rows) if "rows" in sample else rows * sample["percent"] / 100
+    if load_args.get("limit") is not None:
+        estimate = min(estimate, load_args["limit"])
+
+    fraction = estimate / rows if rows else 1.0
+    return {"rows": int(estimate), "bytes": int(nbytes * fraction)}
+
+
+def _estimate_query(connection: connector, sql: str) -> Dict[str, Optional[int]]:
+    """Estimates the bytes a query scans with ``EXPLAIN USING JSON``, which
+    compiles it without running it. Snowflake doesn't estimate rows."""
+    cursor = connection.cursor()
+    try:
+        _execute(cursor, f"EXPLAIN USING JSON {sql}")
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    stats = json.loads(row[0]).get("GlobalStats", {}) if row else {}
+    return {"rows": None, "bytes": stats.get("bytesAssigned")}
+
+
+def _choose_strategy(
+    estimate: Dict[str, Optional[int]], load_args: Dict[str, Any], can_partition: bool
+) -> Dict[str, Any]:
+    """Picks the strategy of a ``strategy: auto`` load from the pre-flight
+    estimate, the ``load_args.auto`` thresholds and the available memory.
+    ``chunked`` changes what a load returns, so it is kept as configured and
+    a load that isn't chunked and won't fit in memory raises instead."""
+    options = {**AUTO_DEFAULTS, **(load_args.get("auto") or {})}
+    nbytes = estimate.get("bytes")
+    available = _available_memory()
+
+    if (
+        nbytes is not None
+        and not load_args.get("chunked")
+        and available is not None
+        and nbytes * options["expansion"] > available * options["memory_fraction"]
+    ):
+        # every strategy but a chunked one builds the whole frame in memory
+        raise DataSetError(
+            f"The load is estimated at {int(nbytes * options['expansion'])} bytes in memory, more than "
+            f"'memory_fraction' ({options['memory_fraction']}) of the {available} bytes available. "
+            "Set 'chunked: true' to read it in batches, or tune 'expansion' and 'memory_fraction' in 'auto'."
+        )
+
+    strategy, partitioned = "fetch", False
+    if nbytes is None:
+        reason = "no estimate"
+    elif nbytes >= options["unload_min_bytes"]:
+        strategy, reason = "unload", "estimate reaches unload_min_bytes"
+    elif can_partition and nbytes >= options["partition_min_bytes"]:
+        partitioned, reason = True, "estimate reaches partition_min_bytes"
+    else:
+        reason = "estimate below the thresholds"
+
+    return {
+        "strategy": strategy,
+        "partitioned": partitioned,
+        "reason": reason,
+        "estimated_rows": estimate.get("rows"),
+        "estimated_bytes": nbytes,
+        "available_memory": available,
+    }
+
+
+def _report_decision(decision: Dict[str, Any], name: str) -> None:
+    logger.info(
+        "Loading %s with strategy '%s'%s (%s): estimated %s rows and %s bytes, %s bytes of memory available",
+        name,
+        decision["strategy"],
+        " partitioned" if decision["partitioned"] else "",
+        decision["reason"],
+        decision["estimated_rows"],
+        decision["estimated_bytes"],
+        decision["available_memory"],
+    )
+    instrumentation.record(
+        strategy=decision["strategy"],
+        partitioned=decision["partitioned"],
+        estimated_rows=decision["estimated_rows"],
+        estimated_bytes=decision["estimated_bytes"],
+    )
+
+
+def _report_actual(decision: Dict[str, Any], name: str) -> None:
+    """Logs what an automatic load actually read next to its estimate, so
+    the thresholds can be tuned."""
+    op = instrumentation.current()
+    if op is None:
+        return
+    decision.update(rows=op.rows, bytes=op.bytes, seconds=time.time() - op.started_at)
+    logger.info(
+        "Loaded %s with strategy '%s'%s: %s rows and %s bytes in %.2fs, estimated %s rows and %s bytes",
+        name,
+        decision["strategy"],
+        " partitioned" if decision["partitioned"] else "",
+        decision["rows"],
+        decision["bytes"],
+        decision["seconds"],
+        decision["estimated_rows"],
+        decision["estimated_bytes"],
+    )
+
+
+def _iter_parquet_batches(
+    files: List[str], batch_rows: Optional[int], directory: str, memory_map: bool, output_type: str = "pandas"
+) -> Iterator[pd.DataFrame]:
+    """Yields the downloaded files batch by batch and removes them once
+    consumed. Without ``batch_rows`` pyarrow's default batch size is used."""
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    try:
+        for path in files:
+            parquet_file = pq.ParquetFile(path, memory_map=memory_map)
+            batches = parquet_file.iter_batches(batch_size=batch_rows) if batch_rows else parquet_file.iter_batches()
+            for batch in batches:
+                yield _from_arrow(pa.Table.from_batches([batch]), output_type)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _read_unloaded(
+    connection: connector,
+    sql: str,
+    params: Optional[Sequence[Any]],
+    load_args: Dict[str, Any],
+    database: Optional[str] = None,
+    schema: Optional[str] = None,
+) -> Any:
+    """Unloads ``sql`` to Parquet files through a stage, downloads them in
+    parallel and reads them memory-mapped instead of going through the result
+    set protocol. ``unload.lazy`` returns a ``pyarrow.dataset.Dataset`` over
+    the downloaded files, which are removed once it is garbage collected,
+    otherwise they are removed once read."""
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.dataset as pa_dataset  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    options = load_args.get("unload") or {}
+    memory_map = options.get("memory_map", True)
+    output_type = load_args.get("output_type", "pandas")
+    if options.get("directory"):
+        os.makedirs(options["directory"], exist_ok=True)
+    directory = tempfile.mkdtemp(prefix="kedro_unload_", dir=options.get("directory"))
+
+    try:
+        files = unload_query(
+            connection,
+            sql,
+            directory,
+            params,
+            stage=options.get("stage"),
+            database=database,
+            schema=schema,
+            parallel=options.get("parallel", 8),
+            max_file_size=options.get("max_file_size"),
+        )
+        instrumentation.record(nbytes=sum(os.path.getsize(path) for path in files), files=len(files))
+
+        if not files:
+            # an empty result unloads no files, take the columns from the query
+            cursor = connection.cursor()
+            try:
+                _execute(cursor, f"SELECT * FROM ({sql}) LIMIT 0", params=params)
+                df = pd.DataFrame(columns=[column[0] for column in cursor.description])
+            finally:
+                cursor.close()
+            instrumentation.record(rows=0)
+            if options.get("lazy"):
+                return pa_dataset.dataset(pa.Table.from_pandas(df, preserve_index=False))
+            df = _from_pandas(df, output_type)
+            return iter([df]) if load_args.get("chunked") else df
+
+        if options.get("lazy"):
+            dataset = pa_dataset.dataset(files, format="parquet")
+            weakref.finalize(dataset, shutil.rmtree, directory, True)
+            directory = None
+            return dataset
+
+        if load_args.get("chunked"):
+            batches = _iter_parquet_batches(files, load_args.get("batch_rows"), directory, memory_map, output_type)
+            directory = None
+            return _compact_batches(batches, load_args)
+
+        with instrumentation.phase("build"):
+            table = pa.concat_tables([pq.read_table(path, memory_map=memory_map) for path in files])
+            df = _from_arrow(table, output_type)
+        instrumentation.record(rows=table.num_rows)
+        return _compact(df, load_args)
+    finally:
+        # lazy datasets and chunk iterators still need their files
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _chunked_load(
+    batches: Iterator[Any],
+    load_args: Dict[str, Any],
+    pool: ConnectionPool,
+    connection_kwargs: Dict[str, Any],
+    connection: Any,
+) -> _ChunkedLoad:
+    """Wraps the chunks of a chunked load. Unloaded chunks are read from
+    local files and Arrow chunks from result batches, so ``connection``
+    goes back to the pool right away, row batches keep it checked out while
+    they are fetched through its cursor."""
+    if load_args.get("strategy") == "unload" or load_args.get("use_arrow", _pyarrow_installed()):
+        pool.release(connection_kwargs, connection)
+        return _ChunkedLoad(batches, instrumentation.current())
+    return _ChunkedLoad(batches, instrumentation.current(), partial(pool.release, connection_kwargs, connection))
+
+
+class SnowflakeQueryDataSet(AbstractDataSet[None, "pd.DataFrame"]):
 
     """``SnowflakeQueryDataSet`` loads data from a SQL table and saves a pandas
        """
 
     DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
     DEFAULT_SAVE_ARGS: Dict[str, Any] = {"index": False}
-    # using Any because of Sphinx but it should be
-    # sqlalchemy.engine.Engine or sqlalchemy.engine.base.Engine
-    connections: Dict[str, Any] = {}
+    # shared by every snowflake dataset, keyed by the connection arguments
+    pool: ConnectionPool = _connection_pool
 
     
     
@@ -119,8 +1262,15 @@ class SnowflakeQueryDataSet(AbstractDataSet[None, pd.DataFrame]):
         credentials: Dict[str, Any],
         load_args: Dict[str, Any] = None,
         save_args: Dict[str, Any] = None,
+        cache: Dict[str, Any] = None,
     ) -> None:
         """Creates a new ``SnowflakeQueryDataSet``.
+
+        ``cache`` opts into a local Parquet cache of the query result, e.g.
+        ``{"path": "data/.cache", "ttl": 3600, "max_bytes": 1e9,
+        "freshness_sql": "SELECT MAX(LAST_ALTERED) FROM ..."}``. The result
+        of ``freshness_sql`` is part of the cache key, so the cache is
+        invalidated when it changes.
         """
         # -- should make this more robust
         if not sql:
@@ -140,43 +1290,50 @@ class SnowflakeQueryDataSet(AbstractDataSet[None, pd.DataFrame]):
         if save_args is not None:
             self._save_args.update(save_args)
 
+        if self._load_args.get("use_arrow") and not _pyarrow_installed():
+            raise _get_pyarrow_missing_error()
+        _check_strategy(self._load_args)
+        _check_output_type(self._load_args)
+
         self._load_args["sql"] = sql
         #self._save_args["name"] = table_name
         #self._filepath = None
 
-        self._connection_creds = credentials
+        self._sfqid = None
+        self._resolved: Optional[Dict[str, Any]] = None
+        self.load_metrics: Dict[str, Any] = {}
+        self._cache = None
+        self._freshness_sql = None
+        if cache is not None:
+            if self._load_args.get("chunked"):
+                raise DataSetError("'cache' cannot be combined with 'chunked' loads.")
+            if not _pyarrow_installed():
+                raise DataSetError("pyarrow is required to store the query cache as Parquet.")
+            if (self._load_args.get("unload") or {}).get("lazy"):
+                raise DataSetError("'cache' cannot be combined with lazy 'unload' loads.")
+            if self._load_args.get("output_type", "pandas") != "pandas":
+                raise DataSetError("'cache' only supports the 'pandas' output type.")
+
+            cache = copy.deepcopy(cache)
+            self._freshness_sql = cache.pop("freshness_sql", None)
+            self._cache = QueryResultCache(**cache)
 
-        self.create_connection(self._connection_creds)
+        self._connection_creds = credentials
 
 
     @classmethod
     def create_connection(cls, connection_kwargs: Dict[str, Any]) -> None:
-        """Given a connection string, create singleton connection
-        to be used across all instances of `SQLQueryDataSet` that
-        need to connect to the same source.
+        """Given a connection string, open a pooled connection so the
+        credentials are checked up front. Datasets no longer call this on
+        init, their first load or save opens the connection. Every dataset
+        with the same connection arguments shares the connections in ``pool``.
         """
-        if "current_connection" in cls.connections:
-            return
-
-        try:
-            conn = snowflake.connector.connect(**connection_kwargs)
-
-        except snowflake.connector.errors.DatabaseError as e:
-            print(e)
-            print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
-            raise _get_missing_module_error(e) from e
-
-
-        except snowflake.connector.errors.ProgrammingError as e:
-            print(e)
-            print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
-            raise _get_missing_module_error(e) from e
-
-
-        cls.connections["current_connection"] = conn
+        cls.pool.release(connection_kwargs, cls.pool.checkout(connection_kwargs))
 
     @staticmethod
-    def read_pandas_from_snowflake(connection: snowflake.connector, **load_args):
+    def read_pandas_from_snowflake(
+        connection: connector, sfqid: Optional[str] = None, **load_args
+    ):
         """ To read data into a Pandas DataFrame, you use a
             Cursor to retrieve the data and then call one of 
             these Cursor methods to put the data into a Pandas
@@ -184,25 +1341,136 @@ class SnowflakeQueryDataSet(AbstractDataSet[None, pd.DataFrame]):
 
         try:
             #eventually add more options
-            df = pd.read_sql(load_args['sql'], connection)
-
-            return df
+            use_arrow = load_args.get("use_arrow", _pyarrow_installed())
+            if load_args.get("strategy") == "unload":
+                return _read_unloaded(connection, load_args['sql'], None, load_args)
+
+            output_type = load_args.get("output_type", "pandas")
+            if load_args.get("chunked"):
+                return _compact_batches(_read_pandas_batches(
+                    connection, load_args['sql'], load_args.get("batch_rows"), use_arrow, sfqid, None, output_type
+                ), load_args)
+
+            if use_arrow:
+                df = _read_arrow_pandas(connection, load_args['sql'], sfqid, None, output_type)
+            elif sfqid is not None:
+                df = _read_records_pandas(connection, load_args['sql'], sfqid)
+            else:
+                # pd.read_sql runs and fetches in one go
+                with instrumentation.phase("fetch"):
+                    df = pd.read_sql(load_args['sql'], connection)
+                instrumentation.record(rows=len(df), nbytes=int(df.memory_usage(index=False).sum()))
+
+            return _compact(df, load_args)
         
-        except snowflake.connector.errors.ProgrammingError as e:
+        except connector.errors.ProgrammingError as e:
             print(e)
             print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
+            instrumentation.record(sfqid=e.sfqid, error=repr(e))
             return
 
         except Exception as e:
             print(e)
+            instrumentation.record(error=repr(e))
             print(f"query failed for {load_args['sql']}")
             return
 
 
+    def _resolve_load_args(self, conn: connector) -> Dict[str, Any]:
+        """Returns the load args with ``strategy: auto`` replaced by the
+        strategy picked from a pre-flight ``EXPLAIN`` of the query."""
+        if self._load_args.get("strategy") != "auto":
+            return self._load_args
+
+        with instrumentation.phase("estimate"):
+            try:
+                estimate = _estimate_query(conn, self._load_args["sql"])
+            except connector.errors.ProgrammingError as e:
+                logger.warning("Estimating the query failed, fetching it: %s", e)
+                estimate = {"rows": None, "bytes": None}
+        self.load_metrics = _choose_strategy(estimate, self._load_args, can_partition=False)
+        return {**self._load_args, "strategy": self.load_metrics["strategy"]}
+
     def _load(self) -> pd.DataFrame:
-        conn = self.connections["current_connection"]  # type:ignore
+        with instrumentation.operation("load", self):
+            key = None
+            if self._cache is not None and not self._freshness_sql:
+                # without a freshness check a warm cache needs no connection
+                key, df = self._cache_lookup(None)
+                if df is not None:
+                    return df
+
+            # a chunked load may hold its connection until it is consumed,
+            # so a node with more chunked inputs than max_size doesn't wait
+            conn = self.pool.checkout(self._connection_creds, overflow=bool(self._load_args.get("chunked")))
+            try:
+                load_args, self._resolved = self._resolved, None
+                if load_args is None:
+                    load_args = self._resolve_load_args(conn)
+                if self._load_args.get("strategy") == "auto":
+                    _report_decision(self.load_metrics, type(self).__name__)
+                df = self._load_from_connection(conn, load_args, key)
+            except Exception:
+                self.pool.release(self._connection_creds, conn)
+                raise
+
+            if load_args.get("chunked") and isinstance(df, collections.abc.Iterator):
+                return _chunked_load(df, load_args, self.pool, self._connection_creds, conn)
+
+            self.pool.release(self._connection_creds, conn)
+            if self._load_args.get("strategy") == "auto" and not load_args.get("chunked") and df is not None:
+                _report_actual(self.load_metrics, type(self).__name__)
+            return df
+
+    def prefetch(self) -> None:
+        """Submits the query with ``execute_async`` so it runs in the
+        warehouse while other datasets load, ``_load`` then only collects the
+        result by query id. Cached and unloaded datasets are not prefetched,
+        ``strategy: auto`` picks the strategy here."""
+        if self._cache is not None or self._sfqid is not None or self._load_args.get("strategy") == "unload":
+            return
+
+        with self.pool.connection(self._connection_creds) as conn:
+            self._resolved = self._resolve_load_args(conn)
+            if self._resolved.get("strategy") != "unload":
+                self._sfqid = _submit_async(conn, self._load_args["sql"])
+
+    def _cache_lookup(self, freshness: Optional[str]) -> Tuple[str, Optional[pd.DataFrame]]:
+        key = self._cache.make_key(self._load_args["sql"], self._connection_creds, freshness, self._load_args)
+        df = self._cache.get(key)
+        instrumentation.record(cache="miss" if df is None else "hit")
+        return key, df
+
+    def _load_from_connection(
+        self, conn: connector, load_args: Dict[str, Any], key: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Reads the query over ``conn``, through the cache when there is
+        one. ``key`` is the cache key of a lookup that already missed."""
+        if self._cache is None:
+            sfqid, self._sfqid = self._sfqid, None
+            return SnowflakeQueryDataSet.read_pandas_from_snowflake(
+                conn, sfqid, **load_args
+            )
+
+        if key is None:
+            freshness = None
+            if self._freshness_sql:
+                cursor = conn.cursor()
+                try:
+                    row = cursor.execute(self._freshness_sql).fetchone()
+                finally:
+                    cursor.close()
+                freshness = str(row[0]) if row else None
+
+            key, df = self._cache_lookup(freshness)
+            if df is not None:
+                return df
 
-        return SnowflakeQueryDataSet.read_pandas_from_snowflake(conn, **self._load_args)
+        df = SnowflakeQueryDataSet.read_pandas_from_snowflake(conn, **load_args)
+        if df is not None:
+            self._cache.put(key, df, self._load_args["sql"])
+
+        return df
 
 
     def _save(self, data: pd.DataFrame) -> None:
@@ -222,7 +1490,142 @@ class SnowflakeQueryDataSet(AbstractDataSet[None, pd.DataFrame]):
 
 
 
-class SnowflakeTableDataSet(AbstractDataSet[pd.DataFrame, pd.DataFrame]):
+class SnowflakeParameterizedQueryDataSet(AbstractDataSet[None, Any]):
+
+    """``SnowflakeParameterizedQueryDataSet`` runs one ``sql`` with bind
+    variables once per parameter set in ``parameters``, instead of a catalog
+    entry per region or date.
+
+    By default it loads like a ``PartitionedDataSet``: a dict of partition
+    names to functions that run that partition's query when called. With
+    ``load_args.concat`` the parameter sets run concurrently, each on its
+    own pooled connection, and the results are concatenated in parameter
+    set order. ``prefetch()`` submits every parameter set with
+    ``execute_async`` so they all run in the warehouse at once.
+
+    The values are bound by Snowflake on the server, never interpolated
+    into the sql on the client.
+    """
+
+    DEFAULT_LOAD_ARGS: Dict[str, Any] = {"concat": False}
+    # shared by every snowflake dataset, keyed by the connection arguments
+    pool: ConnectionPool = _connection_pool
+
+    def __init__(
+        self,
+        sql: str,
+        parameters: Any,
+        credentials: Dict[str, Any],
+        load_args: Dict[str, Any] = None,
+    ) -> None:
+        """Creates a new ``SnowflakeParameterizedQueryDataSet``.
+
+        ``parameters`` is a list of parameter sets, each a dict of named
+        binds (``%(region)s``) or a list of positional ones (``%s``), and the
+        partitions are named after their values. A dict of sets names the
+        partitions explicitly. The binds are rewritten to Snowflake's
+        ``numeric`` style and the queries run with ``paramstyle: numeric``,
+        so the server binds the values. With ``paramstyle: qmark`` or
+        ``numeric`` in the credentials the sql is sent as written, and the
+        parameter sets must be positional.
+        """
+        if not sql:
+            raise DataSetError("'sql' argument cannot be empty.")
+
+        if not (credentials and "user" in credentials and credentials["user"]):
+            raise DataSetError(
+                "'user', 'password', and 'account' must be passed"
+                " see docs for other connection methods"
+            )
+
+        self._load_args = copy.deepcopy(self.DEFAULT_LOAD_ARGS)
+        if load_args is not None:
+            self._load_args.update(load_args)
+
+        if self._load_args.get("use_arrow") and not _pyarrow_installed():
+            raise _get_pyarrow_missing_error()
+        if self._load_args.get("chunked") or self._load_args.get("strategy", "fetch") != "fetch":
+            raise DataSetError("Parameterized queries don't support 'chunked' loads or the 'strategy' argument.")
+        _check_output_type(self._load_args)
+
+        partitions = _parameter_partitions(parameters)
+        paramstyle = credentials.get("paramstyle", "pyformat")
+        if paramstyle in ("pyformat", "format"):
+            # pyformat is interpolated by the connector, numeric binds on the server
+            sql, partitions = _to_numeric_binds(sql, partitions)
+            credentials = {**credentials, "paramstyle": "numeric"}
+        elif paramstyle in ("qmark", "numeric"):
+            named = [key for key, params in partitions.items() if isinstance(params, dict)]
+            if named:
+                raise DataSetError(
+                    f"Parameter sets {named} are dicts of named binds, which 'paramstyle: {paramstyle}' "
+                    "doesn't support. Pass lists of positional values, or drop 'paramstyle' to write "
+                    "'%(name)s' binds that are bound on the server."
+                )
+        else:
+            raise DataSetError(f"Unsupported paramstyle '{paramstyle}' for parameterized queries.")
+
+        self._sql = sql
+        self._partitions = partitions
+        self._connection_creds = credentials
+        self._sfqids: Dict[str, str] = {}
+
+    def prefetch(self) -> None:
+        """Submits the query for every parameter set with ``execute_async``,
+        loading a partition then only collects its result by query id."""
+        with self.pool.connection(self._connection_creds) as conn:
+            for key, params in self._partitions.items():
+                if key not in self._sfqids:
+                    self._sfqids[key] = _submit_async(conn, self._sql, params)
+
+    def _read_partition(self, key: str, load_args: Dict[str, Any], op: Optional[instrumentation.Operation]) -> Any:
+        sfqid = self._sfqids.pop(key, None)
+        params = self._partitions[key]
+        output_type = load_args.get("output_type", "pandas")
+        with instrumentation.attach(op):
+            with self.pool.connection(self._connection_creds) as conn:
+                try:
+                    if load_args.get("use_arrow", _pyarrow_installed()):
+                        df = _read_arrow_pandas(conn, self._sql, sfqid, params, output_type)
+                    else:
+                        df = _from_pandas(_read_records_pandas(conn, self._sql, sfqid, params), output_type)
+                except connector.errors.ProgrammingError as e:
+                    instrumentation.record(sfqid=e.sfqid, error=repr(e))
+                    raise DataSetError(f"Loading partition '{key}' failed: {e}") from e
+        return _compact(df, load_args)
+
+    def _load_lazily(self, key: str) -> Any:
+        with instrumentation.operation("load", self):
+            instrumentation.record(partition=key)
+            return self._read_partition(key, self._load_args, instrumentation.current())
+
+    def _load(self) -> Any:
+        if not self._load_args.get("concat"):
+            return {key: partial(self._load_lazily, key) for key in self._partitions}
+
+        with instrumentation.operation("load", self):
+            # more workers than pooled connections would only wait for one
+            max_workers = self._load_args.get("max_workers") or min(len(self._partitions), self.pool.max_size)
+            instrumentation.record(partitions=len(self._partitions))
+
+            # compact once after concatenating so categories line up
+            load_args = {**self._load_args, "compact_dtypes": None}
+            op = instrumentation.current()
+            frames = list(_iter_partitions(
+                lambda key: self._read_partition(key, load_args, op), list(self._partitions), max_workers
+            ))
+            with instrumentation.phase("build"):
+                df = _concat(frames, self._load_args.get("output_type", "pandas"))
+            return _compact(df, self._load_args)
+
+    def _save(self, data: Any) -> None:
+        raise DataSetError("'save' is not supported on SnowflakeParameterizedQueryDataSet")
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"sql": self._sql, "partitions": list(self._partitions), "load_args": self._load_args}
+
+
+class SnowflakeTableDataSet(AbstractDataSet["pd.DataFrame", "pd.DataFrame"]):
 
     """``SnowflakeTableDataSet`` loads data from a SQL table and saves a pandas
 
@@ -231,9 +1634,10 @@ class SnowflakeTableDataSet(AbstractDataSet[pd.DataFrame, pd.DataFrame]):
 
     DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
     DEFAULT_SAVE_ARGS: Dict[str, Any] = {"index": False}
-    # using Any because of Sphinx but it should be
-    # sqlalchemy.engine.Engine or sqlalchemy.engine.base.Engine
-    connections: Dict[str, Any] = {}
+    # shared by every snowflake dataset, keyed by the connection arguments
+    pool: ConnectionPool = _connection_pool
+    # databases, schemas and tables known to exist, keyed by connection
+    verified_objects: Set[str] = set()
 
     pd_to_sf_type_map = {"int": "int",
                      "int64": "int",
@@ -278,83 +1682,350 @@ class SnowflakeTableDataSet(AbstractDataSet[pd.DataFrame, pd.DataFrame]):
         if save_args is not None:
             self._save_args.update(save_args)
 
+        if self._load_args.get("use_arrow") and not _pyarrow_installed():
+            raise _get_pyarrow_missing_error()
+        _check_strategy(self._load_args)
+        _check_output_type(self._load_args)
+
         self._load_args["table_name"] = table_name
         self._save_args["table_name"] = table_name
         self._load_args["schema"] = schema
         self._save_args["schema"] = schema
         self._load_args["database"] = database
         self._save_args["database"] = database
+        # the connector's default paramstyle, without importing it
+        self._load_args["paramstyle"] = credentials.get("paramstyle", "pyformat")
+
+        # fail on bad pushdown arguments when the catalog is built, not on load
+        self.build_select_statement(**self._load_args)
+
+        self._partition_by = _parse_partition_by(self._load_args.get("partition_by"))
+        if self._partition_by is not None:
+            if self._load_args.get("limit") is not None or self._load_args.get("order_by"):
+                raise DataSetError("'partition_by' cannot be combined with 'limit' or 'order_by'.")
+            if isinstance(self._load_args.get("sample"), dict) and "rows" in self._load_args["sample"]:
+                raise DataSetError("'partition_by' cannot be combined with a 'rows' sample.")
+            if self._load_args.get("strategy") == "unload":
+                raise DataSetError("'partition_by' cannot be combined with the 'unload' strategy.")
+
+        # a prefetch with ``strategy: auto`` leaves the resolved args for the load
+        self._resolved: Optional[Tuple[Dict[str, Any], bool]] = None
+        self.load_metrics: Dict[str, Any] = {}
+
+        if self._save_args.get("if_exists", "replace") not in SAVE_MODES:
+            raise DataSetError(f"'if_exists' must be one of {SAVE_MODES}.")
+        if self._save_args.get("if_exists") == "upsert" and not self._save_args.get("merge_keys"):
+            raise DataSetError("'merge_keys' must be passed for 'upsert' saves.")
+        if self._save_args.get("skip_unchanged") and self._save_args.get("if_exists") == "append":
+            raise DataSetError("'skip_unchanged' cannot be combined with 'append' saves.")
+        if self._save_args.get("checkpoint"):
+            _checkpoint_options(self._save_args["checkpoint"])
 
         self._connection_creds = credentials
-
-        self.create_connection(self._connection_creds)
+        # loads bind their filter values on the server, see ``_server_binds``
+        self._load_creds = credentials
+        if self._load_args["paramstyle"] in ("pyformat", "format"):
+            self._load_creds = {**credentials, "paramstyle": "numeric"}
+        self._sfqid = None
+        self._resumed_chunks = 0
+        self._append_next = False
+        self.save_metrics: Dict[str, Any] = {}
 
 
     @classmethod
     def create_connection(cls, connection_kwargs: Dict[str, Any]) -> None:
-        """Given a connection string, create singleton connection
-        to be used across all instances of `SQLQueryDataSet` that
-        need to connect to the same source.
+        """Given a connection string, open a pooled connection so the
+        credentials are checked up front. Datasets no longer call this on
+        init, their first load or save opens the connection. Every dataset
+        with the same connection arguments shares the connections in ``pool``.
         """
-        if "current_connection" in cls.connections:
+        cls.pool.release(connection_kwargs, cls.pool.checkout(connection_kwargs))
+
+    def prefetch(self) -> None:
+        """Submits the table query with ``execute_async`` so it runs in the
+        warehouse while other datasets load, ``_load`` then only collects the
+        result by query id. ``strategy: auto`` picks the strategy here."""
+        if self._sfqid is not None or self._load_args.get("strategy") == "unload":
+            return
+        if self._partition_by is not None and self._load_args.get("strategy") != "auto":
             return
 
-        try:
-            conn = snowflake.connector.connect(**connection_kwargs)
+        with self.pool.connection(self._load_creds) as conn:
+            self._resolved = self._resolve_load_args(conn)
+            load_args, partitioned = self._resolved
+            # partitioned and unloaded loads run several statements, they aren't prefetched
+            if partitioned or load_args.get("strategy") == "unload":
+                return
+            sql, params = SnowflakeTableDataSet.build_select_statement(**load_args)
+            self._sfqid = _submit_async(conn, sql, params)
+
+    def _resolve_load_args(self, conn: connector) -> Tuple[Dict[str, Any], bool]:
+        """Returns the load args with ``strategy: auto`` replaced by the
+        strategy picked from the table's ``INFORMATION_SCHEMA`` counts, and
+        whether the load is partitioned."""
+        if self._load_args.get("strategy") != "auto":
+            return self._load_args, self._partition_by is not None
+
+        with instrumentation.phase("estimate"):
+            try:
+                estimate = _estimate_table(conn, self._load_args)
+            except connector.errors.ProgrammingError as e:
+                logger.warning("Estimating the table size failed, fetching it: %s", e)
+                estimate = {"rows": None, "bytes": None}
+        self.load_metrics = _choose_strategy(estimate, self._load_args, can_partition=self._partition_by is not None)
+        return {**self._load_args, "strategy": self.load_metrics["strategy"]}, self.load_metrics["partitioned"]
 
-        except snowflake.connector.errors.DatabaseError as e:
-            print(e)
-            print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
-            raise _get_missing_module_error(e) from e
 
+    @staticmethod
+    def build_select_statement(partition: Optional[Tuple] = None, **load_args) -> Tuple[str, List[Any]]:
+        """Builds the query used to load the table and its bind parameters,
+        pushing ``columns``, ``filters``, ``sample``, ``order_by`` and
+        ``limit`` down into Snowflake. ``partition`` restricts it to one
+        partition of ``partition_by``."""
+        columns = "*"
+        if load_args.get("columns"):
+            columns = ", ".join(_quote_identifier(column) for column in load_args["columns"])
+
+        sql = f""" SELECT {columns} FROM "{load_args['database']}"."{load_args['schema']}"."{load_args['table_name']}" """
+        params: List[Any] = []
+
+        if load_args.get("sample") is not None:
+            sql += f"{_render_sample(load_args['sample'])} "
+
+        conditions = []
+        if load_args.get("filters"):
+            where, params = _render_filters(
+                load_args["filters"], load_args.get("paramstyle", "pyformat")
+            )
+            conditions.append(where)
+
+        if partition is not None:
+            condition, partition_params = _render_partition(
+                partition, load_args.get("paramstyle", "pyformat"), len(params)
+            )
+            conditions.append(condition)
+            params = params + partition_params
 
-        except snowflake.connector.errors.ProgrammingError as e:
-            print(e)
-            print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
-            raise _get_missing_module_error(e) from e
+        if conditions:
+            sql += f"WHERE {' AND '.join(conditions)} "
 
+        if load_args.get("order_by"):
+            sql += f"ORDER BY {_render_order_by(load_args['order_by'])} "
 
-        cls.connections["current_connection"] = conn
+        if load_args.get("limit") is not None:
+            limit = load_args["limit"]
+            if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+                raise DataSetError("'limit' must be a non-negative integer.")
+            sql += f"LIMIT {limit} "
 
+        return _server_binds(sql, params, load_args.get("paramstyle", "pyformat"))
 
     @staticmethod
-    def read_pandas_from_snowflake(connection: snowflake.connector, **load_args):
+    def read_pandas_from_snowflake(
+        connection: connector, sfqid: Optional[str] = None, **load_args
+    ):
         """ To read data into a Pandas DataFrame, you use a
             Cursor to retrieve the data and then call one of 
             these Cursor methods to put the data into a Pandas
             DataFrame:"""
 
-        sql = f""" SELECT * FROM "{load_args['database']}"."{load_args['schema']}"."{load_args['table_name']}" """
+        sql, params = SnowflakeTableDataSet.build_select_statement(**load_args)
         try:
             #eventually add more options
-            df = pd.read_sql(sql, connection)
-
-            return df
+            use_arrow = load_args.get("use_arrow", _pyarrow_installed())
+            if load_args.get("strategy") == "unload":
+                return _read_unloaded(
+                    connection, sql, params, load_args, load_args["database"], load_args["schema"]
+                )
+
+            output_type = load_args.get("output_type", "pandas")
+            if load_args.get("chunked"):
+                return _compact_batches(_read_pandas_batches(
+                    connection, sql, load_args.get("batch_rows"), use_arrow, sfqid, params, output_type
+                ), load_args)
+
+            if use_arrow:
+                df = _read_arrow_pandas(connection, sql, sfqid, params, output_type)
+            elif sfqid is not None:
+                df = _read_records_pandas(connection, sql, sfqid, params)
+            else:
+                # pd.read_sql runs and fetches in one go
+                with instrumentation.phase("fetch"):
+                    df = pd.read_sql(sql, connection, params=params or None)
+                instrumentation.record(rows=len(df), nbytes=int(df.memory_usage(index=False).sum()))
+
+            return _compact(df, load_args)
         
-        except snowflake.connector.errors.ProgrammingError as e:
+        except connector.errors.ProgrammingError as e:
             print(e)
             print('Error {0} ({1}): {2} ({3})'.format(e.errno, e.sqlstate, e.msg, e.sfqid))
+            instrumentation.record(sfqid=e.sfqid, error=repr(e))
             return
 
         except Exception as e:
             print(e)
+            instrumentation.record(error=repr(e))
             print(f"query failed for {sql}")
             return
 
 
-    def _load(self) -> pd.DataFrame:
-        conn = self.connections["current_connection"]
+    def _partitions(self, conn: connector) -> List[Tuple]:
+        """Lists the partitions of ``load_args.partition_by``, automatic
+        ranges split the column's minimum to maximum after ``filters`` into
+        equal widths, the first range also holds the nulls."""
+        spec = self._partition_by
+        if spec["method"] == "hash":
+            return [("hash", spec["column"], spec["partitions"], index) for index in range(spec["partitions"])]
+        if spec["ranges"] is not None:
+            return [("range", spec["column"], lower, upper, False) for lower, upper in spec["ranges"]]
 
-        return SnowflakeTableDataSet.read_pandas_from_snowflake(conn, **self._load_args)
+        sql, params = SnowflakeTableDataSet.build_select_statement(
+            **{**self._load_args, "columns": None, "sample": None}
+        )
+        column = _quote_identifier(spec["column"])
+        cursor = conn.cursor()
+        try:
+            _execute(cursor, f"SELECT MIN({column}), MAX({column}) FROM ({sql})", params=params)
+            lower, upper = cursor.fetchone()
+        finally:
+            cursor.close()
+
+        if lower is None:
+            return [("range", spec["column"], None, None, True)]
+
+        # the outer ranges are open so rows added since the probe still load
+        bounds = [None] + _split_range(lower, upper, spec["partitions"]) + [None]
+        return [
+            ("range", spec["column"], lower_bound, upper_bound, index == 0)
+            for index, (lower_bound, upper_bound) in enumerate(zip(bounds, bounds[1:]))
+        ]
+
+    def _read_partition(
+        self, partition: Tuple, load_args: Dict[str, Any], op: Optional[instrumentation.Operation]
+    ) -> pd.DataFrame:
+        with instrumentation.attach(op):
+            with self.pool.connection(self._load_creds) as conn:
+                df = SnowflakeTableDataSet.read_pandas_from_snowflake(conn, partition=partition, **load_args)
+        if df is None:
+            raise DataSetError(f"Loading partition {partition} of '{self._load_args['table_name']}' failed.")
+        return df
+
+    def _load_partitioned(self, load_args: Dict[str, Any]) -> Any:
+        """Reads the partitions of ``load_args.partition_by`` concurrently,
+        each over its own pooled connection, and concatenates them in
+        partition order. Chunked loads yield the partitions instead."""
+        with self.pool.connection(self._load_creds) as conn:
+            partitions = self._partitions(conn)
+        # more workers than pooled connections would only wait for one
+        max_workers = self._partition_by["max_workers"] or min(len(partitions), self.pool.max_size)
+        instrumentation.record(partitions=len(partitions))
+
+        load_args = {**load_args, "chunked": False}
+        op = instrumentation.current()
+        if self._load_args.get("chunked"):
+            # every partition worker records its own phases, rows and bytes
+            return _ChunkedLoad(
+                _iter_partitions(lambda partition: self._read_partition(partition, load_args, op), partitions, max_workers),
+                op,
+                count=False,
+                phase=None,
+            )
 
+        # compact once after concatenating so categories line up
+        load_args["compact_dtypes"] = None
+        frames = list(_iter_partitions(
+            lambda partition: self._read_partition(partition, load_args, op), partitions, max_workers
+        ))
+        with instrumentation.phase("build"):
+            df = _concat(frames, self._load_args.get("output_type", "pandas"))
+        return _compact(df, self._load_args)
 
-    def _save(self, data: pd.DataFrame) -> None:
-        """Saves data back to a Snowflake table"""
-        conn = self.connections["current_connection"]
+    def _load(self) -> pd.DataFrame:
+        with instrumentation.operation("load", self):
+            auto = self._load_args.get("strategy") == "auto"
+            resolved, self._resolved = self._resolved, None
+            if resolved is None:
+                if auto:
+                    with self.pool.connection(self._load_creds) as conn:
+                        resolved = self._resolve_load_args(conn)
+                else:
+                    resolved = self._load_args, self._partition_by is not None
+            load_args, partitioned = resolved
+            if auto:
+                _report_decision(self.load_metrics, self._load_args["table_name"])
+
+            if partitioned:
+                df = self._load_partitioned(load_args)
+            else:
+                # a chunked load may hold its connection until it is consumed
+                conn = self.pool.checkout(self._load_creds, overflow=bool(load_args.get("chunked")))
+                sfqid, self._sfqid = self._sfqid, None
+                try:
+                    df = SnowflakeTableDataSet.read_pandas_from_snowflake(conn, sfqid, **load_args)
+                except Exception:
+                    self.pool.release(self._load_creds, conn)
+                    raise
+
+                if load_args.get("chunked") and isinstance(df, collections.abc.Iterator):
+                    return _chunked_load(df, load_args, self.pool, self._load_creds, conn)
+
+                self.pool.release(self._load_creds, conn)
+
+            if auto and not load_args.get("chunked") and df is not None:
+                _report_actual(self.load_metrics, self._load_args["table_name"])
+            return df
 
-        create_statements = self.create_table_sql_statements(data, **self._save_args)
 
-        status = self.write_table(create_statements, conn, data, **self._save_args)
+    def continue_node_output(self) -> None:
+        """Makes the next save append to the table, whatever ``if_exists``
+        says. ``SnowflakeStreamedSaveHook`` calls it before every chunk of a
+        generator node but the first, which Kedro runners save one by one."""
+        self._append_next = True
+
+    def _save(self, data: pd.DataFrame) -> None:
+        """Saves data back to a Snowflake table, Arrow tables and polars
+        frames are staged as Parquet without converting them to pandas.
+        An iterator of chunks or ``StreamedChunks`` is streamed to a stage
+        as it is produced"""
+        save_args = self._save_args
+        append, self._append_next = self._append_next, False
+        if append:
+            if save_args.get("skip_unchanged"):
+                raise DataSetError(
+                    "'skip_unchanged' cannot fingerprint the chunks of a generator node, "
+                    "return them as 'StreamedChunks' to save them at once."
+                )
+            if save_args.get("if_exists", "replace") == "replace":
+                save_args = {**save_args, "if_exists": "append"}
+
+        if isinstance(data, (collections.abc.Iterator, StreamedChunks)):
+            if save_args.get("skip_unchanged"):
+                raise DataSetError("'skip_unchanged' cannot fingerprint an iterator of chunks.")
+            data = _ChunkStream(iter(data))
+        else:
+            data = _as_saveable(data)
+
+        with instrumentation.operation("save", self):
+            with self.pool.connection(self._connection_creds) as conn:
+                fingerprint = None
+                if save_args.get("skip_unchanged"):
+                    start = time.perf_counter()
+                    with instrumentation.phase("fingerprint"):
+                        fingerprint = frame_fingerprint(data)
+                    if fingerprint == self.stored_fingerprint(conn, **save_args):
+                        self.skip_write(data, fingerprint, start, **save_args)
+                        return True
+
+                # a streamed save creates the table from its first chunk
+                create_statements = self.create_table_sql_statements(
+                    data.first if isinstance(data, _ChunkStream) else data, **save_args
+                )
+
+                status = self.write_table(create_statements, conn, data, **save_args)
+
+                if fingerprint is not None and status:
+                    self.store_fingerprint(conn, fingerprint, **save_args)
+                    self.save_metrics["fingerprint"] = fingerprint
 
         return status
 
@@ -373,12 +2044,26 @@ class SnowflakeTableDataSet(AbstractDataSet[pd.DataFrame, pd.DataFrame]):
         return safe_name
 
 
+    @staticmethod
+    def rename_to_safe_names(df:Any) -> Any:
+        """ Renames the columns of a dataframe or Arrow table to Snowflake safe names """
+        if _is_arrow_table(df):
+            return df.rename_columns([SnowflakeTableDataSet.convert_to_snowflake_safe_names(column) for column in df.column_names])
+
+        df.columns = [SnowflakeTableDataSet.convert_to_snowflake_safe_names(column) for column in df.columns]
+        return df
+
+
     def create_table_sql_statements(self, df:pd.DataFrame, pd_to_sf_type_map: Dict[str, str] = pd_to_sf_type_map, **save_args) -> list:
 
         # construct columns + types
         columns_text_list = []
-        for column in df.columns:
-            sf_type = pd_to_sf_type_map[df[column].dtype.name]
+        if _is_arrow_table(df):
+            column_types = [(field.name, _arrow_to_sf_type(field.type)) for field in df.schema]
+        else:
+            column_types = [(column, _pandas_to_sf_type(dtype, pd_to_sf_type_map)) for column, dtype in df.dtypes.items()]
+
+        for column, sf_type in column_types:
 
             column_name_preped = SnowflakeTableDataSet.convert_to_snowflake_safe_names(column)
             column_text = f""" "{column_name_preped}" {sf_type} """
@@ -390,38 +2075,380 @@ class SnowflakeTableDataSet(AbstractDataSet[pd.DataFrame, pd.DataFrame]):
         create_db_statment = f""" CREATE DATABASE IF NOT EXISTS "{save_args['database']}" """
         create_schema_statment = f""" CREATE SCHEMA IF NOT EXISTS "{save_args['database']}"."{save_args['schema']}" """
 
-        if save_args['if_exists'] == 'replace':
+        if save_args.get('if_exists', 'replace') == 'replace':
             create_tbl_statement = f""" CREATE OR REPLACE TABLE "{save_args['database']}"."{save_args['schema']}"."{table}" ( {columns_text} ) """
         else:
-            create_tbl_statement = f""" CREATE IF NOT EXISTS "{save_args['database']}"."{save_args['schema']}"."{table}" ( {columns_text} ) """
+            # append and upsert keep the existing rows
+            create_tbl_statement = f""" CREATE TABLE IF NOT EXISTS "{save_args['database']}"."{save_args['schema']}"."{table}" ( {columns_text} ) """
 
         create_statements = [create_db_statment, create_schema_statment, create_tbl_statement] 
 
         return create_statements
 
     
-    def write_table(self, create_statements:list, conn:snowflake.connector, df:pd.DataFrame, **save_args) -> bool:
-        #Create the table if it doesn't exist
-        for statement in create_statements:
-            conn.cursor().execute(statement)
-        
-        conn.cursor().execute(f""" use database "{save_args['database']}" """)
-        conn.cursor().execute(f""" use schema "{save_args['database']}"."{save_args['schema']}" """)
+    def run_create_statements(self, create_statements:list, conn:connector, **save_args) -> None:
+        """ Runs the database, schema and table statements in one multi-statement
+            request, skipping objects this process already created or verified
+            with the same credentials. ``CREATE OR REPLACE`` always runs. A
+            failed request doesn't say which statement failed, so the
+            statements, which can all run again, are retried one by one to
+            report it """
+        table = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['table_name'])
+        connection_key = self.pool.make_key(self._connection_creds)
+        object_keys = [
+            f"{connection_key}:{save_args['database']}",
+            f"{connection_key}:{save_args['database']}.{save_args['schema']}",
+            f"{connection_key}:{save_args['database']}.{save_args['schema']}.{table}",
+        ]
+
+        pending = [
+            statement for statement, object_key in zip(create_statements, object_keys)
+            if object_key not in self.verified_objects or "CREATE OR REPLACE" in statement
+        ]
+        with instrumentation.phase("ddl"):
+            if len(pending) == 1:
+                conn.cursor().execute(pending[0])
+            elif pending:
+                try:
+                    conn.cursor().execute(";".join(pending), num_statements=len(pending))
+                except connector.errors.Error:
+                    for number, statement in enumerate(pending, start=1):
+                        try:
+                            conn.cursor().execute(statement)
+                        except connector.errors.Error as e:
+                            raise DataSetError(
+                                f"DDL statement {number} of {len(pending)} failed: {statement.strip()}: {e}"
+                            ) from e
+
+        self.verified_objects.update(object_keys)
+
+
+    def write_table(self, create_statements:list, conn:connector, df:pd.DataFrame, **save_args) -> bool:
+        #Create the table if it doesn't exist, a checkpointed replace swaps it in at the end
+        checkpoint = save_args.get('checkpoint')
+        if not (checkpoint and save_args.get('if_exists', 'replace') == 'replace'):
+            self.run_create_statements(create_statements, conn, **save_args)
 
         #prep table name again
         table = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['table_name'])
 
         #prep column names
-        columns = df.columns
-        columns = [ SnowflakeTableDataSet.convert_to_snowflake_safe_names(column) for column in columns]
-        df.columns = columns
-
-        # Loading our DataFrame data to the newly created empty table
-        success, num_chunks, num_rows, output = write_pandas(
-                conn=conn,
-                df=df,
-                table_name = table
-            )
-        
+        if isinstance(df, _ChunkStream):
+            df.columns = [SnowflakeTableDataSet.convert_to_snowflake_safe_names(column) for column in df.columns]
+            df = df.map(SnowflakeTableDataSet.rename_to_safe_names)
+        else:
+            df = SnowflakeTableDataSet.rename_to_safe_names(df)
+
+        start = time.perf_counter()
+        try:
+            if checkpoint:
+                success, num_rows, num_chunks, staged_bytes = self.write_checkpointed(conn, df, table, **save_args)
+            elif save_args.get('if_exists', 'replace') == 'upsert':
+                success, num_rows, num_chunks, staged_bytes = self.merge_table(conn, df, table, **save_args)
+            else:
+                # Loading our DataFrame data to the newly created empty table
+                success, num_rows, num_chunks, staged_bytes = self.load_frame(conn, df, table, **save_args)
+        except Exception:
+            # the table may have been dropped behind our back, verify it again next time
+            self.verified_objects.clear()
+            raise
+
+        self.save_metrics = {
+            "rows": num_rows,
+            "chunks": num_chunks,
+            "frame_bytes": df.frame_bytes if isinstance(df, _ChunkStream) else _frame_bytes(df),
+            "staged_bytes": staged_bytes,
+            "seconds": time.perf_counter() - start,
+            "skipped": False,
+        }
+        if checkpoint:
+            self.save_metrics["resumed_chunks"] = self._resumed_chunks
+        logger.info("Saved %s.%s.%s: %s", save_args['database'], save_args['schema'], table, self.save_metrics)
+        instrumentation.record(
+            rows=num_rows,
+            nbytes=staged_bytes if staged_bytes is not None else self.save_metrics["frame_bytes"],
+            chunks=num_chunks,
+        )
+
         return success
 
+
+    def stored_fingerprint(self, conn:connector, **save_args) -> Optional[str]:
+        """ Returns the fingerprint the last ``skip_unchanged`` save kept in
+            the table comment, None when the table or the comment is missing """
+        table = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['table_name'])
+        paramstyle = self._connection_creds.get("paramstyle", "pyformat")
+        sql = (
+            f""" SELECT COMMENT FROM "{save_args['database']}".INFORMATION_SCHEMA.TABLES """
+            f""" WHERE TABLE_SCHEMA = {_placeholder(paramstyle, 1)} AND TABLE_NAME = {_placeholder(paramstyle, 2)} """
+        )
+        try:
+            with instrumentation.phase("execute"):
+                row = conn.cursor().execute(sql, (save_args['schema'], table)).fetchone()
+        except connector.errors.ProgrammingError:
+            # the database doesn't exist yet
+            return None
+
+        comment = row[0] if row else None
+        if not comment or not comment.startswith(FINGERPRINT_PREFIX):
+            return None
+        return comment[len(FINGERPRINT_PREFIX):]
+
+    @staticmethod
+    def store_fingerprint(conn:connector, fingerprint:str, **save_args) -> None:
+        """ Keeps the fingerprint of the saved data in the table comment,
+            replacing any comment the table had """
+        table = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['table_name'])
+        with instrumentation.phase("ddl"):
+            conn.cursor().execute(
+                f""" COMMENT ON TABLE "{save_args['database']}"."{save_args['schema']}"."{table}" IS '{FINGERPRINT_PREFIX}{fingerprint}' """
+            )
+
+    def skip_write(self, data:Any, fingerprint:str, start:float, **save_args) -> None:
+        """ Records a save that was skipped because the table already holds
+            data with the same fingerprint """
+        table = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['table_name'])
+        self.save_metrics = {
+            "rows": 0,
+            "chunks": 0,
+            "frame_bytes": _frame_bytes(data),
+            "staged_bytes": 0,
+            "seconds": time.perf_counter() - start,
+            "skipped": True,
+            "fingerprint": fingerprint,
+        }
+        logger.info("Skipped saving %s.%s.%s, the data is unchanged: %s", save_args['database'], save_args['schema'], table, self.save_metrics)
+        instrumentation.record(rows=0, nbytes=0, skipped=True)
+
+
+    @staticmethod
+    def load_frame(conn:connector, df:pd.DataFrame, table:str, **save_args) -> Tuple[bool, int, int, Optional[int]]:
+        """ Appends the dataframe to an existing table in the current schema.
+            Returns success, rows, chunks and staged bytes when known """
+        if isinstance(df, _StagedChunks):
+            if not df.files:
+                return True, 0, 0, 0
+            success, num_rows = copy_staged_files(
+                conn,
+                df.location,
+                df.files,
+                save_args['database'],
+                save_args['schema'],
+                table,
+                use_logical_type=save_args.get("use_logical_type", True if df.arrow else None),
+            )
+            return success, num_rows, len(df.files), df.staged_bytes
+
+        if isinstance(df, _ChunkStream):
+            # every chunk is staged while the next one is produced, then copied at once
+            with tempfile.TemporaryDirectory(prefix="kedro_snowflake_") as directory:
+                return stream_and_copy(
+                    conn,
+                    df,
+                    directory,
+                    save_args['database'],
+                    save_args['schema'],
+                    table,
+                    compression=save_args.get("compression", "snappy"),
+                    max_in_flight=save_args.get("max_in_flight", 2),
+                    use_logical_type=save_args.get("use_logical_type", True if df.arrow else None),
+                )
+
+        if _is_arrow_table(df):
+            # Arrow is written to Parquet as is and staged, never via pandas
+            with tempfile.TemporaryDirectory(prefix="kedro_snowflake_") as directory:
+                with instrumentation.phase("serialize"):
+                    files = write_arrow_chunks(
+                        df,
+                        directory,
+                        chunk_size=save_args.get("chunk_size"),
+                        compression=save_args.get("compression", "snappy"),
+                    )
+                success, num_rows = stage_and_copy(
+                    conn,
+                    directory,
+                    save_args['database'],
+                    save_args['schema'],
+                    table,
+                    parallel=save_args.get("parallel", 4),
+                    use_logical_type=save_args.get("use_logical_type", True),
+                )
+            return success, num_rows, len(files), sum(size for _, size in files)
+
+        if save_args.get("serialize_processes"):
+            # serialize the chunks across a process pool, then stage them in one PUT
+            with tempfile.TemporaryDirectory(prefix="kedro_snowflake_") as directory:
+                with instrumentation.phase("serialize"):
+                    files = write_parquet_chunks(
+                        df,
+                        directory,
+                        chunk_size=save_args.get("chunk_size"),
+                        compression=save_args.get("compression", "snappy"),
+                        processes=save_args["serialize_processes"],
+                    )
+                success, num_rows = stage_and_copy(
+                    conn,
+                    directory,
+                    save_args['database'],
+                    save_args['schema'],
+                    table,
+                    parallel=save_args.get("parallel", 4),
+                    use_logical_type=save_args.get("use_logical_type"),
+                )
+            return success, num_rows, len(files), sum(size for _, size in files)
+
+        write_kwargs = {key: save_args[key] for key in WRITE_PANDAS_ARGS if key in save_args}
+        # write_pandas serializes, uploads and copies in one call
+        with instrumentation.phase("upload"):
+            success, num_chunks, num_rows, output = write_pandas(
+                    conn=conn,
+                    df=df,
+                    table_name = table,
+                    database = save_args['database'],
+                    schema = save_args['schema'],
+                    **write_kwargs
+                )
+        return success, num_rows, num_chunks, None
+
+
+    @staticmethod
+    def filter_watermark(conn:connector, df:Any, target:str, watermark:str) -> Any:
+        """ Drops the rows at or below the target's high watermark, they have
+            already been merged """
+        with instrumentation.phase("execute"):
+            latest = conn.cursor().execute(f""" SELECT MAX("{watermark}") FROM {target} """).fetchone()[0]
+        if latest is None:
+            return df
+        if isinstance(df, _ChunkStream):
+            return df.map(lambda chunk: _newer_rows(chunk, watermark, latest))
+        return _newer_rows(df, watermark, latest)
+
+
+    def write_checkpointed(self, conn:connector, df:Any, table:str, **save_args) -> Tuple[bool, int, int, Optional[int]]:
+        """ Uploads the data in numbered, content addressed chunks to a
+            permanent stage and records each one in a local manifest, so a
+            failed save resumes with the chunks that are missing. The table
+            only changes once every chunk is staged: a replaced table is
+            loaded under another name and swapped in, appends are copied at
+            once and upserts merged from a temporary table """
+        options = _checkpoint_options(save_args['checkpoint'])
+        database, schema = save_args['database'], save_args['schema']
+        target = f""" "{database}"."{schema}"."{table}" """.strip()
+        replace = save_args.get('if_exists', 'replace') == 'replace'
+
+        first = df.first if isinstance(df, _ChunkStream) else df
+        if replace:
+            swap_table = f"{table}_kedro_swap_{uuid.uuid4().hex[:12]}"
+            target_statements = self.create_table_sql_statements(first, **{**save_args, 'if_exists': 'append'})
+            swap_statement = self.create_table_sql_statements(first, **{**save_args, 'table_name': swap_table})[-1]
+        elif save_args.get('if_exists') == 'upsert' and save_args.get('watermark_column'):
+            watermark = SnowflakeTableDataSet.convert_to_snowflake_safe_names(save_args['watermark_column'])
+            df = SnowflakeTableDataSet.filter_watermark(conn, df, target, watermark)
+
+        stage = options.get("stage")
+        if not stage:
+            stage = f""" "{database}"."{schema}"."KEDRO_CHECKPOINTS" """.strip()
+            with instrumentation.phase("ddl"):
+                conn.cursor().execute(f""" CREATE STAGE IF NOT EXISTS {stage} """)
+
+        if isinstance(df, _ChunkStream):
+            chunks = df
+        else:
+            chunk_size = save_args.get("chunk_size") or CHECKPOINT_CHUNK_ROWS
+            chunks = (
+                df.slice(start, chunk_size) if _is_arrow_table(df) else df.iloc[start:start + chunk_size]
+                for start in range(0, len(df), chunk_size)
+            )
+
+        checkpoint = UploadCheckpoint(options["path"], f"{database}.{schema}.{table}", stage)
+        retry_args = {key: options[key] for key in ("retries", "backoff", "max_backoff") if key in options}
+        with tempfile.TemporaryDirectory(prefix="kedro_snowflake_") as directory:
+            files, num_rows, staged_bytes, self._resumed_chunks = upload_chunks(
+                conn,
+                chunks,
+                checkpoint,
+                directory,
+                compression=save_args.get("compression", "snappy"),
+                max_in_flight=save_args.get("max_in_flight", 2),
+                retry_args=retry_args,
+            )
+        if self._resumed_chunks:
+            logger.info("Resumed the save of %s, %d of %d chunks were already staged", target, self._resumed_chunks, len(files))
+
+        columns = df.columns if isinstance(df, _ChunkStream) else list(df.column_names if _is_arrow_table(df) else df.columns)
+        arrow = df.arrow if isinstance(df, _ChunkStream) else _is_arrow_table(df)
+        staged = _StagedChunks(checkpoint.location, files, num_rows, staged_bytes, columns, arrow)
+
+        if replace:
+            self.run_create_statements(target_statements, conn, **save_args)
+            swapped = f""" "{database}"."{schema}"."{swap_table}" """.strip()
+            with instrumentation.phase("ddl"):
+                conn.cursor().execute(swap_statement)
+            try:
+                success, num_rows, _, _ = self.load_frame(conn, staged, swap_table, **save_args)
+                if success:
+                    with instrumentation.phase("ddl"):
+                        conn.cursor().execute(f""" ALTER TABLE {swapped} SWAP WITH {target} """)
+            finally:
+                conn.cursor().execute(f""" DROP TABLE IF EXISTS {swapped} """)
+        elif save_args.get('if_exists') == 'upsert':
+            success, num_rows, _, _ = self.merge_table(conn, staged, table, **save_args)
+        else:
+            success, num_rows, _, _ = self.load_frame(conn, staged, table, **save_args)
+
+        if success:
+            conn.cursor().execute(f"REMOVE {checkpoint.location}")
+            checkpoint.remove()
+        return success, num_rows, len(files), staged_bytes
+
+
+    def merge_table(self, conn:connector, df:pd.DataFrame, table:str, **save_args) -> Tuple[bool, int, int, Optional[int]]:
+        """ Upserts the dataframe: the rows are staged into a temporary table
+            and merged into the target on ``merge_keys`` with a single MERGE,
+            which only updates matched rows whose values changed. Every row
+            is staged, with ``watermark_column`` only the rows newer than the
+            target's maximum watermark are """
+        target = f""" "{save_args['database']}"."{save_args['schema']}"."{table}" """.strip()
+        merge_keys = [SnowflakeTableDataSet.convert_to_snowflake_safe_names(key) for key in save_args['merge_keys']]
+        missing = [key for key in merge_keys if key not in list(df.column_names if _is_arrow_table(df) else df.columns)]
+        if missing:
+            raise DataSetError(f"'merge_keys' {missing} are not columns of the saved data.")
+        watermark = save_args.get('watermark_column')
+        if watermark:
+            watermark = SnowflakeTableDataSet.convert_to_snowflake_safe_names(watermark)
+            # staged chunks were filtered before they were uploaded
+            if not isinstance(df, _StagedChunks):
+                df = SnowflakeTableDataSet.filter_watermark(conn, df, target, watermark)
+
+        if not isinstance(df, _ChunkStream) and len(df) == 0:
+            return True, 0, 0, None
+
+        stage_table = f"{table}_kedro_merge_{uuid.uuid4().hex[:12]}"
+        staged = f""" "{save_args['database']}"."{save_args['schema']}"."{stage_table}" """.strip()
+        with instrumentation.phase("ddl"):
+            conn.cursor().execute(f""" CREATE TEMPORARY TABLE {staged} LIKE {target} """)
+        try:
+            success, num_rows, num_chunks, staged_bytes = self.load_frame(conn, df, stage_table, **save_args)
+            if not success:
+                return success, num_rows, num_chunks, staged_bytes
+
+            columns = [f'"{column}"' for column in (df.column_names if _is_arrow_table(df) else df.columns)]
+            updates = [column for column in columns if column.strip('"') not in merge_keys]
+
+            on_clause = " AND ".join(f'target."{key}" = source."{key}"' for key in merge_keys)
+            changed = " OR ".join(f"target.{column} IS DISTINCT FROM source.{column}" for column in updates)
+            if watermark:
+                changed = f'source."{watermark}" > target."{watermark}"'
+
+            merge_statement = f""" MERGE INTO {target} AS target USING {staged} AS source ON {on_clause} """
+            if updates:
+                set_clause = ", ".join(f"target.{column} = source.{column}" for column in updates)
+                merge_statement += f""" WHEN MATCHED AND ({changed}) THEN UPDATE SET {set_clause} """
+            merge_statement += f""" WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join('source.' + column for column in columns)}) """
+
+            with instrumentation.phase("merge"):
+                conn.cursor().execute(merge_statement)
+        finally:
+            conn.cursor().execute(f""" DROP TABLE IF EXISTS {staged} """)
+
+        return success, num_rows, num_chunks, staged_bytes
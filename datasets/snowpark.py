@@ -1,16 +1,16 @@
+from __future__ import annotations
+
+import contextlib
 import copy
+import logging
 import re
+import threading
 from pathlib import PurePosixPath
-from typing import Any, Dict, NoReturn, Optional, Callable
+from typing import Any, Dict, Iterator, NoReturn, Optional, Callable
 import re
 
-import fsspec
-import pandas as pd
-
 #import snowflake.connector
 #from snowflake.connector.pandas_tools import write_pandas
-from snowflake.snowpark import Session
-import snowflake.snowpark as sp
 
 
 # from sqlalchemy import create_engine
@@ -23,6 +23,10 @@ from kedro.io.core import (
     get_protocol_and_path,
 )
 
+from . import instrumentation
+from .connection_pool import ConnectionPool
+from .lazy import lazy_import
+
 
 # needed inputs example:
 # connection_parameters = {
@@ -39,7 +43,14 @@ from kedro.io.core import (
 
 
 
-__all__ = ["SnowparkSessionDataSet"]
+__all__ = ["SnowparkSessionDataSet", "SnowparkTableDataSet", "SnowparkQueryDataSet"]
+
+# snowpark takes seconds to import, only pay for it on the first load
+sp = lazy_import("snowflake.snowpark")
+
+SAVE_MODES = ("append", "overwrite", "errorifexists", "ignore")
+
+logger = logging.getLogger(__name__)
 
 KNOWN_PIP_INSTALL = {
     "snowflake-snowpark-python": "snowflake-snowpark-python",
@@ -111,18 +122,29 @@ def _get_snowflake_sql_missing_error() -> DataSetError:
 
 class SnowparkSessionDataSet(AbstractDataSet[None, Callable]):
 
-    """ `SnowparkSessionDataSet` returns snowpark session object"""
+    """ `SnowparkSessionDataSet` returns snowpark session object
+
+        Sessions are shared by every snowpark dataset with the same credentials
+        and are only created on the first load or when warmed up with
+        `prefetch()`. A dataset's `query_tag` is set on the shared session
+        while its own load or save runs, so warehouse time can be traced back
+        to it. The session this dataset loads keeps the tag until another
+        tagged dataset runs."""
     DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
     DEFAULT_SAVE_ARGS: Dict[str, Any] = {"index": False}
-    # using Any because of Sphinx but it should be
-    # sqlalchemy.engine.Engine or sqlalchemy.engine.base.Engine
+    # sessions keyed by a hash of the credentials
     sessions: Dict[str, Any] = {}
+    _session_locks: Dict[str, threading.Lock] = {}
+    # held while a tagged action runs, so concurrent ones don't swap the tag
+    _tag_locks: Dict[int, threading.RLock] = {}
+    _locks_lock = threading.Lock()
 
     def __init__(
         self,
         credentials: Dict[str, Any],
         load_args: Dict[str, Any] = None,
         save_args: Dict[str, Any] = None, 
+        query_tag: str = None,
     ) -> None:
 
         if not (credentials and "user" in credentials and credentials['user']):
@@ -140,27 +162,73 @@ class SnowparkSessionDataSet(AbstractDataSet[None, Callable]):
             self._save_args.update(save_args)
 
         self._session_creds = credentials
-        self.create_session(self._session_creds)
+        self._query_tag = query_tag
+
+    @classmethod
+    def create_session(cls, session_kwargs: Dict[str, Any]) -> sp.Session:
+        """
+            Given a connection string return the session shared by every
+            snowpark dataset with the same credentials, creating it on first use
+        """
+        key = ConnectionPool.make_key(session_kwargs)
+        with cls._locks_lock:
+            lock = cls._session_locks.setdefault(key, threading.Lock())
+
+        # a lock per key so slow logins don't block sessions for other configs
+        with lock:
+            if key not in cls.sessions:
+                with instrumentation.phase("connect"):
+                    cls.sessions[key] = sp.Session.builder.configs(session_kwargs).create()
+
+        return cls.sessions[key]
 
     @classmethod
-    def create_session(cls, session_kwargs: Dict[str, Any]) -> None:
+    @contextlib.contextmanager
+    def tagged(cls, session: sp.Session, query_tag: str = None) -> Iterator[sp.Session]:
         """
-            Given a connection string create a singleton session
-            to be used accross all instances of `SnowparkSessionDataSet`
+            Sets `query_tag` on `session` for the statements run inside the
+            block and restores the previous tag afterwards, a no-op without
+            a tag
         """
-        if "current_session" in cls.sessions:
+        if not query_tag:
+            yield session
             return
-        
-        # try: 
-        session = Session.builder.configs(session_kwargs).create() 
-        
-        # except Exception as e:
-        #     print(e)
-        
-        cls.sessions['current_session'] = session
+
+        with cls._locks_lock:
+            lock = cls._tag_locks.setdefault(id(session), threading.RLock())
+        with lock:
+            previous = session.query_tag
+            session.query_tag = query_tag
+            try:
+                yield session
+            finally:
+                session.query_tag = previous
+
+    @classmethod
+    def warm_up(cls, session_kwargs: Dict[str, Any], query_tag: str = None) -> threading.Thread:
+        """
+            Creates the session and runs a `SELECT 1` in a background thread,
+            so the login and warehouse resume overlap with other work
+        """
+        def _warm_up() -> None:
+            try:
+                with cls.tagged(cls.create_session(session_kwargs), query_tag) as session:
+                    session.sql("SELECT 1").collect()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Warming up the snowpark session failed: %s", e)
+
+        thread = threading.Thread(target=_warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    def prefetch(self) -> None:
+        """ Warms up the session in the background, called by `SnowflakePrefetchHook` """
+        self.warm_up(self._session_creds, self._query_tag)
 
     def _load(self) -> Callable:
-        session = self.sessions['current_session']
+        session = self.create_session(self._session_creds)
+        if self._query_tag:
+            session.query_tag = self._query_tag
 
         return session
 
@@ -171,4 +239,140 @@ class SnowparkSessionDataSet(AbstractDataSet[None, Callable]):
 
     def _describe(self) -> None:
         """ return dict that describes attr of the dataset (not used)"""
-        return
\ No newline at end of file
+        return
+
+
+
+class SnowparkTableDataSet(AbstractDataSet["sp.DataFrame", "sp.DataFrame"]):
+
+    """ `SnowparkTableDataSet` loads a table as a lazy snowpark DataFrame and
+        saves snowpark DataFrames with `save_as_table`. Nothing is pulled to
+        the client, nodes work on the DataFrame and it runs as pushed-down SQL.
+
+        `load_args.cache_result` materializes the table into a temporary table
+        on load, `save_args.mode` is one of append, overwrite (default),
+        errorifexists or ignore and `save_args.table_type` can be temporary
+        or transient."""
+    DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
+    DEFAULT_SAVE_ARGS: Dict[str, Any] = {"mode": "overwrite"}
+
+    def __init__(
+        self,
+        table_name: str,
+        schema: str,
+        database: str,
+        credentials: Dict[str, Any],
+        load_args: Dict[str, Any] = None,
+        save_args: Dict[str, Any] = None,
+        query_tag: str = None,
+    ) -> None:
+        if not table_name:
+            raise DataSetError("'table_name' argument cannot be empty.")
+        if not schema:
+            raise DataSetError("'schema' argument cannot be empty.")
+        if not database:
+            raise DataSetError("'database' argument cannot be empty.")
+
+        if not (credentials and "user" in credentials and credentials['user']):
+            raise DataSetError(
+                "'user', 'password', and 'account' must be passed"
+                " see docs for other connection methods"
+            )
+
+        # Handle default load and save arguments
+        self._load_args = copy.deepcopy(self.DEFAULT_LOAD_ARGS)
+        if load_args is not None:
+            self._load_args.update(load_args)
+        self._save_args = copy.deepcopy(self.DEFAULT_SAVE_ARGS)
+        if save_args is not None:
+            self._save_args.update(save_args)
+
+        if self._save_args["mode"] not in SAVE_MODES:
+            raise DataSetError(f"'mode' must be one of {SAVE_MODES}.")
+
+        self._table_name = [database, schema, table_name]
+        self._session_creds = credentials
+        self._query_tag = query_tag
+
+    def prefetch(self) -> None:
+        """ Warms up the session in the background, called by `SnowflakePrefetchHook` """
+        SnowparkSessionDataSet.warm_up(self._session_creds, self._query_tag)
+
+    def _load(self) -> sp.DataFrame:
+        with instrumentation.operation("load", self):
+            session = SnowparkSessionDataSet.create_session(self._session_creds)
+
+            with SnowparkSessionDataSet.tagged(session, self._query_tag):
+                df = session.table(self._table_name)
+                if self._load_args.get("cache_result"):
+                    with instrumentation.phase("execute"):
+                        df = df.cache_result()
+
+        return df
+
+    def _save(self, data: sp.DataFrame) -> None:
+        if not isinstance(data, sp.DataFrame):
+            raise DataSetError(
+                f"'SnowparkTableDataSet' can only save snowpark DataFrames, got {type(data).__name__}."
+            )
+
+        with instrumentation.operation("save", self), instrumentation.phase("execute"):
+            with SnowparkSessionDataSet.tagged(data.session, self._query_tag):
+                data.write.save_as_table(self._table_name, **self._save_args)
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"table_name": ".".join(self._table_name), "save_args": self._save_args}
+
+
+class SnowparkQueryDataSet(AbstractDataSet[None, "sp.DataFrame"]):
+
+    """ `SnowparkQueryDataSet` loads the result of a query as a lazy snowpark
+        DataFrame, the query only runs once an action is called on it.
+        `load_args.cache_result` materializes it into a temporary table."""
+    DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
+
+    def __init__(
+        self,
+        sql: str,
+        credentials: Dict[str, Any],
+        load_args: Dict[str, Any] = None,
+        query_tag: str = None,
+    ) -> None:
+        if not sql:
+            raise DataSetError("'sql' argument cannot be empty.")
+
+        if not (credentials and "user" in credentials and credentials['user']):
+            raise DataSetError(
+                "'user', 'password', and 'account' must be passed"
+                " see docs for other connection methods"
+            )
+
+        self._load_args = copy.deepcopy(self.DEFAULT_LOAD_ARGS)
+        if load_args is not None:
+            self._load_args.update(load_args)
+
+        self._sql = sql
+        self._session_creds = credentials
+        self._query_tag = query_tag
+
+    def prefetch(self) -> None:
+        """ Warms up the session in the background, called by `SnowflakePrefetchHook` """
+        SnowparkSessionDataSet.warm_up(self._session_creds, self._query_tag)
+
+    def _load(self) -> sp.DataFrame:
+        with instrumentation.operation("load", self):
+            session = SnowparkSessionDataSet.create_session(self._session_creds)
+
+            with SnowparkSessionDataSet.tagged(session, self._query_tag):
+                df = session.sql(self._sql)
+                if self._load_args.get("cache_result"):
+                    with instrumentation.phase("execute"):
+                        df = df.cache_result()
+
+        return df
+
+    def _save(self, data: sp.DataFrame) -> None:
+        raise DataSetError("'save' is not supported on SnowparkQueryDataSet")
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"sql": self._sql}
@@ -0,0 +1,316 @@
+"""  Helpers to serialize dataframes to Parquet, stage them and copy them into
+Snowflake tables without going through ``write_pandas``, and to unload query
+results through a stage."""
+
+from __future__ import annotations
+
+import glob
+import os
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional, Tuple
+
+from . import instrumentation
+from .lazy import lazy_import
+
+
+__all__ = [
+    "write_parquet_chunks",
+    "write_arrow_chunks",
+    "stage_and_copy",
+    "stream_and_copy",
+    "copy_staged_files",
+    "unload_query",
+]
+
+# COPY INTO takes at most this many names in FILES
+MAX_COPY_FILES = 1000
+
+pd = lazy_import("pandas")
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _file_url(path: str) -> str:
+    """PUT and GET take a file url, escaped the same way write_pandas does."""
+    return "file://" + path.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _write_parquet_chunk(chunk: pd.DataFrame, path: str, compression: str) -> int:
+    """Writes one chunk and returns the size of the file, must stay a top
+    level function so it can be sent to a process pool."""
+    chunk.to_parquet(path, compression=compression, index=False)
+    return os.path.getsize(path)
+
+
+def write_parquet_chunks(
+    df: pd.DataFrame,
+    directory: str,
+    chunk_size: Optional[int] = None,
+    compression: str = "snappy",
+    processes: Optional[int] = None,
+) -> List[Tuple[str, int]]:
+    """Splits ``df`` into chunks of ``chunk_size`` rows and writes each one as
+    a Parquet file in ``directory``, across ``processes`` worker processes
+    when set. Returns the ``(path, bytes)`` of every file in chunk order."""
+    chunk_size = chunk_size or max(len(df), 1)
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, max(len(df), 1), chunk_size)]
+    paths = [os.path.join(directory, f"chunk_{number:06d}.parquet") for number in range(len(chunks))]
+    compressions = [compression] * len(chunks)
+
+    if processes and processes > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            sizes = list(executor.map(_write_parquet_chunk, chunks, paths, compressions))
+    else:
+        sizes = [_write_parquet_chunk(*args) for args in zip(chunks, paths, compressions)]
+
+    return list(zip(paths, sizes))
+
+
+def write_arrow_chunks(
+    table: Any,
+    directory: str,
+    chunk_size: Optional[int] = None,
+    compression: str = "snappy",
+) -> List[Tuple[str, int]]:
+    """Writes an Arrow table to Parquet files of at most ``chunk_size`` rows
+    straight from its buffers, slices are zero-copy so nothing goes through
+    pandas. Returns the paths and sizes of the files."""
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    chunk_size = chunk_size or max(table.num_rows, 1)
+    files = []
+    for position, start in enumerate(range(0, max(table.num_rows, 1), chunk_size)):
+        path = os.path.join(directory, f"chunk_{position}.parquet")
+        pq.write_table(table.slice(start, chunk_size), path, compression=compression)
+        files.append((path, os.path.getsize(path)))
+    return files
+
+
+def _copy_options(use_logical_type: Optional[bool], purge: bool = True) -> str:
+    file_format = "TYPE=PARQUET COMPRESSION=AUTO"
+    if use_logical_type is not None:
+        file_format += f" USE_LOGICAL_TYPE={'TRUE' if use_logical_type else 'FALSE'}"
+    return (
+        f"FILE_FORMAT=({file_format}) MATCH_BY_COLUMN_NAME=CASE_SENSITIVE "
+        f"PURGE={'TRUE' if purge else 'FALSE'} ON_ERROR=ABORT_STATEMENT"
+    )
+
+
+def _put_file(conn: Any, path: str, stage: str, op: Any) -> None:
+    """Uploads one file from a worker thread and removes it once staged."""
+    with instrumentation.attach(op):
+        cursor = conn.cursor()
+        try:
+            with instrumentation.phase("upload"):
+                cursor.execute(f"PUT '{_file_url(path)}' @{stage} AUTO_COMPRESS=FALSE SOURCE_COMPRESSION=NONE")
+        finally:
+            cursor.close()
+    os.remove(path)
+
+
+def stage_and_copy(
+    conn: Any,
+    directory: str,
+    database: str,
+    schema: str,
+    table: str,
+    parallel: int = 4,
+    use_logical_type: Optional[bool] = None,
+) -> Tuple[bool, int]:
+    """Uploads the Parquet files in ``directory`` to a temporary stage with
+    one ``PUT`` of ``parallel`` threads and loads them into the table with a
+    single ``COPY INTO``. Returns whether every file loaded and the number
+    of rows loaded."""
+    stage = f"{_quote(database)}.{_quote(schema)}.{_quote('kedro_stage_' + uuid.uuid4().hex)}"
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE TEMPORARY STAGE {stage}")
+
+        file_url = _file_url(os.path.join(directory, "*.parquet"))
+        with instrumentation.phase("upload"):
+            cursor.execute(
+                f"PUT '{file_url}' @{stage} PARALLEL={int(parallel)} "
+                f"AUTO_COMPRESS=FALSE SOURCE_COMPRESSION=NONE"
+            )
+
+        with instrumentation.phase("copy"):
+            copy_results = cursor.execute(
+                f"COPY INTO {_quote(database)}.{_quote(schema)}.{_quote(table)} FROM @{stage} "
+                f"{_copy_options(use_logical_type)}"
+            ).fetchall()
+        instrumentation.record(sfqid=getattr(cursor, "sfqid", None))
+        cursor.execute(f"DROP STAGE IF EXISTS {stage}")
+    finally:
+        cursor.close()
+
+    success = all(result[1] == "LOADED" for result in copy_results)
+    rows = sum(int(result[3]) for result in copy_results)
+    return success, rows
+
+
+def stream_and_copy(
+    conn: Any,
+    chunks: Iterable[Any],
+    directory: str,
+    database: str,
+    schema: str,
+    table: str,
+    compression: str = "snappy",
+    max_in_flight: int = 2,
+    use_logical_type: Optional[bool] = None,
+) -> Tuple[bool, int, int, int]:
+    """Writes each pandas or Arrow chunk of ``chunks`` to a Parquet file and
+    uploads it to a temporary stage while the next chunk is produced, then
+    loads every file with a single ``COPY INTO``. At most ``max_in_flight``
+    files wait for their upload, the producer blocks until one is staged, so
+    neither memory nor ``directory`` hold more than a few chunks. Returns
+    whether every file loaded, the rows loaded, the number of files and the
+    bytes staged."""
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    stage = f"{_quote(database)}.{_quote(schema)}.{_quote('kedro_stage_' + uuid.uuid4().hex)}"
+    max_in_flight = max(int(max_in_flight), 1)
+    op = instrumentation.current()
+
+    files = 0
+    staged_bytes = 0
+    copy_results: List[Any] = []
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE TEMPORARY STAGE {stage}")
+
+        # leaving the executor waits for started uploads, also on errors
+        uploads: deque = deque()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for chunk in chunks:
+                if len(chunk) == 0:
+                    continue
+                path = os.path.join(directory, f"chunk_{files:06d}.parquet")
+                with instrumentation.phase("serialize"):
+                    if isinstance(chunk, pd.DataFrame):
+                        staged_bytes += _write_parquet_chunk(chunk, path, compression)
+                    else:
+                        pq.write_table(chunk, path, compression=compression)
+                        staged_bytes += os.path.getsize(path)
+                files += 1
+
+                while len(uploads) >= max_in_flight:
+                    uploads.popleft().result()
+                uploads.append(executor.submit(_put_file, conn, path, stage, op))
+
+            while uploads:
+                uploads.popleft().result()
+
+        if files:
+            with instrumentation.phase("copy"):
+                copy_results = cursor.execute(
+                    f"COPY INTO {_quote(database)}.{_quote(schema)}.{_quote(table)} FROM @{stage} "
+                    f"{_copy_options(use_logical_type)}"
+                ).fetchall()
+            instrumentation.record(sfqid=getattr(cursor, "sfqid", None))
+    finally:
+        cursor.execute(f"DROP STAGE IF EXISTS {stage}")
+        cursor.close()
+
+    success = all(result[1] == "LOADED" for result in copy_results)
+    rows = sum(int(result[3]) for result in copy_results)
+    return success, rows, files, staged_bytes
+
+
+def copy_staged_files(
+    conn: Any,
+    location: str,
+    files: List[str],
+    database: str,
+    schema: str,
+    table: str,
+    use_logical_type: Optional[bool] = None,
+) -> Tuple[bool, int]:
+    """Loads exactly ``files`` under the stage ``location`` into the table,
+    leaving them on the stage. More files than one ``COPY INTO`` takes are
+    copied in a single transaction, so the rows appear all at once. Returns
+    whether every file loaded and the number of rows loaded."""
+    batches = [files[start:start + MAX_COPY_FILES] for start in range(0, len(files), MAX_COPY_FILES)]
+
+    copy_results: List[Any] = []
+    cursor = conn.cursor()
+    try:
+        if len(batches) > 1:
+            cursor.execute("BEGIN")
+        try:
+            for batch in batches:
+                names = ", ".join("'" + name.replace("'", "\\'") + "'" for name in batch)
+                with instrumentation.phase("copy"):
+                    copy_results += cursor.execute(
+                        f"COPY INTO {_quote(database)}.{_quote(schema)}.{_quote(table)} FROM {location} "
+                        f"FILES=({names}) {_copy_options(use_logical_type, purge=False)}"
+                    ).fetchall()
+                instrumentation.record(sfqid=getattr(cursor, "sfqid", None))
+        except Exception:
+            if len(batches) > 1:
+                cursor.execute("ROLLBACK")
+            raise
+        if len(batches) > 1:
+            cursor.execute("COMMIT")
+    finally:
+        cursor.close()
+
+    success = all(result[1] == "LOADED" for result in copy_results)
+    rows = sum(int(result[3]) for result in copy_results)
+    return success, rows
+
+
+def unload_query(
+    conn: Any,
+    sql: str,
+    directory: str,
+    params: Optional[List[Any]] = None,
+    stage: Optional[str] = None,
+    database: Optional[str] = None,
+    schema: Optional[str] = None,
+    parallel: int = 8,
+    max_file_size: Optional[int] = None,
+) -> List[str]:
+    """Unloads the result of ``sql`` as Snappy compressed Parquet files with
+    one ``COPY INTO`` a stage and downloads them into ``directory`` with one
+    ``GET`` of ``parallel`` threads. Without ``stage`` a temporary stage is
+    created in ``database``.``schema``, or the current schema, otherwise the
+    files are written under a unique path of ``stage`` and removed after the
+    download. Returns the downloaded files in name order."""
+    temporary = stage is None
+    if temporary:
+        stage = _quote("kedro_unload_" + uuid.uuid4().hex)
+        if database and schema:
+            stage = f"{_quote(database)}.{_quote(schema)}.{stage}"
+    location = f"@{stage}/kedro_unload_{uuid.uuid4().hex}/"
+
+    options = "FILE_FORMAT=(TYPE=PARQUET COMPRESSION=SNAPPY) HEADER=TRUE"
+    if max_file_size:
+        options += f" MAX_FILE_SIZE={int(max_file_size)}"
+
+    cursor = conn.cursor()
+    try:
+        if temporary:
+            cursor.execute(f"CREATE TEMPORARY STAGE {stage}")
+        try:
+            with instrumentation.phase("unload"):
+                cursor.execute(f"COPY INTO {location} FROM ({sql}) {options}", params or None)
+            instrumentation.record(sfqid=getattr(cursor, "sfqid", None))
+
+            with instrumentation.phase("download"):
+                cursor.execute(f"GET {location} '{_file_url(directory + os.sep)}' PARALLEL={int(parallel)}")
+        finally:
+            # the stage files are only needed until they are downloaded
+            if temporary:
+                cursor.execute(f"DROP STAGE IF EXISTS {stage}")
+            else:
+                cursor.execute(f"REMOVE {location}")
+    finally:
+        cursor.close()
+
+    return sorted(glob.glob(os.path.join(directory, "**", "*.parquet"), recursive=True))
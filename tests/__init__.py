@@ -0,0 +1,19 @@
+"""Shared fixtures of the dataset tests."""
+
+import unittest
+import uuid
+
+from benchmarks.run_benchmarks import Harness
+
+
+class HarnessTestCase(unittest.TestCase):
+
+    """Runs each test against a fresh fake Snowflake database, ``harness``
+    points the dataset classes at it with ``latency`` seconds per round trip."""
+
+    latency = 0.0
+
+    def setUp(self):
+        self.harness = Harness(f":memory:{uuid.uuid4().hex}", self.latency, 0)
+        self.harness.__enter__()
+        self.addCleanup(self.harness.__exit__, None, None, None)
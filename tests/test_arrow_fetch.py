@@ -0,0 +1,116 @@
+"""Arrow fetch path of the query datasets, driven by a stub cursor."""
+
+import unittest
+
+import pandas as pd
+import pyarrow as pa
+
+from datasets.snowflake import (
+    SnowflakeQueryDataSet,
+    _read_arrow_pandas,
+    _read_pandas_batches,
+)
+
+
+class StubResultBatch:
+    def __init__(self, batch):
+        self.batch = batch
+
+    def to_arrow(self):
+        return pa.Table.from_batches([self.batch])
+
+
+class StubCursor:
+
+    """Cursor that hands back a fixed Arrow table, in ``batches`` pieces."""
+
+    def __init__(self, table, batches=1):
+        self.table = table
+        self.batch_rows = max(table.num_rows // batches, 1)
+        self.description = [(name, None, None, None, None, None, True) for name in table.column_names]
+        self.executed = []
+        self.closed = False
+        self.sfqid = "stub"
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        return self
+
+    def fetch_arrow_all(self):
+        # the connector returns None for an empty result
+        return self.table if self.table.num_rows else None
+
+    def get_result_batches(self):
+        return [StubResultBatch(batch) for batch in self.table.to_batches(max_chunksize=self.batch_rows)]
+
+    def fetchall(self):
+        raise AssertionError("the Arrow path must not fetch rows")
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+TABLE = pa.table({"ID": list(range(10)), "NAME": [f"n{i}" for i in range(10)]})
+
+
+class ArrowFetchTest(unittest.TestCase):
+    def test_builds_the_frame_from_fetch_arrow_all(self):
+        cursor = StubCursor(TABLE)
+        df = _read_arrow_pandas(StubConnection(cursor), "SELECT 1")
+
+        pd.testing.assert_frame_equal(df, TABLE.to_pandas())
+        self.assertEqual(cursor.executed, ["SELECT 1"])
+        self.assertTrue(cursor.closed)
+
+    def test_empty_result_keeps_the_columns(self):
+        cursor = StubCursor(TABLE.slice(0, 0))
+        df = _read_arrow_pandas(StubConnection(cursor), "SELECT 1")
+
+        self.assertEqual(list(df.columns), ["ID", "NAME"])
+        self.assertEqual(len(df), 0)
+
+    def test_arrow_output_type_is_not_converted(self):
+        table = _read_arrow_pandas(StubConnection(StubCursor(TABLE)), "SELECT 1", output_type="arrow")
+        self.assertTrue(table.equals(TABLE))
+
+    def test_chunked_load_reslices_the_connector_batches(self):
+        cursor = StubCursor(TABLE, batches=3)
+        chunks = list(_read_pandas_batches(StubConnection(cursor), "SELECT 1", batch_rows=4))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), TABLE.to_pandas())
+        self.assertTrue(cursor.closed)
+
+    def test_chunked_load_closes_the_cursor_before_fetching(self):
+        cursor = StubCursor(TABLE, batches=3)
+        chunks = _read_pandas_batches(StubConnection(cursor), "SELECT 1", batch_rows=4)
+
+        self.assertTrue(cursor.closed)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 10)
+
+    def test_chunked_load_without_batch_rows_keeps_the_connector_batches(self):
+        chunks = list(_read_pandas_batches(StubConnection(StubCursor(TABLE, batches=2)), "SELECT 1"))
+        self.assertEqual([len(chunk) for chunk in chunks], [5, 5])
+
+    def test_chunked_arrow_output_yields_tables(self):
+        chunks = list(_read_pandas_batches(StubConnection(StubCursor(TABLE, batches=2)), "SELECT 1", output_type="arrow"))
+
+        self.assertTrue(all(isinstance(chunk, pa.Table) for chunk in chunks))
+        self.assertTrue(pa.concat_tables(chunks).equals(TABLE))
+
+    def test_read_pandas_from_snowflake_uses_arrow(self):
+        cursor = StubCursor(TABLE)
+        df = SnowflakeQueryDataSet.read_pandas_from_snowflake(StubConnection(cursor), sql="SELECT 1", use_arrow=True)
+        pd.testing.assert_frame_equal(df, TABLE.to_pandas())
+
+
+if __name__ == "__main__":
+    unittest.main()
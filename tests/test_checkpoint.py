@@ -0,0 +1,126 @@
+"""Resumable ``checkpoint`` saves of ``SnowflakeTableDataSet`` from a node,
+run through a Kedro runner against the fake connection."""
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline, node
+from kedro.runner import SequentialRunner
+from snowflake.connector.errors import OperationalError
+
+from benchmarks.fake_snowflake import FakeSnowflakeCursor
+from datasets.snowflake import StreamedChunks
+from tests import HarnessTestCase
+
+OLD = pd.DataFrame({"ID": [-3, -2, -1], "CHUNK": -1})
+
+
+def _export(fail_after=None):
+    """Four chunks of ten rows, failing after ``fail_after`` of them."""
+
+    def _chunks():
+        for number in range(4):
+            if number == fail_after:
+                raise RuntimeError("lost the source")
+            yield pd.DataFrame({"ID": range(number * 10, (number + 1) * 10), "CHUNK": number})
+
+    return lambda: StreamedChunks(_chunks())
+
+
+class CheckpointTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("EXPORT", OLD)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+        self.puts = []
+        self.put_errors = 0
+        execute = FakeSnowflakeCursor.execute
+
+        def _record(cursor, sql, *args, **kwargs):
+            if sql.startswith("PUT"):
+                if self.put_errors:
+                    self.put_errors -= 1
+                    raise OperationalError(msg="connection reset")
+                self.puts.append(os.path.basename(sql.split("'")[1]))
+            return execute(cursor, sql, *args, **kwargs)
+
+        patch = mock.patch.object(FakeSnowflakeCursor, "execute", _record)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _run(self, func, **save_args):
+        target = self.harness.table_dataset(
+            "EXPORT", save_args={"checkpoint": {"path": self.directory, "backoff": 0.5}, **save_args}
+        )
+        SequentialRunner().run(Pipeline([node(func, None, "export")]), DataCatalog({"export": target}))
+        return target
+
+    def _table(self):
+        return self.harness.table_dataset("EXPORT").load().sort_values("ID").reset_index(drop=True)
+
+    def test_failed_replace_resumes_with_the_missing_chunks(self):
+        with self.assertRaises(Exception):
+            self._run(_export(fail_after=2))
+        # nothing is swapped in until every chunk is staged
+        pd.testing.assert_frame_equal(self._table(), OLD, check_dtype=False)
+        self.assertEqual(len(self.puts), 2)
+        self.assertEqual(len(glob.glob(os.path.join(self.directory, "*.json"))), 1)
+
+        resumed_puts = len(self.puts)
+        target = self._run(_export())
+
+        self.assertEqual([name[:12] for name in self.puts[resumed_puts:]], ["chunk_000002", "chunk_000003"])
+        self.assertEqual(target.save_metrics["resumed_chunks"], 2)
+        self.assertEqual(self._table()["ID"].tolist(), list(range(40)))
+        self.assertEqual(glob.glob(os.path.join(self.directory, "*.json")), [])
+
+    def test_failed_append_leaves_the_table_alone(self):
+        with self.assertRaises(Exception):
+            self._run(_export(fail_after=3), if_exists="append")
+        self.assertEqual(len(self._table()), 3)
+
+        target = self._run(_export(), if_exists="append")
+        self.assertEqual(target.save_metrics["resumed_chunks"], 3)
+        self.assertEqual(self._table()["ID"].tolist(), [-3, -2, -1] + list(range(40)))
+
+    def test_changed_chunks_are_uploaded_again(self):
+        with self.assertRaises(Exception):
+            self._run(_export(fail_after=2))
+
+        def _changed():
+            return StreamedChunks(pd.DataFrame({"ID": range(n * 10, (n + 1) * 10), "CHUNK": n + 1}) for n in range(4))
+
+        resumed_puts = len(self.puts)
+        target = self._run(_changed)
+        self.assertEqual(len(self.puts) - resumed_puts, 4)
+        self.assertEqual(target.save_metrics["resumed_chunks"], 0)
+        self.assertEqual(self._table()["CHUNK"].tolist(), [n // 10 + 1 for n in range(40)])
+
+    def test_failed_uploads_are_retried_with_backoff(self):
+        self.put_errors = 2
+        with mock.patch("datasets.checkpoint.time") as clock:
+            # one upload at a time, so both errors hit the first chunk
+            self._run(_export(), max_in_flight=1)
+
+        self.assertEqual([call.args[0] for call in clock.sleep.call_args_list], [0.5, 1.0])
+        self.assertEqual(len(self.puts), 4)
+        self.assertEqual(len(self._table()), 40)
+
+    def test_uploads_give_up_after_the_retries(self):
+        self.put_errors = 10
+        with mock.patch("datasets.checkpoint.time"):
+            with self.assertRaises(Exception):
+                self._run(_export(), checkpoint={"path": self.directory, "retries": 1})
+        pd.testing.assert_frame_equal(self._table(), OLD, check_dtype=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
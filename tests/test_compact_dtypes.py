@@ -0,0 +1,122 @@
+"""Frames loaded with ``compact_dtypes`` save back through ``SnowflakeTableDataSet``."""
+
+import decimal
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_snowflake import FakeSnowflakeConnection
+from datasets.dtypes import compact_dtypes
+from tests import HarnessTestCase
+
+
+def _frame():
+    rows = 200
+    return pd.DataFrame(
+        {
+            "SMALL": np.arange(rows) % 100,
+            "WIDE": np.arange(rows) * 100000,
+            "RATIO": np.linspace(0, 1, rows),
+            "REGION": np.array(["EU", "US"])[np.arange(rows) % 2],
+            "NAME": [f"name {i}" for i in range(rows)],
+            "FLAG": np.arange(rows) % 3 == 0,
+            "MAYBE": pd.array([None if i % 5 == 0 else i for i in range(rows)], dtype="Int64"),
+        }
+    )
+
+
+class CompactDtypesSaveTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("SOURCE", _frame())
+
+    def _round_trip(self, compact_dtypes):
+        compacted = self.harness.table_dataset("SOURCE", load_args={"compact_dtypes": compact_dtypes}).load()
+        target = self.harness.table_dataset("TARGET")
+        target.save(compacted)
+        return compacted, target.load()
+
+    def _assert_same_values(self, saved):
+        expected = _frame()
+        # float32 downcasts keep about 7 digits
+        np.testing.assert_allclose(saved["RATIO"].astype(float), expected["RATIO"], rtol=1e-6)
+        for column in expected.columns.drop("RATIO"):
+            self.assertEqual(
+                [None if pd.isna(value) else value for value in saved[column]],
+                [None if pd.isna(value) else value for value in expected[column]],
+                column,
+            )
+
+    def test_numpy_dtypes_round_trip(self):
+        compacted, saved = self._round_trip({"downcast_floats": True})
+        self.assertIn(compacted["SMALL"].dtype.name, ("int8", "uint8"))
+        self.assertEqual(compacted["REGION"].dtype.name, "category")
+        self._assert_same_values(saved)
+
+    def test_nullable_dtypes_round_trip(self):
+        compacted, saved = self._round_trip({"dtype_backend": "numpy_nullable"})
+        self.assertTrue(compacted["WIDE"].dtype.name.startswith(("Int", "UInt")))
+        self._assert_same_values(saved)
+
+    def test_pyarrow_dtypes_round_trip(self):
+        compacted, saved = self._round_trip({"dtype_backend": "pyarrow"})
+        self.assertTrue(compacted["WIDE"].dtype.name.endswith("[pyarrow]"))
+        self._assert_same_values(saved)
+
+
+class CompactDecimalsTest(HarnessTestCase):
+    BIG = decimal.Decimal("12345678901234567890.123456")
+
+    def setUp(self):
+        super().setUp()
+        FakeSnowflakeConnection(**self.harness.connection_kwargs).db.execute(
+            f"""CREATE TABLE "PUBLIC"."PRICES" AS SELECT
+                CAST(i / 4 AS DECIMAL(10, 2)) AS "PRICE",
+                CAST('{self.BIG}' AS DECIMAL(38, 6)) + i AS "TOTAL",
+                CAST(i AS DECIMAL(38, 2)) AS "SHORT"
+            FROM range(10) t(i)"""
+        )
+
+    def _load(self, **options):
+        # row batches come back as Decimal objects, with the result metadata
+        chunks = self.harness.table_dataset(
+            "PRICES", load_args={"use_arrow": False, "chunked": True, "compact_dtypes": options or True}
+        ).load()
+        return pd.concat(list(chunks), ignore_index=True)
+
+    def test_decimals_that_fit_float64_are_converted(self):
+        df = self._load()
+
+        self.assertEqual(df["PRICE"].dtype, np.float64)
+        self.assertEqual(df["PRICE"].tolist(), [i / 4 for i in range(10)])
+
+    def test_wide_decimals_keep_their_precision(self):
+        df = self._load()
+
+        # NUMBER(38, 2) stays exact even though its values are short
+        self.assertEqual(df["SHORT"].dtype, object)
+        self.assertEqual(df["TOTAL"].tolist(), [self.BIG + i for i in range(10)])
+
+    def test_wide_decimals_become_decimal128_with_pyarrow(self):
+        df = self._load(dtype_backend="pyarrow")
+
+        self.assertEqual(str(df["TOTAL"].dtype), "decimal128(38, 6)[pyarrow]")
+        self.assertEqual(df["TOTAL"].tolist(), [self.BIG + i for i in range(10)])
+
+    def test_lossy_cast_is_opt_in(self):
+        df = self._load(lossy_decimals=True)
+
+        self.assertEqual(df["TOTAL"].dtype, np.float64)
+
+    def test_values_decide_without_metadata(self):
+        df = pd.DataFrame({"SHORT": [decimal.Decimal("1.50"), None], "WIDE": [self.BIG, None]})
+
+        compacted, _ = compact_dtypes(df)
+
+        self.assertEqual(compacted["SHORT"].dtype, np.float64)
+        self.assertEqual(compacted["WIDE"].dtype, object)
+
+
+if __name__ == "__main__":
+    unittest.main()
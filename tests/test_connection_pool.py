@@ -0,0 +1,83 @@
+"""Connections of chunked loads go back to the pool, and an exhausted pool
+raises instead of hanging."""
+
+import gc
+import time
+import unittest
+
+from kedro.io import DataCatalog
+from kedro.io.core import DataSetError
+from kedro.pipeline import Pipeline, node
+from kedro.runner import SequentialRunner
+
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from tests import HarnessTestCase
+
+
+class ConnectionPoolTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.pool.configure(max_size=2, checkout_timeout=2)
+        self.harness.seed("CHUNKED", make_frame(1000, 3, "mixed"))
+
+    def _chunked(self, **load_args):
+        return self.harness.table_dataset("CHUNKED", load_args={"chunked": True, "batch_rows": 100, **load_args})
+
+    def test_discarded_iterators_release_their_connection(self):
+        for _ in range(4):
+            self._chunked().load()
+        gc.collect()
+
+        self.assertEqual(sum(len(chunk) for chunk in self._chunked().load()), 1000)
+
+    def test_close_releases_a_partially_consumed_load(self):
+        chunks = [self._chunked().load() for _ in range(2)]
+        for iterator in chunks:
+            next(iterator)
+            iterator.close()
+
+        self.assertEqual(sum(len(chunk) for chunk in self._chunked().load()), 1000)
+
+    def test_consumed_load_releases_its_connection(self):
+        for _ in range(3):
+            self.assertEqual(len(list(self._chunked().load())), 10)
+
+    def test_node_with_more_chunked_inputs_than_connections(self):
+        names = [f"chunked_{number}" for number in range(5)]
+        for load_args in ({}, {"use_arrow": False}):
+            catalog = DataCatalog({name: self._chunked(**load_args) for name in names})
+            pipeline = Pipeline([node(lambda *loads: [sum(len(chunk) for chunk in load) for load in loads], names, "rows")])
+
+            self.assertEqual(SequentialRunner().run(pipeline, catalog)["rows"], [1000] * 5)
+
+    def test_arrow_chunks_are_read_without_the_connection(self):
+        loads = [self._chunked().load() for _ in range(3)]
+        held = [self.harness.pool.checkout(CREDENTIALS, timeout=0.1) for _ in range(2)]
+
+        self.assertEqual([sum(len(chunk) for chunk in load) for load in loads], [1000] * 3)
+        for connection in held:
+            self.harness.pool.release(CREDENTIALS, connection)
+
+    def test_overflow_connections_are_closed_on_release(self):
+        loads = [self._chunked(use_arrow=False).load() for _ in range(3)]
+        for load in loads:
+            load.close()
+
+        held = [self.harness.pool.checkout(CREDENTIALS) for _ in range(2)]
+        self.addCleanup(lambda: [self.harness.pool.release(CREDENTIALS, connection) for connection in held])
+        with self.assertRaises(DataSetError):
+            self.harness.pool.checkout(CREDENTIALS, timeout=0.1)
+
+    def test_exhausted_pool_raises(self):
+        held = [self.harness.pool.checkout(CREDENTIALS) for _ in range(2)]
+        self.addCleanup(lambda: [self.harness.pool.release(CREDENTIALS, connection) for connection in held])
+
+        self.harness.pool.configure(checkout_timeout=0.1)
+        started = time.monotonic()
+        with self.assertRaises(DataSetError):
+            self.harness.pool.checkout(CREDENTIALS)
+        self.assertLess(time.monotonic() - started, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""The database, schema and table DDL of ``SnowflakeTableDataSet`` saves,
+sent in one multi-statement request."""
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+from kedro.io.core import DataSetError
+from snowflake.connector.errors import OperationalError, ProgrammingError
+
+from benchmarks.fake_snowflake import FakeSnowflakeCursor
+from tests import HarnessTestCase
+
+
+class CreateStatementsTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.requests = []
+        self.failing = None
+        self.drop_batches = False
+        execute = FakeSnowflakeCursor.execute
+
+        def record(cursor, sql, *args, num_statements=1, **kwargs):
+            self.requests.append((" ".join(sql.split()), num_statements))
+            if self.drop_batches and num_statements > 1:
+                raise OperationalError(msg="connection reset")
+            return execute(cursor, sql, *args, num_statements=num_statements, **kwargs)
+
+        run = FakeSnowflakeCursor._run
+
+        def fail(cursor, sql, params=None):
+            if self.failing and self.failing in sql:
+                raise ProgrammingError(msg=f"SQL compilation error: {self.failing}")
+            return run(cursor, sql, params)
+
+        for patcher in (
+            mock.patch.object(FakeSnowflakeCursor, "execute", record),
+            mock.patch.object(FakeSnowflakeCursor, "_run", fail),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _ddl(self):
+        return [(sql, count) for sql, count in self.requests if sql.startswith("CREATE")]
+
+    def test_database_schema_and_table_are_one_round_trip(self):
+        self.harness.table_dataset("TARGET").save(pd.DataFrame({"ID": [1]}))
+
+        ddl = self._ddl()
+        self.assertEqual(len(ddl), 1)
+        self.assertEqual(ddl[0][1], 3)
+        self.assertEqual([part.split()[:2] for part in ddl[0][0].split(";")], [["CREATE", "DATABASE"], ["CREATE", "SCHEMA"], ["CREATE", "OR"]])
+
+    def test_verified_objects_are_skipped_next_time(self):
+        dataset = self.harness.table_dataset("TARGET", save_args={"if_exists": "append"})
+        dataset.save(pd.DataFrame({"ID": [1]}))
+        self.requests.clear()
+
+        dataset.save(pd.DataFrame({"ID": [2]}))
+        self.assertEqual(self._ddl(), [])
+
+    def test_failing_statement_is_reported(self):
+        self.failing = "CREATE SCHEMA"
+
+        with self.assertRaisesRegex(DataSetError, r'DDL statement 2 of 3 failed: CREATE SCHEMA IF NOT EXISTS "BENCH"."PUBLIC"'):
+            self.harness.table_dataset("TARGET").save(pd.DataFrame({"ID": [1]}))
+
+    def test_statements_that_succeed_on_their_own_recover(self):
+        self.drop_batches = True
+
+        dataset = self.harness.table_dataset("TARGET")
+        dataset.save(pd.DataFrame({"ID": [1]}))
+
+        self.assertEqual([count for _, count in self._ddl()], [3, 1, 1, 1])
+        self.assertEqual(len(dataset.load()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
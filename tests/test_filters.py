@@ -0,0 +1,79 @@
+"""Server side binds of ``SnowflakeTableDataSet`` filters and partitions."""
+
+from unittest import mock
+
+from benchmarks.fake_snowflake import FakeSnowflakeCursor
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from datasets.snowflake import SnowflakeTableDataSet
+from tests import HarnessTestCase
+
+
+class FilterBindsTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        df = make_frame(400, 2, "int")
+        df["REGION"] = ["EU", "US", "APAC", "LATAM"] * 100
+        self.harness.seed("REGIONS", df)
+
+        self.executed = []
+        execute = FakeSnowflakeCursor.execute
+
+        def _record(cursor, sql, params=None, *args, **kwargs):
+            self.executed.append((sql, params))
+            return execute(cursor, sql, params, *args, **kwargs)
+
+        patch = mock.patch.object(FakeSnowflakeCursor, "execute", _record)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _selects(self):
+        return [(sql, params) for sql, params in self.executed if '"REGIONS"' in sql]
+
+    def test_filter_values_are_bound_on_the_server(self):
+        dataset = self.harness.table_dataset(
+            "REGIONS", load_args={"filters": [["REGION", "in", ["EU", "US"]], ["C0", ">=", 0]]}
+        )
+        self.assertEqual(len(dataset.load()), 200)
+
+        sql, params = self._selects()[-1]
+        self.assertIn('"REGION" IN (:1, :2) AND "C0" >= :3', sql)
+        self.assertNotIn("%s", sql)
+        self.assertNotIn("EU", sql)
+        self.assertEqual(params, ["EU", "US", 0])
+        self.assertEqual(dataset._load_creds["paramstyle"], "numeric")
+        self.assertEqual(dataset._connection_creds["paramstyle"], "pyformat")
+
+    def test_partition_bounds_follow_the_filter_binds(self):
+        sql, params = SnowflakeTableDataSet.build_select_statement(
+            partition=("range", "C0", 10, 20, False),
+            filters=[["REGION", "=", "EU"]],
+            database="BENCH",
+            schema="PUBLIC",
+            table_name="REGIONS",
+            paramstyle="pyformat",
+        )
+        self.assertIn('"REGION" = :1 AND "C0" >= :2 AND "C0" < :3', sql)
+        self.assertEqual(params, ["EU", 10, 20])
+
+    def test_partitioned_filtered_load(self):
+        dataset = self.harness.table_dataset(
+            "REGIONS",
+            load_args={"filters": [["REGION", "!=", "APAC"]], "partition_by": {"column": "C0", "partitions": 3}},
+        )
+        self.assertEqual(len(dataset.load()), 300)
+        self.assertTrue(all("%s" not in sql for sql, _ in self._selects()))
+
+    def test_qmark_credentials_are_sent_as_written(self):
+        dataset = SnowflakeTableDataSet(
+            table_name="REGIONS",
+            database="BENCH",
+            schema="PUBLIC",
+            credentials={**CREDENTIALS, "paramstyle": "qmark"},
+            load_args={"filters": [["REGION", "=", "EU"]]},
+        )
+        self.assertEqual(len(dataset.load()), 100)
+
+        sql, params = self._selects()[-1]
+        self.assertIn('"REGION" = ?', sql)
+        self.assertEqual(params, ["EU"])
+        self.assertEqual(dataset._load_creds["paramstyle"], "qmark")
@@ -0,0 +1,150 @@
+"""SQL node fusion, checked by running the fused queries on DuckDB."""
+
+import unittest
+
+import duckdb
+import pandas as pd
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline, node
+from kedro.pipeline.modular_pipeline import pipeline as modular_pipeline
+from kedro.io.core import DataSetError
+from kedro.runner import SequentialRunner
+
+from benchmarks.run_benchmarks import CREDENTIALS
+from datasets.dummies import SprocNameDataSet, TableNameDataSet
+from datasets.fusion import SqlFusionRunner, compile_sql, fuse_sql_nodes, sql_node
+from tests import HarnessTestCase
+
+ORDERS = pd.DataFrame(
+    {
+        "ID": range(8),
+        "REGION": ["EU", "US", "EU", "APAC", "US", "EU", "APAC", "US"],
+        "AMOUNT": [10.0, -1.0, 30.0, 5.0, 7.0, 2.0, -3.0, 4.0],
+    }
+)
+
+
+def _pipeline():
+    return Pipeline(
+        [
+            sql_node('SELECT * FROM {orders} WHERE "AMOUNT" > 0', inputs={"orders": "raw_orders"}, outputs="clean"),
+            sql_node(
+                'SELECT "REGION", SUM("AMOUNT") AS "TOTAL" FROM {clean} GROUP BY "REGION"',
+                inputs="clean",
+                outputs="by_region",
+            ),
+            sql_node(
+                'SELECT "REGION", "TOTAL", \'{{literal}}\' AS "NOTE" FROM {totals} WHERE "TOTAL" > 5',
+                inputs={"totals": "by_region"},
+                outputs="big_regions",
+            ),
+            sql_node('SELECT COUNT(*) AS "N" FROM {clean}', inputs="clean", outputs="order_count"),
+            node(len, "order_count", "count_pointer_length"),
+        ]
+    )
+
+
+def _table(name, **save_args):
+    return TableNameDataSet(name, "PUBLIC", "memory", credentials=CREDENTIALS, save_args=save_args or None)
+
+
+class CompileSqlTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = DataCatalog({"raw_orders": _table("ORDERS"), "by_region": _table("BY_REGION")})
+        self.connection = duckdb.connect()
+        self.connection.register("orders", ORDERS)
+
+    def test_fused_queries_run_on_duckdb(self):
+        queries = compile_sql(_pipeline(), self.catalog, {"raw_orders": "orders"})
+
+        self.assertEqual(sorted(queries), ["big_regions", "order_count"])
+        self.assertTrue(queries["big_regions"].startswith("WITH"))
+        result = self.connection.sql(queries["big_regions"] + ' ORDER BY "REGION"').df()
+        self.assertEqual(result["REGION"].tolist(), ["EU", "US"])
+        self.assertEqual(result["TOTAL"].tolist(), [42.0, 11.0])
+        self.assertEqual(result["NOTE"].tolist(), ["{literal}"] * 2)
+        self.assertEqual(self.connection.sql(queries["order_count"]).fetchone(), (6,))
+
+    def test_persisted_outputs_are_referenced(self):
+        catalog = DataCatalog({"raw_orders": _table("ORDERS"), "by_region": _table("BY_REGION", persist=True)})
+        queries = compile_sql(_pipeline(), catalog, {"raw_orders": "orders"})
+
+        self.assertIn("by_region", queries)
+        self.assertIn("memory.PUBLIC.BY_REGION", queries["big_regions"])
+        self.connection.sql(f"CREATE TABLE by_region_table AS {queries['by_region']}")
+        query = compile_sql(_pipeline(), catalog, {"raw_orders": "orders", "by_region": "by_region_table"})["big_regions"]
+        self.assertEqual(len(self.connection.sql(query).df()), 2)
+
+    def test_only_materialized_outputs_get_nodes(self):
+        names = sorted(fused.name for fused in fuse_sql_nodes(_pipeline(), self.catalog).nodes)
+        self.assertEqual(names, ["fused_big_regions", "fused_order_count", "len([order_count]) -> [count_pointer_length]"])
+
+    def test_namespaced_pipelines_fuse(self):
+        namespaced = modular_pipeline(_pipeline(), namespace="sales", inputs={"raw_orders"})
+        queries = compile_sql(namespaced, self.catalog, {"raw_orders": "orders"})
+        self.assertEqual(self.connection.sql(queries["sales.order_count"]).fetchone(), (6,))
+
+    def test_stored_procedures_are_not_fused(self):
+        pipeline = Pipeline(
+            [
+                sql_node("SELECT * FROM {orders}", inputs={"orders": "raw_orders"}, outputs="staged"),
+                sql_node("SELECT * FROM {staged}", inputs="staged", outputs="procedure"),
+            ]
+        )
+        catalog = DataCatalog({"raw_orders": _table("ORDERS"), "procedure": SprocNameDataSet("PROC")})
+        names = sorted(fused.name for fused in fuse_sql_nodes(pipeline, catalog).nodes)
+        self.assertEqual(names, ["fused_staged", "sql([staged]) -> [procedure]"])
+
+    def test_placeholders_must_match_inputs(self):
+        with self.assertRaises(DataSetError):
+            sql_node("SELECT * FROM {a}", inputs="b", outputs="c")
+        with self.assertRaises(DataSetError):
+            sql_node("SELECT 1", inputs=[], outputs=["a", "b"])
+
+
+class SqlFusionRunnerTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("ORDERS", ORDERS)
+
+    def _catalog(self):
+        return DataCatalog(
+            {
+                "raw_orders": _table("ORDERS"),
+                "clean": _table("CLEAN"),
+                "by_region": _table("BY_REGION"),
+                "big_regions": _table("BIG_REGIONS"),
+                "order_count": _table("ORDER_COUNT"),
+            }
+        )
+
+    def _tables(self):
+        with self.harness.pool.connection(CREDENTIALS) as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'PUBLIC' ORDER BY 1")
+            return [row[0] for row in cursor.fetchall()]
+
+    def _rows(self, table):
+        with self.harness.pool.connection(CREDENTIALS) as connection:
+            cursor = connection.cursor()
+            cursor.execute(f'SELECT * FROM "memory"."PUBLIC"."{table}" ORDER BY 1')
+            return cursor.fetchall()
+
+    def test_fused_run_matches_the_plain_run_without_intermediates(self):
+        existing = set(self._tables())
+        SequentialRunner().run(_pipeline(), self._catalog())
+        self.assertEqual(set(self._tables()) - existing, {"BIG_REGIONS", "BY_REGION", "CLEAN", "ORDER_COUNT"})
+        plain = self._rows("BIG_REGIONS"), self._rows("ORDER_COUNT")
+
+        with self.harness.pool.connection(CREDENTIALS) as connection:
+            cursor = connection.cursor()
+            for table in ("BIG_REGIONS", "BY_REGION", "CLEAN", "ORDER_COUNT"):
+                cursor.execute(f'DROP TABLE "memory"."PUBLIC"."{table}"')
+
+        SqlFusionRunner().run(_pipeline(), self._catalog())
+        self.assertEqual(set(self._tables()) - existing, {"BIG_REGIONS", "ORDER_COUNT"})
+        self.assertEqual((self._rows("BIG_REGIONS"), self._rows("ORDER_COUNT")), plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
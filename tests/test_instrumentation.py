@@ -0,0 +1,69 @@
+"""Operations recorded for chunked loads, which fetch as they are consumed."""
+
+import gc
+import unittest
+
+from benchmarks.run_benchmarks import make_frame
+from datasets import instrumentation
+from tests import HarnessTestCase
+
+
+class ListSink:
+    def __init__(self):
+        self.operations = []
+
+    def emit(self, op):
+        self.operations.append(op)
+
+
+class ChunkedInstrumentationTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("MEASURED", make_frame(1000, 3, "mixed"))
+
+        self.sink = ListSink()
+        instrumentation.add_sink(self.sink)
+        self.addCleanup(instrumentation.remove_sink, self.sink)
+
+    def _consume(self, load_args):
+        chunks = self.harness.table_dataset("MEASURED", load_args={"chunked": True, "batch_rows": 100, **load_args}).load()
+        self.assertEqual(self.sink.operations, [])
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 1000)
+        self.assertEqual(len(self.sink.operations), 1)
+        return self.sink.operations[0]
+
+    def test_fetched_chunks_are_recorded(self):
+        op = self._consume({})
+        self.assertEqual(op.rows, 1000)
+        self.assertGreater(op.bytes, 0)
+        self.assertIn("execute", op.phases)
+        self.assertIn("fetch", op.phases)
+
+    def test_partition_workers_record_into_the_load(self):
+        op = self._consume({"partition_by": {"column": "C0", "partitions": 4}})
+        self.assertEqual(op.rows, 1000)
+        self.assertIn("execute", op.phases)
+        self.assertIn("fetch", op.phases)
+        self.assertEqual(op.extra["partitions"], 4)
+
+    def test_unloaded_chunks_are_recorded(self):
+        op = self._consume({"strategy": "unload"})
+        self.assertEqual(op.rows, 1000)
+        self.assertGreater(op.bytes, 0)
+
+    def test_abandoned_load_is_still_emitted(self):
+        chunks = self.harness.table_dataset("MEASURED", load_args={"chunked": True, "batch_rows": 100}).load()
+        next(chunks)
+        del chunks
+        gc.collect()
+
+        self.assertEqual(len(self.sink.operations), 1)
+        self.assertEqual(self.sink.operations[0].rows, 100)
+
+    def test_plain_load_is_emitted_when_it_returns(self):
+        self.harness.table_dataset("MEASURED").load()
+        self.assertEqual(self.sink.operations[0].rows, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
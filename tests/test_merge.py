@@ -0,0 +1,79 @@
+"""``if_exists: upsert`` saves of ``SnowflakeTableDataSet``, merged into the
+fake connection's DuckDB tables."""
+
+import unittest
+
+import pandas as pd
+from kedro.io.core import DataSetError
+
+from tests import HarnessTestCase
+
+
+class MergeTest(HarnessTestCase):
+    def _dataset(self, **save_args):
+        return self.harness.table_dataset("ORDERS", save_args={"if_exists": "upsert", "merge_keys": ["ID"], **save_args})
+
+    def _rows(self, dataset):
+        df = dataset.load()
+        return df.sort_values(df.columns[0]).to_dict("records")
+
+    def test_new_rows_are_inserted(self):
+        dataset = self._dataset()
+        dataset.save(pd.DataFrame({"ID": [1, 2], "STATUS": ["open", "open"]}))
+        dataset.save(pd.DataFrame({"ID": [3], "STATUS": ["open"]}))
+
+        self.assertEqual(
+            self._rows(dataset),
+            [{"ID": 1, "STATUS": "open"}, {"ID": 2, "STATUS": "open"}, {"ID": 3, "STATUS": "open"}],
+        )
+
+    def test_matched_rows_are_updated(self):
+        dataset = self._dataset()
+        dataset.save(pd.DataFrame({"ID": [1, 2], "STATUS": ["open", "open"]}))
+        dataset.save(pd.DataFrame({"ID": [2, 3], "STATUS": ["shipped", "open"]}))
+
+        self.assertEqual(
+            self._rows(dataset),
+            [{"ID": 1, "STATUS": "open"}, {"ID": 2, "STATUS": "shipped"}, {"ID": 3, "STATUS": "open"}],
+        )
+
+    def test_rerunning_the_same_upsert_changes_nothing(self):
+        dataset = self._dataset()
+        df = pd.DataFrame({"ID": [1, 2, 3], "STATUS": ["open", None, "shipped"]})
+        dataset.save(df)
+        first = self._rows(dataset)
+
+        dataset.save(df)
+
+        self.assertEqual(self._rows(dataset), first)
+        self.assertEqual(len(first), 3)
+
+    def test_quoted_keys_keep_their_case_and_drop_special_characters(self):
+        dataset = self.harness.table_dataset(
+            "ORDERS", save_args={"if_exists": "upsert", "merge_keys": ["order id", "Region"]}
+        )
+        dataset.save(pd.DataFrame({"order id": [1, 1], "Region": ["EU", "US"], "total": [10, 20]}))
+        dataset.save(pd.DataFrame({"order id": [1], "Region": ["US"], "total": [25]}))
+
+        df = dataset.load().sort_values("Region")
+        self.assertEqual(list(df.columns), ["orderid", "Region", "total"])
+        self.assertEqual(df["total"].tolist(), [10, 25])
+
+    def test_watermark_skips_rows_that_are_not_newer(self):
+        dataset = self._dataset(watermark_column="VERSION")
+        dataset.save(pd.DataFrame({"ID": [1, 2], "STATUS": ["open", "open"], "VERSION": [1, 2]}))
+        # ID 1 changed without moving past the high watermark, so it is not staged
+        dataset.save(pd.DataFrame({"ID": [1, 2], "STATUS": ["lost", "shipped"], "VERSION": [2, 3]}))
+
+        self.assertEqual(
+            self._rows(dataset),
+            [{"ID": 1, "STATUS": "open", "VERSION": 1}, {"ID": 2, "STATUS": "shipped", "VERSION": 3}],
+        )
+
+    def test_unknown_merge_key_raises(self):
+        with self.assertRaisesRegex(DataSetError, "ORDER_ID"):
+            self._dataset(merge_keys=["ORDER_ID"]).save(pd.DataFrame({"ID": [1], "STATUS": ["open"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Server side binds of ``SnowflakeParameterizedQueryDataSet``."""
+
+import unittest
+from unittest import mock
+
+from kedro.io.core import DataSetError
+
+from benchmarks.fake_snowflake import FakeSnowflakeCursor
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from datasets import snowflake
+from datasets.snowflake import SnowflakeParameterizedQueryDataSet, _to_numeric_binds
+from tests import HarnessTestCase
+
+SQL = 'SELECT * FROM "BENCH"."PUBLIC"."REGIONS" WHERE "REGION" = %(region)s AND "C0" >= %(low)s'
+
+
+class NumericBindsTest(unittest.TestCase):
+    def test_named_binds_become_positions(self):
+        sql, partitions = _to_numeric_binds(
+            "SELECT %(a)s, %(b)s, %(a)s, '100%%'", {"first": {"b": 2, "a": 1}}
+        )
+        self.assertEqual(sql, "SELECT :1, :2, :1, '100%'")
+        self.assertEqual(partitions, {"first": [1, 2]})
+
+    def test_positional_binds(self):
+        sql, partitions = _to_numeric_binds("SELECT %s, %s", {"1/2": [1, 2]})
+        self.assertEqual(sql, "SELECT :1, :2")
+        self.assertEqual(partitions, {"1/2": [1, 2]})
+
+    def test_mismatched_sets_are_rejected(self):
+        for sql, partitions in (
+            ("SELECT %(a)s, %s", {"x": {"a": 1}}),
+            ("SELECT %(a)s, %(b)s", {"x": {"a": 1}}),
+            ("SELECT %(a)s", {"x": [1]}),
+            ("SELECT %s", {"x": {"a": 1}}),
+            ("SELECT %s, %s", {"x": [1]}),
+        ):
+            with self.assertRaises(DataSetError):
+                _to_numeric_binds(sql, partitions)
+
+
+class ParameterizedQueryTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        df = make_frame(400, 2, "int")
+        df["REGION"] = ["EU", "US"] * 200
+        self.harness.seed("REGIONS", df)
+
+        self.executed = []
+        execute = FakeSnowflakeCursor.execute
+
+        def _record(cursor, sql, params=None, *args, **kwargs):
+            self.executed.append((sql, params))
+            return execute(cursor, sql, params, *args, **kwargs)
+
+        patch = mock.patch.object(FakeSnowflakeCursor, "execute", _record)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_values_are_bound_on_the_server(self):
+        dataset = SnowflakeParameterizedQueryDataSet(
+            sql=SQL, parameters={"eu": {"region": "EU", "low": 0}}, credentials=CREDENTIALS
+        )
+        self.assertEqual(len(dataset.load()["eu"]()), 200)
+
+        sql, params = self.executed[-1]
+        self.assertIn('"REGION" = :1 AND "C0" >= :2', sql)
+        self.assertNotIn("EU", sql)
+        self.assertEqual(params, ["EU", 0])
+        self.assertEqual(dataset._connection_creds["paramstyle"], "numeric")
+
+    def test_qmark_takes_positional_sets(self):
+        dataset = SnowflakeParameterizedQueryDataSet(
+            sql='SELECT * FROM "BENCH"."PUBLIC"."REGIONS" WHERE "REGION" = ?',
+            parameters=["EU", "US"],
+            credentials={**CREDENTIALS, "paramstyle": "qmark"},
+            load_args={"concat": True},
+        )
+        self.assertEqual(len(dataset.load()), 400)
+
+    def test_qmark_rejects_named_sets(self):
+        with self.assertRaisesRegex(DataSetError, "named binds"):
+            SnowflakeParameterizedQueryDataSet(
+                sql=SQL, parameters=[{"region": "EU", "low": 0}], credentials={**CREDENTIALS, "paramstyle": "qmark"}
+            )
+
+    def test_is_exported(self):
+        self.assertIn("SnowflakeParameterizedQueryDataSet", snowflake.__all__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""``load_args.partition_by`` loads of ``SnowflakeTableDataSet``: range
+boundaries, partition order and the concurrent reads behind them."""
+
+import datetime
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+from kedro.io.core import DataSetError
+
+from datasets.snowflake import _iter_partitions, _split_range
+from tests import HarnessTestCase
+
+ROWS = 1000
+
+
+def _frame():
+    ids = pd.array([None if i % 97 == 0 else i for i in range(ROWS)], dtype="Int64")
+    days = [datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 45) for i in range(ROWS)]
+    return pd.DataFrame({"ROW": np.arange(ROWS), "ID": ids, "DAY": days, "AMOUNT": np.arange(ROWS) / 7})
+
+
+class SplitRangeTest(unittest.TestCase):
+    def test_integers_split_into_contiguous_ranges(self):
+        self.assertEqual(_split_range(0, 99, 4), [25, 50, 75])
+        self.assertEqual(_split_range(1, 10, 3), [4, 7])
+
+    def test_fewer_values_than_partitions_drops_empty_ranges(self):
+        self.assertEqual(_split_range(0, 2, 8), [1, 2])
+        self.assertEqual(_split_range(5, 5, 4), [])
+
+    def test_floats_dates_and_timestamps(self):
+        self.assertEqual(_split_range(0.0, 1.0, 4), [0.25, 0.5, 0.75])
+        self.assertEqual(
+            _split_range(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), 3),
+            [datetime.date(2024, 1, 11), datetime.date(2024, 1, 21)],
+        )
+        start = datetime.datetime(2024, 1, 1)
+        self.assertEqual(_split_range(start, start + datetime.timedelta(hours=4), 2), [start + datetime.timedelta(hours=2)])
+
+    def test_other_types_raise(self):
+        with self.assertRaisesRegex(DataSetError, "hash"):
+            _split_range("a", "z", 4)
+
+
+class IterPartitionsTest(unittest.TestCase):
+    def test_partitions_are_yielded_in_order(self):
+        finished = []
+
+        def read(partition):
+            # later partitions finish first
+            time.sleep(0.01 * (5 - partition))
+            finished.append(partition)
+            return partition
+
+        self.assertEqual(list(_iter_partitions(read, list(range(6)), max_workers=3)), list(range(6)))
+        self.assertNotEqual(finished, sorted(finished))
+
+    def test_at_most_max_workers_partitions_are_read_at_once(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def read(partition):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return partition
+
+        list(_iter_partitions(read, list(range(10)), max_workers=2))
+        self.assertLessEqual(peak[0], 2)
+
+
+class PartitionedLoadTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("EVENTS", _frame())
+
+    def _load(self, partition_by, **load_args):
+        return self.harness.table_dataset("EVENTS", load_args={"partition_by": partition_by, **load_args}).load()
+
+    def _assert_every_row_once(self, df, rows=ROWS):
+        self.assertEqual(len(df), rows)
+        self.assertFalse(df["ROW"].duplicated().any())
+
+    def _assert_ordered_partitions(self, chunks, column):
+        values = [chunk[column].dropna() for chunk in chunks if chunk[column].notna().any()]
+        for previous, current in zip(values, values[1:]):
+            self.assertLess(previous.max(), current.min())
+
+    def test_numeric_ranges_load_every_row_once(self):
+        for partitions in (2, 7, 64):
+            with self.subTest(partitions=partitions):
+                df = self._load({"column": "ID", "partitions": partitions})
+                self._assert_every_row_once(df)
+                # nulls are loaded with the first range
+                self.assertEqual(df["ID"].isna().sum(), 11)
+
+    def test_numeric_partitions_come_in_range_order(self):
+        chunks = list(self._load({"column": "ID", "partitions": 5}, chunked=True))
+
+        self.assertEqual(len(chunks), 5)
+        self._assert_ordered_partitions(chunks, "ID")
+        self.assertEqual(sum(len(chunk) for chunk in chunks), ROWS)
+
+    def test_float_ranges_load_every_row_once(self):
+        self._assert_every_row_once(self._load({"column": "AMOUNT", "partitions": 6}))
+
+    def test_date_ranges_load_every_row_once_in_order(self):
+        chunks = list(self._load({"column": "DAY", "partitions": 4}, chunked=True))
+
+        self._assert_every_row_once(pd.concat(chunks))
+        self._assert_ordered_partitions(chunks, "DAY")
+
+    def test_filtered_ranges_only_split_the_filtered_rows(self):
+        df = self._load({"column": "ID", "partitions": 4}, filters=[["ID", ">=", 500]])
+
+        self.assertEqual(len(df), ROWS - 500 - 5)
+        self.assertEqual(df["ID"].min(), 500)
+
+    def test_explicit_ranges_are_half_open(self):
+        chunks = list(self._load({"column": "ID", "ranges": [[None, 100], [100, 200], [200, None]]}, chunked=True))
+
+        self.assertEqual([chunk["ID"].max() for chunk in chunks[:2]], [99, 199])
+        self._assert_every_row_once(pd.concat(chunks), ROWS - 11)
+
+    def test_hash_partitions_load_every_row_once(self):
+        self._assert_every_row_once(self._load({"column": "ROW", "method": "hash", "partitions": 5}))
+
+    def test_loads_are_deterministic(self):
+        first = self._load({"column": "ID", "partitions": 7})
+        second = self._load({"column": "ID", "partitions": 7})
+
+        pd.testing.assert_frame_equal(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
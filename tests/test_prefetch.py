@@ -0,0 +1,91 @@
+"""``prefetch()`` and ``SnowflakePrefetchHook`` against the fake connection,
+which simulates a round trip latency and queries that keep running in the
+warehouse after ``execute_async``."""
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline, node
+
+from benchmarks.fake_snowflake import FakeSnowflakeCursor
+from benchmarks.run_benchmarks import make_frame
+from datasets.hooks import SnowflakePrefetchHook
+from tests import HarnessTestCase
+
+
+class PrefetchTest(HarnessTestCase):
+    latency = 0.01
+
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("PREFETCHED", make_frame(1000, 3, "mixed"))
+
+        self.executed = []
+        execute = FakeSnowflakeCursor.execute
+
+        def _record(cursor, sql, *args, **kwargs):
+            self.executed.append(sql)
+            return execute(cursor, sql, *args, **kwargs)
+
+        patch = mock.patch.object(FakeSnowflakeCursor, "execute", _record)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _selects(self):
+        return [sql for sql in self.executed if "PREFETCHED" in sql]
+
+    def test_query_is_collected_by_id(self):
+        expected = self.harness.query_dataset("PREFETCHED", {}).load()
+        self.executed.clear()
+
+        dataset = self.harness.query_dataset("PREFETCHED", {})
+        dataset.prefetch()
+        self.assertIsNotNone(dataset._sfqid)
+
+        pd.testing.assert_frame_equal(dataset.load(), expected)
+        self.assertEqual(self._selects(), [])
+        self.assertIsNone(dataset._sfqid)
+
+    def test_table_is_collected_by_id(self):
+        expected = self.harness.table_dataset("PREFETCHED").load()
+        self.executed.clear()
+
+        dataset = self.harness.table_dataset("PREFETCHED")
+        dataset.prefetch()
+        pd.testing.assert_frame_equal(dataset.load(), expected)
+        self.assertEqual(self._selects(), [])
+
+    def test_prefetched_result_survives_a_new_connection(self):
+        dataset = self.harness.query_dataset("PREFETCHED", {})
+        dataset.prefetch()
+        self.harness.pool.close_all()
+
+        self.assertEqual(len(dataset.load()), 1000)
+
+    def test_hook_prefetches_the_free_inputs(self):
+        catalog = DataCatalog(
+            {
+                "first": self.harness.query_dataset("PREFETCHED", {}),
+                "second": self.harness.table_dataset("PREFETCHED"),
+            }
+        )
+        pipeline = Pipeline([node(len, "first", "rows"), node(len, "second", "more_rows")])
+
+        SnowflakePrefetchHook(datasets=["first"]).before_pipeline_run({}, pipeline, catalog)
+
+        self.assertIsNotNone(catalog._get_dataset("first")._sfqid)
+        self.assertIsNone(catalog._get_dataset("second")._sfqid)
+
+    def test_hook_skips_inputs_without_a_catalog_entry(self):
+        catalog = DataCatalog({"first": self.harness.query_dataset("PREFETCHED", {})})
+        pipeline = Pipeline([node(lambda df, extra: len(df), ["first", "extra"], "rows")])
+
+        SnowflakePrefetchHook().before_pipeline_run({}, pipeline, catalog)
+
+        self.assertIsNotNone(catalog._get_dataset("first")._sfqid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Warm cache hits of ``SnowflakeQueryDataSet`` against the fake connection."""
+
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from datasets.query_cache import QueryResultCache, normalize_sql
+from datasets.snowflake import SnowflakeQueryDataSet
+from tests import HarnessTestCase
+
+
+class QueryCacheTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("CACHED", make_frame(1000, 3, "mixed"))
+        self.directory = tempfile.mkdtemp()
+
+    def _dataset(self, load_args=None, **cache):
+        return SnowflakeQueryDataSet(
+            sql='SELECT * FROM "BENCH"."PUBLIC"."CACHED"',
+            credentials=CREDENTIALS,
+            load_args=load_args,
+            cache={"path": self.directory, **cache},
+        )
+
+    def test_warm_hit_skips_the_connection(self):
+        cold = self._dataset({"strategy": "auto"}).load()
+
+        with mock.patch.object(self.harness.pool, "checkout", side_effect=AssertionError("checked out")):
+            warm = self._dataset({"strategy": "auto"}).load()
+
+        pd.testing.assert_frame_equal(cold, warm)
+
+    def test_load_args_that_shape_the_frame_miss(self):
+        plain = self._dataset().load()
+        compact = self._dataset({"compact_dtypes": True})
+        compact.load()
+
+        self.assertEqual(compact._cache.misses, 1)
+        pd.testing.assert_frame_equal(self._dataset().load(), plain)
+
+    def test_freshness_sql_still_queries_the_warehouse(self):
+        self._dataset(freshness_sql="SELECT 1").load()
+
+        with mock.patch.object(self.harness.pool, "checkout", wraps=self.harness.pool.checkout) as checkout:
+            self._dataset(freshness_sql="SELECT 1").load()
+        self.assertEqual(checkout.call_count, 1)
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_whitespace_outside_quotes_is_collapsed(self):
+        self.assertEqual(normalize_sql("SELECT  *\n  FROM t\tWHERE a = 1 ;"), "SELECT * FROM t WHERE a = 1")
+
+    def test_quoted_literals_and_identifiers_are_kept(self):
+        sql = """SELECT "Order  Id", $$a  b$$ FROM t WHERE name = 'it''s   here'  AND path = 'a\\'  b'"""
+
+        self.assertEqual(
+            normalize_sql(sql), """SELECT "Order  Id", $$a  b$$ FROM t WHERE name = 'it''s   here' AND path = 'a\\'  b'"""
+        )
+        self.assertNotEqual(
+            QueryResultCache.make_key("SELECT 'a  b'", CREDENTIALS), QueryResultCache.make_key("SELECT 'a b'", CREDENTIALS)
+        )
+
+    def test_key_covers_the_load_args_that_shape_the_frame(self):
+        keys = {
+            QueryResultCache.make_key("SELECT 1", CREDENTIALS, load_args=load_args)
+            for load_args in (
+                {},
+                {"compact_dtypes": True},
+                {"use_arrow": False},
+                {"strategy": "unload"},
+                {"output_type": "arrow"},
+            )
+        }
+
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(
+            QueryResultCache.make_key("SELECT 1", CREDENTIALS, load_args={"chunked": False}),
+            QueryResultCache.make_key("SELECT 1", CREDENTIALS),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""``save_args.skip_unchanged`` saves of ``SnowflakeTableDataSet`` against the
+fake connection, which keeps the fingerprint in the table comment."""
+
+import unittest
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.fake_snowflake import FakeSnowflakeConnection
+from benchmarks.run_benchmarks import CREDENTIALS
+from tests import HarnessTestCase
+
+
+def _frame():
+    return pd.DataFrame({"ID": [1, 2, 3], "NAME": ["a", "b", "c"]})
+
+
+class SkipUnchangedTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dataset = self.harness.table_dataset("TARGET", save_args={"skip_unchanged": True})
+
+    def _tamper(self):
+        """Adds a row behind the dataset's back, a write replaces it."""
+        FakeSnowflakeConnection(**self.harness.connection_kwargs).db.execute(
+            """INSERT INTO "PUBLIC"."TARGET" ("ID", "NAME") VALUES (99, 'z')"""
+        )
+
+    def _save_twice(self, first, second):
+        self.dataset.save(first)
+        self.assertFalse(self.dataset.save_metrics["skipped"])
+        self._tamper()
+        self.dataset.save(second)
+        return len(self.dataset.load())
+
+    def test_identical_data_skips_the_write(self):
+        rows = self._save_twice(_frame(), _frame())
+
+        self.assertTrue(self.dataset.save_metrics["skipped"])
+        self.assertEqual(self.dataset.save_metrics["rows"], 0)
+        self.assertEqual(rows, 4)
+
+    def test_identical_arrow_table_skips_the_write(self):
+        table = pa.Table.from_pandas(_frame(), preserve_index=False)
+        self._save_twice(table, table)
+
+        self.assertTrue(self.dataset.save_metrics["skipped"])
+
+    def test_changed_data_is_written(self):
+        changed = _frame().assign(NAME=["a", "b", "d"])
+        rows = self._save_twice(_frame(), changed)
+
+        self.assertFalse(self.dataset.save_metrics["skipped"])
+        self.assertEqual(rows, 3)
+        self.assertEqual(sorted(self.dataset.load()["NAME"]), ["a", "b", "d"])
+
+    def test_changed_schema_is_written(self):
+        # the same values under a different dtype or column name are a new fingerprint
+        for changed in (_frame().astype({"ID": "float64"}), _frame().rename(columns={"NAME": "LABEL"})):
+            with self.subTest(columns=list(changed.dtypes.astype(str).items())):
+                self._save_twice(_frame(), changed)
+                self.assertFalse(self.dataset.save_metrics["skipped"])
+
+    def test_fingerprint_is_kept_in_the_table_comment(self):
+        self.dataset.save(_frame())
+        fingerprint = self.dataset.save_metrics["fingerprint"]
+
+        with self.harness.pool.connection(CREDENTIALS) as conn:
+            stored = self.dataset.stored_fingerprint(conn, **self.dataset._save_args)
+        self.assertEqual(stored, fingerprint)
+
+
+if __name__ == "__main__":
+    unittest.main()
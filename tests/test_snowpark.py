@@ -0,0 +1,81 @@
+"""Shared snowpark sessions and their per action query tags, against the
+fake session of the benchmarks."""
+
+import threading
+import unittest
+
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from datasets.snowpark import SnowparkQueryDataSet, SnowparkSessionDataSet, SnowparkTableDataSet
+from tests import HarnessTestCase
+
+
+class SnowparkTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("EVENTS", make_frame(100, 2, "int"))
+
+    def _table(self, table="EVENTS", **kwargs):
+        return SnowparkTableDataSet(
+            table_name=table, schema=self.harness.schema, database=self.harness.database, credentials=CREDENTIALS, **kwargs
+        )
+
+    def _query(self, **kwargs):
+        return SnowparkQueryDataSet(sql=f'SELECT * FROM "{self.harness.schema}"."EVENTS"', credentials=CREDENTIALS, **kwargs)
+
+    def test_datasets_with_different_tags_share_one_session(self):
+        sessions = {
+            id(self._table(query_tag="ingest").load().session),
+            id(self._query(query_tag="report").load().session),
+            id(SnowparkSessionDataSet(credentials=CREDENTIALS).load()),
+        }
+
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(len(SnowparkSessionDataSet.sessions), 1)
+
+    def test_other_credentials_get_their_own_session(self):
+        first = SnowparkSessionDataSet(credentials=CREDENTIALS).load()
+        second = SnowparkSessionDataSet(credentials={**CREDENTIALS, "role": "REPORTING"}).load()
+
+        self.assertIsNot(first, second)
+
+    def test_load_and_save_run_under_their_own_tag(self):
+        source = self._table(query_tag="ingest", load_args={"cache_result": True})
+        target = self._table("EVENTS_COPY", query_tag="publish")
+
+        df = source.load()
+        target.save(df)
+
+        session = df.session
+        self.assertEqual([tag for _, tag in session.history], ["ingest", "publish"])
+        self.assertIsNone(session.query_tag)
+        self.assertEqual(len(target.load().to_pandas()), 100)
+
+    def test_untagged_datasets_keep_the_session_tag(self):
+        session = SnowparkSessionDataSet(credentials=CREDENTIALS, query_tag="notebook").load()
+        df = self._query(load_args={"cache_result": True}).load()
+
+        self.assertEqual(session.query_tag, "notebook")
+        self.assertEqual([tag for _, tag in df.session.history], ["notebook"])
+
+    def test_concurrent_tagged_loads_keep_their_tags(self):
+        datasets = [self._query(query_tag=f"node_{number}", load_args={"cache_result": True}) for number in range(8)]
+        threads = [threading.Thread(target=dataset.load) for dataset in datasets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session = next(iter(SnowparkSessionDataSet.sessions.values()))
+        tags = sorted(tag for _, tag in session.history)
+        self.assertEqual(tags, sorted(f"node_{number}" for number in range(8)))
+        self.assertIsNone(session.query_tag)
+
+    def test_warm_up_runs_under_the_tag(self):
+        SnowparkSessionDataSet.warm_up(CREDENTIALS, "report").join(5)
+
+        session = next(iter(SnowparkSessionDataSet.sessions.values()))
+        self.assertEqual(session.history, [("SELECT 1", "report")])
+
+
+if __name__ == "__main__":
+    unittest.main()
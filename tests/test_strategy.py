@@ -0,0 +1,80 @@
+"""``strategy: auto`` picks how a load reads from its pre-flight estimate,
+against the fake connection's ``INFORMATION_SCHEMA`` counts and ``EXPLAIN``."""
+
+import collections.abc
+import unittest
+from unittest import mock
+
+from kedro.io.core import DataSetError
+
+from benchmarks.run_benchmarks import CREDENTIALS, make_frame
+from datasets.snowflake import SnowflakeQueryDataSet
+from tests import HarnessTestCase
+
+# the fake estimates 8 bytes per value
+ROWS, COLUMNS = 1000, 4
+TABLE_BYTES = ROWS * COLUMNS * 8
+
+
+class AutoStrategyTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("EVENTS", make_frame(ROWS, COLUMNS, "int"))
+        patcher = mock.patch("datasets.snowflake._available_memory", return_value=10 * TABLE_BYTES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _table(self, **load_args):
+        return self.harness.table_dataset("EVENTS", load_args={"strategy": "auto", **load_args})
+
+    def _query(self, **load_args):
+        return SnowflakeQueryDataSet(
+            sql='SELECT * FROM "BENCH"."PUBLIC"."EVENTS"', credentials=CREDENTIALS, load_args={"strategy": "auto", **load_args}
+        )
+
+    def test_small_table_is_fetched(self):
+        dataset = self._table()
+
+        self.assertEqual(len(dataset.load()), ROWS)
+        self.assertEqual(dataset.load_metrics["strategy"], "fetch")
+        self.assertFalse(dataset.load_metrics["partitioned"])
+        self.assertEqual(dataset.load_metrics["estimated_bytes"], TABLE_BYTES)
+
+    def test_large_table_is_partitioned_or_unloaded(self):
+        partitioned = self._table(partition_by="C0", auto={"partition_min_bytes": TABLE_BYTES})
+        unloaded = self._table(auto={"unload_min_bytes": TABLE_BYTES})
+
+        self.assertEqual(len(partitioned.load()), ROWS)
+        self.assertTrue(partitioned.load_metrics["partitioned"])
+        self.assertEqual(len(unloaded.load()), ROWS)
+        self.assertEqual(unloaded.load_metrics["strategy"], "unload")
+
+    def test_load_over_the_memory_budget_raises(self):
+        # 4x expansion of the estimate against half of 2x the table
+        with mock.patch("datasets.snowflake._available_memory", return_value=2 * TABLE_BYTES):
+            with self.assertRaisesRegex(DataSetError, "chunked: true"):
+                self._table().load()
+
+    def test_chunked_load_over_the_memory_budget_is_unloaded_in_batches(self):
+        dataset = self._table(chunked=True, batch_rows=100, auto={"unload_min_bytes": TABLE_BYTES})
+
+        with mock.patch("datasets.snowflake._available_memory", return_value=2 * TABLE_BYTES):
+            chunks = dataset.load()
+
+        self.assertIsInstance(chunks, collections.abc.Iterator)
+        self.assertEqual([len(chunk) for chunk in chunks], [100] * 10)
+        self.assertEqual(dataset.load_metrics["strategy"], "unload")
+
+    def test_query_is_estimated_with_explain(self):
+        small, large = self._query(), self._query(auto={"unload_min_bytes": TABLE_BYTES})
+
+        self.assertEqual(len(small.load()), ROWS)
+        self.assertEqual(small.load_metrics["strategy"], "fetch")
+        self.assertEqual(small.load_metrics["estimated_bytes"], TABLE_BYTES)
+        self.assertIsNone(small.load_metrics["estimated_rows"])
+        self.assertEqual(len(large.load()), ROWS)
+        self.assertEqual(large.load_metrics["strategy"], "unload")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Streamed saves of ``SnowflakeTableDataSet`` from generator nodes, run
+through a Kedro runner."""
+
+import unittest
+
+import pandas as pd
+from kedro.framework.hooks.manager import _create_hook_manager
+from kedro.io import DataCatalog
+from kedro.io.core import DataSetError
+from kedro.pipeline import Pipeline, node
+from kedro.runner import SequentialRunner
+
+from datasets.hooks import SnowflakeStreamedSaveHook
+from datasets.snowflake import StreamedChunks
+from tests import HarnessTestCase
+
+
+def _chunks(count=3, rows=5):
+    for number in range(count):
+        yield pd.DataFrame({"ID": range(number * rows, (number + 1) * rows), "CHUNK": number})
+
+
+class StreamedSaveTest(HarnessTestCase):
+    def _run(self, func, save_args=None, hooks=()):
+        hook_manager = _create_hook_manager()
+        for hook in hooks:
+            hook_manager.register(hook)
+        target = self.harness.table_dataset("STREAMED", save_args=save_args)
+        SequentialRunner().run(Pipeline([node(func, None, "streamed")]), DataCatalog({"streamed": target}), hook_manager)
+        return target
+
+    def test_generator_node_chunks_add_up_with_the_hook(self):
+        hook = SnowflakeStreamedSaveHook()
+        for _ in range(2):
+            # the first chunk of every run replaces the table
+            target = self._run(_chunks, hooks=[hook])
+            df = target.load()
+            self.assertEqual(sorted(df["ID"]), list(range(15)))
+
+    def test_upserts_of_a_generator_node_stay_upserts(self):
+        self.harness.seed("STREAMED", pd.DataFrame({"ID": [0, 100], "CHUNK": [-1, -1]}))
+        target = self._run(_chunks, {"if_exists": "upsert", "merge_keys": ["ID"]}, [SnowflakeStreamedSaveHook()])
+        df = target.load().sort_values("ID")
+        self.assertEqual(df["ID"].tolist(), list(range(15)) + [100])
+        self.assertEqual(df["CHUNK"].iloc[0], 0)
+
+    def test_streamed_chunks_are_saved_once(self):
+        target = self._run(lambda: StreamedChunks(_chunks()))
+        self.assertEqual(len(target.load()), 15)
+        self.assertEqual(target.save_metrics["rows"], 15)
+        self.assertEqual(target.save_metrics["chunks"], 3)
+
+    def test_skip_unchanged_rejects_generator_chunks(self):
+        with self.assertRaises(DataSetError):
+            self._run(_chunks, {"skip_unchanged": True}, [SnowflakeStreamedSaveHook()])
+
+    def test_plain_saves_are_not_appended(self):
+        hook = SnowflakeStreamedSaveHook()
+        for _ in range(2):
+            target = self._run(lambda: pd.DataFrame({"ID": range(4)}), hooks=[hook])
+        self.assertEqual(len(target.load()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
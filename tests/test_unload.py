@@ -0,0 +1,92 @@
+"""``strategy: unload`` loads: ``COPY INTO`` a stage, ``GET`` and read the
+Parquet files, and clean up the stage and the downloaded files."""
+
+import gc
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.fake_snowflake import FakeSnowflakeConnection, FakeSnowflakeCursor
+from benchmarks.run_benchmarks import make_frame
+from tests import HarnessTestCase
+
+ROWS = 1000
+
+
+class UnloadTest(HarnessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.harness.seed("EVENTS", make_frame(ROWS, 4, "mixed"))
+
+        self.statements = []
+        execute = FakeSnowflakeCursor.execute
+
+        def record(cursor, sql, *args, **kwargs):
+            self.statements.append(" ".join(sql.split()))
+            return execute(cursor, sql, *args, **kwargs)
+
+        # every directory the fake stages and the downloads are created in
+        self.directories = []
+        mkdtemp = tempfile.mkdtemp
+
+        def track(*args, **kwargs):
+            self.directories.append(mkdtemp(*args, **kwargs))
+            return self.directories[-1]
+
+        for patcher in (mock.patch.object(FakeSnowflakeCursor, "execute", record), mock.patch("tempfile.mkdtemp", track)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _dataset(self, load_args=None, **unload):
+        return self.harness.table_dataset(
+            "EVENTS", load_args={"strategy": "unload", "unload": {"max_file_size": 20000, **unload}, **(load_args or {})}
+        )
+
+    def _leftovers(self):
+        return [directory for directory in self.directories if os.path.exists(directory)]
+
+    def test_unload_copies_into_a_stage_and_gets_the_files(self):
+        df = self._dataset().load()
+
+        pd.testing.assert_frame_equal(df, self.harness.table_dataset("EVENTS").load())
+        verbs = [statement.split()[0] for statement in self.statements]
+        self.assertEqual(verbs, ["CREATE", "COPY", "GET", "DROP", "SELECT"])
+        self.assertRegex(self.statements[1], r'^COPY INTO @"BENCH"\."PUBLIC"\."kedro_unload_\w+"/kedro_unload_\w+/ FROM')
+        self.assertIn("PARALLEL=8", self.statements[2])
+
+    def test_temporary_stage_and_files_are_removed(self):
+        self._dataset().load()
+
+        self.assertEqual(len(self.directories), 2)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_named_stage_files_are_removed(self):
+        self._dataset(stage="EXPORTS").load()
+
+        self.assertTrue(any(statement.startswith("REMOVE @EXPORTS/kedro_unload_") for statement in self.statements))
+        stage = FakeSnowflakeConnection._named_stages[self.harness.connection_kwargs["path"]]["EXPORTS"]
+        self.assertEqual(os.listdir(stage), [])
+
+    def test_chunked_unload_removes_the_files_once_consumed(self):
+        chunks = self._dataset({"chunked": True, "batch_rows": 100}).load()
+        self.assertTrue(self._leftovers())
+
+        self.assertEqual(sum(len(chunk) for chunk in chunks), ROWS)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_lazy_unload_removes_the_files_with_the_dataset(self):
+        dataset = self._dataset(lazy=True).load()
+        self.assertEqual(dataset.count_rows(), ROWS)
+        self.assertGreater(len(dataset.files), 1)
+        self.assertTrue(self._leftovers())
+
+        del dataset
+        gc.collect()
+        self.assertEqual(self._leftovers(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()